@@ -1,11 +1,17 @@
 from waitress import serve
 import source.ManageData as md
+import source.processing.EmbeddingFrames as ef
 from source.Options import Opt
+from source.JobManager import JobManager, JobStatus
+from source.SessionRegistry import SessionRegistry
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, session
 from flask_cors import CORS
 
 import numpy as np
+import threading
+import uuid
+import os
 
 from source.InterfaceOptions import DimReduction
 from source.InterfaceOptions import Imputation
@@ -15,15 +21,16 @@ from source.InterfaceOptions import Scaling
 
 app = Flask(__name__)
 app.config["CACHE_TYPE"] = "null"
+app.config["SECRET_KEY"] = os.urandom(24)
 CORS(app)
 
-data_manager = md.ManageData()
-original_data = data_manager.get_original_clinical_data()
-reduced_data = data_manager.get_reduced_data()
-clustered_data = data_manager.get_clustered_data()
-shap_values = data_manager.get_shap_data()
-inter_lda_values = data_manager.get_lda_data()
-inter_sgd_values = data_manager.get_sgd_data()
+# the input data is read once and shared read-only by all sessions. It is not read when this module is imported,
+# as the spawned worker processes import it again, but they receive the data manager from the server process.
+data_manager = None
+data_manager_lock = threading.Lock()
+session_registry = SessionRegistry(Opt.max_sessions.value, Opt.session_idle_timeout.value,
+                                   lambda: get_data_manager().create_state())
+job_manager = JobManager(Opt.number_of_job_workers.value, Opt.number_of_stored_jobs.value)
 
 dim_red_values = [member.value for member in DimReduction]
 imp_values = [member.value for member in Imputation]
@@ -31,8 +38,18 @@ outlier_values = [member.value for member in OutlierRemoval]
 clustering_values = [member.value for member in Clustering]
 scaling_values = [member.value for member in Scaling]
 
-# data used for table and hovering
-merged_imputed_data = data_manager.get_merged_imputed_data_for_hovering_and_table()
+
+def get_data_manager():
+    """
+    Get the data manager that holds the input data of all sessions. It is created on the first call.
+
+        :return: the data manager.
+    """
+    global data_manager
+    with data_manager_lock:
+        if data_manager is None:
+            data_manager = md.ManageData()
+        return data_manager
 
 
 @app.route('/')
@@ -64,79 +81,193 @@ def get_scatterplot_data():
     represents the dimensionality reduction methods. Both are selected through
     the interface.
     POST the selected frontend options to the backend to process the data with
-    the selected analysis options.
+    the selected analysis options. The processing is executed as a background job,
+    whose progress is polled through `get_job_status`.
 
-        :return: the data of the scatterplot as a json object.
+        :return: the data of the scatterplot or the id of the submitted job as a json object.
     """
     if request.method == 'POST':
         data = request.get_json()
-
-        if data.startswith("resetIndices"):
-            data_manager.indices = []
-
-        if data.startswith("resetClusters"):
-            data_manager.clusters = []
-
-        if data.startswith("indices"):
-            if Opt.decimal_comma.value in data:
-                string_arr = data[len("indices") +
-                                  1:].split(Opt.decimal_comma.value)
-                data_manager.indices = [int(elem) for elem in string_arr]
-
-        if data.startswith("clusters"):
-            if Opt.decimal_comma.value in data:
-                string_arr = data[len("indices") +
-                                  1:].split(Opt.decimal_comma.value)
-                data_manager.clusters = [int(elem) for elem in string_arr]
-
-        if data.startswith("features"):
-            feature_list = data[len("features") +
-                                1:].split(Opt.decimal_comma.value)
-            data_manager.features = feature_list
-        if data.startswith("clinical"):
-            print("CLINICAL data received !")
-
-        elif Opt.separator.value in data:  # more than one value is send
-            data_input = data.split(Opt.separator.value)
-            data_manager.dim_reduction = DimReduction[process(data_input[0])]
-            data_manager.imputation = Imputation[data_input[1]]
-            data_manager.clustering = Clustering[process(data_input[2])]
-            data_manager.out_removal = OutlierRemoval[data_input[3]]
-            data_manager.scaling = Scaling[data_input[4]]
-
-        else:
-            if data in dim_red_values:
-                print("new dimred value: ", data)
-                data_manager.dim_reduction = DimReduction[process(data)]
-
-            if data in imp_values:
-                print("new imp value: ", data)
-                data_manager.imputation = Imputation[data]
-
-            if data in outlier_values:
-                print("new outlier value: ", data)
-                data_manager.out_removal = OutlierRemoval[data]
-
-            if data in clustering_values:
-                print("new clustering value: ", data)
-                data_manager.clustering = Clustering[process(data)]
-
-            if data in scaling_values:
-                print("new scaling value: ", data)
-                data_manager.scaling = Scaling[data]
-
-        data_manager.get_data_of_selected_options()
-        return jsonify(data)
+        job_id = job_manager.submit(process_selected_options, get_session_state(), data)
+        return jsonify({'job': job_id})
 
     elif request.method == 'GET':
-        res = [create_scatterplot_data(data_manager.get_reduced_data()),
-               create_shap_data(data_manager.get_shap_data()),
-               create_clustering_data(data_manager.get_clustered_data()),
-               create_interclass_data(data_manager.get_lda_data()),
-               create_interclass_data(data_manager.get_sgd_data())
-               ]
+        return jsonify(str(create_scatterplot_result(get_session_state())))
+
+
+@app.route('/compare_reductions', methods=['POST'])
+def compare_reductions():
+    """
+    Reduce the dimensionality of the data of the session with all methods in parallel, to compare them
+    side by side. The reduction is executed as a background job, whose progress is polled through
+    `get_job_status` and whose result is fetched through `get_job_result`.
+
+        :return: the id of the submitted job as a json object.
+    """
+    job_id = job_manager.submit(process_all_reductions, get_session_state())
+    return jsonify({'job': job_id})
 
-        return jsonify(str(res))
+
+@app.route('/get_job_status')
+def get_job_status():
+    """
+    Get the status of a processing job, including its current stage and percentage complete,
+    and the current layout of t-SNE or UMAP while the embedding is optimized.
+
+        :return: the status of the job as a json object.
+    """
+    job = job_manager.get_job(request.args.get('job'))
+    if job is None:
+        return jsonify({'error': 'unknown job'}), 404
+
+    return jsonify(job.get_status())
+
+
+@app.route('/get_job_result')
+def get_job_result():
+    """
+    Get the result of a finished processing job. The result has the same structure as the
+    GET request of the scatterplot data.
+
+        :return: the data of the scatterplot as a json object.
+    """
+    job = job_manager.get_job(request.args.get('job'))
+    if job is None:
+        return jsonify({'error': 'unknown job'}), 404
+    if job.status != JobStatus.DONE:
+        return jsonify(job.get_status()), 409
+
+    return jsonify(str(job.result))
+
+
+def get_session_state():
+    """
+    Get the pipeline state of the session of the current request. A new session gets an id
+    and a state with the default options.
+
+        :return: the pipeline state of the session.
+    """
+    if Opt.session_id.value not in session:
+        session[Opt.session_id.value] = uuid.uuid4().hex
+
+    return session_registry.get_state(session[Opt.session_id.value])
+
+
+def process_selected_options(job, state, data):
+    """
+    Update the selected options of a session with the data posted by the frontend and process
+    the data with these options. This function is executed as a background job. The jobs of one
+    session are processed one after another.
+
+        :param job: the job to report the progress to.
+        :param state: the pipeline state of the session.
+        :param data: the options posted by the frontend.
+        :return: the data of the scatterplot after processing.
+    """
+    with state.lock:
+        update_selected_options(state, data)
+        with ef.observe_embedding(job.report_embedding):
+            get_data_manager().get_data_of_selected_options(state, job.report_progress)
+        return create_scatterplot_result(state)
+
+
+def process_all_reductions(job, state):
+    """
+    Reduce the dimensionality of the data of a session with all methods and the other selected options.
+    This function is executed as a background job.
+
+        :param job: the job to report the progress to.
+        :param state: the pipeline state of the session.
+        :return: the list of the method name and the {x, y} tuples of the reduced data per method.
+    """
+    with state.lock:
+        reductions = get_data_manager().get_all_reductions(state, job.report_progress)
+
+    return [{'method': dim_reduction.value, 'data': create_scatterplot_data(reduced_data)}
+            for dim_reduction, reduced_data in reductions.items()]
+
+
+def update_selected_options(state, data):
+    """
+    Update the options of a session with the data posted by the frontend.
+
+        :param state: the pipeline state of the session.
+        :param data: the options posted by the frontend.
+    """
+    if data.startswith("resetIndices"):
+        state.indices = []
+
+    if data.startswith("resetClusters"):
+        state.clusters = []
+
+    if data.startswith("refitSubset"):
+        state.refit_subset = True
+
+    if data.startswith("projectSubset"):
+        state.refit_subset = False
+
+    if data.startswith("indices"):
+        if Opt.decimal_comma.value in data:
+            string_arr = data[len("indices") +
+                              1:].split(Opt.decimal_comma.value)
+            state.indices = [int(elem) for elem in string_arr]
+
+    if data.startswith("clusters"):
+        if Opt.decimal_comma.value in data:
+            string_arr = data[len("indices") +
+                              1:].split(Opt.decimal_comma.value)
+            state.clusters = [int(elem) for elem in string_arr]
+
+    if data.startswith("features"):
+        feature_list = data[len("features") +
+                            1:].split(Opt.decimal_comma.value)
+        state.features = feature_list
+    if data.startswith("clinical"):
+        print("CLINICAL data received !")
+
+    elif Opt.separator.value in data:  # more than one value is send
+        data_input = data.split(Opt.separator.value)
+        state.dim_reduction = DimReduction[process(data_input[0])]
+        state.imputation = Imputation[data_input[1]]
+        state.clustering = Clustering[process(data_input[2])]
+        state.out_removal = OutlierRemoval[data_input[3]]
+        state.scaling = Scaling[data_input[4]]
+
+    else:
+        if data in dim_red_values:
+            print("new dimred value: ", data)
+            state.dim_reduction = DimReduction[process(data)]
+
+        if data in imp_values:
+            print("new imp value: ", data)
+            state.imputation = Imputation[data]
+
+        if data in outlier_values:
+            print("new outlier value: ", data)
+            state.out_removal = OutlierRemoval[data]
+
+        if data in clustering_values:
+            print("new clustering value: ", data)
+            state.clustering = Clustering[process(data)]
+
+        if data in scaling_values:
+            print("new scaling value: ", data)
+            state.scaling = Scaling[data]
+
+
+def create_scatterplot_result(state):
+    """
+    Transform the current results of a session into the data needed for the visual representation.
+
+        :param state: the pipeline state of the session.
+        :return: the list of the scatterplot, shap, clustering, LDA and SGD data.
+    """
+    return [create_scatterplot_data(state.get_reduced_data()),
+            create_shap_data(state.get_shap_data()),
+            create_clustering_data(state.get_clustered_data()),
+            create_interclass_data(state.get_lda_data()),
+            create_interclass_data(state.get_sgd_data())
+            ]
 
 
 def process(data_input):
@@ -156,7 +287,7 @@ def get_data_tag():
 
         :return: the data features grouped by the dataset name as json object.
     """
-    return jsonify(str(data_manager.get_dataset_tag()))
+    return jsonify(str(get_session_state().get_dataset_tag()))
 
 
 @app.route('/get_shap_data')
@@ -166,7 +297,7 @@ def get_shap_data():
 
         :return: the shap data of the clusters as json object.
     """
-    return jsonify(str(create_shap_data(shap_values)))
+    return jsonify(str(create_shap_data(get_session_state().get_shap_data())))
 
 
 def create_shap_data(shap_scores):
@@ -199,8 +330,9 @@ def get_interclass_data():
 
         :return: the interclass data of the clusters as json object.
     """
-    lda_res = create_interclass_data(inter_lda_values)
-    sgd_res = create_interclass_data(inter_sgd_values)
+    state = get_session_state()
+    lda_res = create_interclass_data(state.get_lda_data())
+    sgd_res = create_interclass_data(state.get_sgd_data())
 
     return jsonify(str([lda_res, sgd_res]))
 
@@ -234,7 +366,42 @@ def get_clustered_data():
 
         :return: the cluster labels as a json object.
     """
-    return jsonify(str(create_clustering_data(clustered_data)))
+    return jsonify(str(create_clustering_data(get_session_state().get_clustered_data())))
+
+
+@app.route('/get_label_agreement')
+def get_label_agreement():
+    """
+    Get the agreement of the cluster label of each patient across the chains of the multiple imputation,
+    and the embedding of each chain aligned with the shown embedding.
+
+        :return: the agreement per patient and the aligned embeddings as a json object, which are
+        empty if the data is not imputed multiple times.
+    """
+    state = get_session_state()
+    return jsonify(str(create_label_agreement_data(state.get_label_agreement(), state.get_chain_embeddings())))
+
+
+def create_label_agreement_data(label_agreement, chain_embeddings):
+    """
+    Transform the label agreement and the aligned embeddings into lists of elements to visualize them.
+
+        :param label_agreement: the dataframe of the agreement and the number of chains per patient.
+        :param chain_embeddings: the list of the aligned embeddings of the chains.
+        :return: the list of {id, agreement, chains} elements and the list of the {x, y} tuples per chain.
+    """
+    if label_agreement is None:
+        return [[], []]
+
+    agreement = []
+    for row in range(len(label_agreement)):
+        data_instance = {'id': label_agreement.iloc[row, 0],
+                         'agreement': label_agreement.iloc[row, 1],
+                         'chains': label_agreement.iloc[row, 2]
+                         }
+        agreement.append(data_instance)
+
+    return [agreement, [create_scatterplot_data(embedding) for embedding in chain_embeddings]]
 
 
 @app.route('/get_scatterplot_hover_data')
@@ -246,6 +413,8 @@ def get_scatterplot_hover_data():
     """
     res = []
 
+    # data used for table and hovering
+    merged_imputed_data = get_session_state().get_merged_imputed_data_for_hovering_and_table()
     scatterplot_hover_data = create_scatterplot_hover_data(merged_imputed_data)
     scatterplot_table_data = create_scatterplot_table_data(merged_imputed_data)
 
@@ -255,6 +424,21 @@ def get_scatterplot_hover_data():
     return jsonify(str(res))
 
 
+@app.route('/get_missingness_data')
+def get_missingness_data():
+    """
+    Get the bitmap of the values of the merged data that were originally missing, to mark the imputed
+    values in the table and when hovering. The rows and columns match the data of the table.
+
+        :return: the number of rows, the column names and the base64 encoded bitmap as a json object.
+    """
+    missingness = get_session_state().get_missingness()
+    if missingness is None:
+        return jsonify({'rows': 0, 'columns': [], 'bitmap': ''})
+
+    return jsonify(missingness.to_dict())
+
+
 def create_scatterplot_data(data):
     """
     Transform the data into a list of tuples to visualize in a scatterplot.
@@ -373,6 +557,10 @@ if __name__ == "__main__":
     """
         The starting point of the application.
     """
+    # read the input data before the server starts, instead of on the first request
+    get_data_manager()
+    if Opt.precalculate_all_options.value:
+        get_data_manager().precalculate_and_store_all_options()
 
     if Opt.server_deployment.value:
         serve(app, host='0.0.0.0', port=5000, url_scheme='https')
@@ -0,0 +1,86 @@
+"""
+    Micro-benchmark of the column-wise `cleanup_data` against the former row-wise implementation
+    on a generated wide clinical table. Run it from the root folder by
+    `python -m benchmarks.benchmark_cleanup_data`.
+"""
+from source.processing.ReadData import cleanup_data
+import source.processing.DataFrameOps as dfo
+from source.Options import Opt
+
+import numpy as np
+import pandas as pd
+import timeit
+
+
+def process_symbols(entry, symbol, constant):
+    """
+    If `entry` contains `symbol`, remove `symbol` from `entry` and decrease it by `constant`.
+    Otherwise, no change is performed to `entry`.
+
+        :param entry: the entry to process.
+        :param symbol: the symbol to remove.
+        :param constant: the constant to decrease the entry with.
+        :return: the processed entry without the symbol and decreased by the constant.
+    """
+    if symbol in str(entry):
+        number = float(entry.replace(symbol, ""))
+        return number - constant
+
+    else:
+        return entry
+
+
+def cleanup_data_row_wise(data):
+    """
+    Cleanup the data object by the former implementation, which processes single entries.
+
+        :param data: the dataframe object to process.
+        :return: the cleaned data.
+    """
+    mask = dfo.get_all_object_features(data)
+    data[mask.columns] = mask.apply(lambda x: x.str.strip())
+
+    column = Opt.Z_score.value
+    if column in data:
+        data[column] = data.apply(lambda x: process_symbols(
+            x[column], Opt.smaller_symbol.value, Opt.constant_to_decrease.value), axis=1)
+
+    for col in range(len(mask.columns)):
+        try:
+            data[mask.columns[col]] = [float(str(j).replace(
+                Opt.decimal_comma.value, Opt.decimal_point.value)) for j in data[mask.columns[col]]]
+        except ValueError:
+            pass
+
+    return data
+
+
+def create_clinical_table(rows, columns):
+    """
+    Create a clinical table with decimal commas, whitespaces, a categorical feature, and
+    entries with the `<` symbol in the `Z_score` feature.
+
+        :param rows: the number of rows of the table.
+        :param columns: the number of numeric features of the table.
+        :return: the generated table.
+    """
+    rng = np.random.default_rng(0)
+    values = rng.random((rows, columns)).round(2).astype(str)
+    data = pd.DataFrame(np.char.replace(values, Opt.decimal_point.value, Opt.decimal_comma.value),
+                        columns=['feature ' + str(i) for i in range(columns)], dtype=object)
+    data[Opt.Z_score.value] = [' <0' if i % 10 == 0 else ' ' + str(i % 7) + ' ' for i in range(rows)]
+    data[Opt.categorical_score.value] = rng.choice([' A ', 'B', 'A+C ', None], rows)
+    return data
+
+
+if __name__ == "__main__":
+    for rows, columns in [(1000, 100), (5000, 100), (5000, 500)]:
+        table = create_clinical_table(rows, columns)
+        expected = cleanup_data_row_wise(table.copy())
+        result = cleanup_data(table.copy())
+        pd.testing.assert_frame_equal(expected, result, check_dtype=False)
+
+        row_wise = min(timeit.repeat(lambda: cleanup_data_row_wise(table.copy()), number=1, repeat=3))
+        column_wise = min(timeit.repeat(lambda: cleanup_data(table.copy()), number=1, repeat=3))
+        print("{} x {}: row-wise {:.3f}s, column-wise {:.3f}s, speedup {:.1f}x".format(
+            rows, columns, row_wise, column_wise, row_wise / column_wise))
@@ -15,6 +15,18 @@ def write_df_to_file(df, filename):
     print("Data written to file '" + filename + "'")
 
 
+def append_df_to_file(df, filename):
+    """
+    Append the rows of a dataframe to a file. The header is only written, if the file does not exist yet.
+
+        :param df: the dataframe to append.
+        :param filename: the filename to use for the output.
+    """
+    path = get_path_to_output_data(filename)
+    df.to_csv(path, mode='a', header=not os.path.exists(path), index=False, sep=Opt.separator.value,
+              decimal=Opt.decimal_comma.value, encoding=Opt.encoding.value)
+
+
 def write_string_to_file(string, filename):
     """
     Write string to file.
@@ -34,7 +46,8 @@ def get_path_to_output_data(filename):
         :return: the file path as a string.
     """
     directory = str(os.path.join(pathlib.Path().resolve(), Opt.output_folder.value))
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    path = str(directory + filename)
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
-    return str(directory + filename)
+    return path
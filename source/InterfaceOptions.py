@@ -7,7 +7,7 @@ class DimReduction(Enum):
         UMAP: uniform manifold approximation and projection
         PCA: principal component analysis
         TSNE: t-distributed stochastic neighbor embedding
-        MDS: multidimensional scaling
+        MDS: multidimensional scaling by SMACOF, or by landmark MDS for many samples
         FAMD: factor analysis of mixed data
     """
     UMAP = 'UMAP'
@@ -22,6 +22,7 @@ class Imputation(Enum):
     Imputation methods provided:
         BEST: identify the best method based on the evaluation on a complete data subset.
         MICE: multiple imputation by chained equations
+        MULTI: pool several MICE chains that sample from the posterior, and compare the clusters of each chain
         KNN: k-nearest neighbors imputation algorithm
         CONST: impute all values by the constant `-1`
         HCONST: impute all values by the constant `1000`
@@ -30,6 +31,7 @@ class Imputation(Enum):
     """
     BEST = 'BEST'
     MICE = 'MICE'
+    MULTI = 'MULTI'
     KNN = 'KNN'
     CONST = 'CONST'
     HCONST = 'HCONST'
@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import numpy as np
+import threading
+import uuid
+
+
+class JobStatus(object):
+    """
+        The states of a job that processes the data in the background.
+    """
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+
+class Job(object):
+    """
+        A class for storing the progress and the result of a job.
+    """
+
+    def __init__(self, job_id):
+        """
+            The constructor that sets the initialization parameters for the job.
+
+            :param job_id: the unique identifier of the job.
+        """
+        self.job_id = job_id
+        self.status = JobStatus.PENDING
+        self.stage = None
+        self.percent = 0
+        self.result = None
+        self.error = None
+        self.embedding = None
+
+    def report_progress(self, stage, percent):
+        """
+        Update the stage that is currently processed and the percentage of the job that is complete.
+
+            :param stage: the name of the processing stage.
+            :param percent: the percentage of the job that is complete.
+        """
+        self.stage = stage
+        self.percent = percent
+
+    def report_embedding(self, embedding):
+        """
+        Set the embedding that is currently optimized, to report its intermediate layouts with the status.
+
+            :param embedding: the matrix of the embedding, which is updated in place by the optimization.
+        """
+        self.embedding = embedding
+
+    def get_embedding_frame(self):
+        """
+        Take a frame of the embedding that is currently optimized. The scatterplot fits its axes to each
+        frame, so that the frame is normalized to keep its precision while the coordinates are still small.
+
+            :return: the list of the normalized [x, y] coordinates of the samples, or `None` if no embedding
+            is optimized.
+        """
+        embedding = self.embedding
+        if embedding is None or self.status != JobStatus.RUNNING:
+            return None
+
+        frame = np.array(embedding, dtype=float)[:, :2]
+        frame = frame / max(np.abs(frame).max(initial=0), 1e-12)
+        return np.round(frame, 4).tolist()
+
+    def get_status(self):
+        """
+        Get the status of the job to report it to the frontend.
+
+            :return: a dictionary with the job id, status, stage, percentage complete and the current
+            frame of the embedding.
+        """
+        return {'job': self.job_id,
+                'status': self.status,
+                'stage': self.stage,
+                'percent': self.percent,
+                'error': self.error,
+                'embedding': self.get_embedding_frame()
+                }
+
+
+class JobManager(object):
+    """
+        A class for executing data processing jobs in the background. The state of the latest
+        jobs is kept, so that the frontend can poll their progress and fetch their results.
+    """
+
+    def __init__(self, max_workers, max_jobs):
+        """
+            The constructor that sets the initialization parameters for the job manager.
+
+            :param max_workers: the number of worker threads that execute jobs.
+            :param max_jobs: the number of jobs whose state is kept, before the oldest finished job is removed.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, function, *args):
+        """
+        Submit a function to be executed in the background. The function receives the job as its
+        first argument to report its progress, and its return value is stored as the job result.
+
+            :param function: the function to execute.
+            :param args: the further arguments of the function.
+            :return: the id of the submitted job.
+        """
+        job = Job(uuid.uuid4().hex)
+        with self.lock:
+            self.jobs[job.job_id] = job
+            self.remove_finished_jobs()
+
+        self.executor.submit(self.run, job, function, *args)
+        return job.job_id
+
+    def run(self, job, function, *args):
+        """
+        Execute the function of a job and store its result or the error that occurred.
+
+            :param job: the job to execute.
+            :param function: the function to execute.
+            :param args: the further arguments of the function.
+        """
+        job.status = JobStatus.RUNNING
+        try:
+            job.result = function(job, *args)
+            job.percent = 100
+            job.status = JobStatus.DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            print("Job " + job.job_id + " failed: " + str(e))
+
+    def get_job(self, job_id):
+        """
+        Get a job by its id.
+
+            :param job_id: the id of the job.
+            :return: the job, or `None` if no job with this id is known.
+        """
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def remove_finished_jobs(self):
+        """
+            Remove the oldest finished jobs, if more than `max_jobs` jobs are stored.
+        """
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status in (JobStatus.DONE, JobStatus.FAILED)]
+        while len(self.jobs) > self.max_jobs and len(finished) > 0:
+            del self.jobs[finished.pop(0)]
@@ -19,44 +19,120 @@ from source.InterfaceOptions import Clustering
 from source.InterfaceOptions import Scaling
 
 import source.FileWriter as fw
-
+from source.StageCache import StageCache
+from source.PipelineState import PipelineState
+from source.ResultStore import ResultStore
+from source.processing.SchemaProfile import SchemaProfile
+from source.processing.MissingnessBitmap import MissingnessBitmap
+import source.processing.ChainAgreement as ca
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import copy
 import pandas as pd
 
 
+# data manager of a worker process of the precalculation, the multiple imputation or the comparison of reductions
+worker_manager = None
+
+
+def init_manager_worker(manager):
+    """
+    Initialize a worker process of the precalculation, the multiple imputation or the comparison of reductions
+    with the data manager.
+
+        :param manager: the data manager transferred to the worker process.
+    """
+    global worker_manager
+    worker_manager = manager
+
+
+def precalculate_options(task):
+    """
+    Precalculate and store the results of all combinations of options with the same imputation method,
+    outlier removal and scaling. The loops are ordered from upstream to downstream stages, so that the
+    stage cache of the worker reuses the scaled data for all its downstream combinations.
+
+        :param task: the tuple of the imputation method, the outlier removal and the scaling.
+        :return: the number of results that were calculated and stored.
+    """
+    imputation, out_removal, scaling = task
+    manager = worker_manager
+    stored_results = 0
+
+    for dim_reduction in DimReduction:
+        for clustering in Clustering:
+            state = PipelineState()
+            state.imputation = imputation
+            state.out_removal = out_removal
+            state.scaling = scaling
+            state.dim_reduction = dim_reduction
+            state.clustering = clustering
+
+            key = manager.get_stage_keys(state)['analysis']
+            if manager.result_store.contains(key):
+                continue
+
+            try:
+                manager.get_data_of_selected_options(state)
+            except Exception as e:
+                print("Options " + str(key[len(manager.input_key):]) + " could not be precalculated: " + str(e))
+                continue
+
+            manager.result_store.put(key, state.get_results())
+            stored_results += 1
+
+    return stored_results
+
+
+def process_imputation_chain(task):
+    """
+    Process the data imputed by one chain of the multiple imputation with the options of a session
+    from the merge to the clustering.
+
+        :param task: the tuple of the selected options and the clinical data imputed by the chain.
+        :return: the ids of the processed samples, their embedding and their cluster labels.
+    """
+    options, imputed_clinical_data = task
+    state = PipelineState()
+    state.set_options(options)
+    return worker_manager.compute_chain_results(state, imputed_clinical_data)
+
+
+def process_reduction(task):
+    """
+    Reduce the dimensionality of the scaled data of a session with one method, to compare all methods.
+
+        :param task: the tuple of the selected options, the scaled data of the selected samples
+        and the scaled data of all samples.
+        :return: the reduced data.
+    """
+    options, selected_data, scaled_data = task
+    state = PipelineState()
+    state.set_options(options)
+    return worker_manager.compute_reduced_data(state, selected_data, scaled_data)
+
+
 class ManageData(object):
     """
         A class for managing the data.
     """
 
-    # default values of options
-    imputation = Imputation.BEST
-    out_removal = OutlierRemoval.NO
-    dim_reduction = DimReduction.UMAP
-    clustering = Clustering.KMEANS
-    scaling = Scaling.NORM
-    indices = []
-    features = []
-    clusters = []
+    # dimensionality reductions whose embedding of all samples is kept for a selected subset of samples
+    cohort_embedding_reductions = [DimReduction.UMAP, DimReduction.PCA]
+
+    # processing stages in the order of their execution
+    stages = ['imputation', 'merge', 'outlier_removal', 'scaling', 'subset', 'reduction', 'clustering', 'agreement',
+              'analysis']
 
     def __init__(self):
         """
             The constructor that sets the initialization parameters for the data manager.
-            Process the data by calling all methods and functions to read and handle the data.
-        """
-
-        self.dataset_tag = None
-        self.clustered_stand_data_list = None
-        self.clustered_norm_data_list = None
-        self.reduced_stand_data_list = None
-        self.reduced_norm_data_list = None
-        self.data_imp_list_for_hovering_and_table = None
-        self.merged_data_for_vis = None
-        self.weights_sgd = None
-        self.weights_lda = None
-        self.shap_data = None
-        self.clustered_data = None
-        self.reduced_data = None
-        self.clean_merged_imputed_data_no_encoding = None
+            Read the input data that is shared read-only by all sessions, and process it
+            with the default options.
+        """
+
         self.missing_data_handler = ImputeData()
         self.file_reader = ReadData()
         self.file_merger = MergeData()
@@ -71,126 +147,564 @@ class ManageData(object):
 
         self.clinical_data = self.file_reader.get_clinical_data()
         self.orig_clinical_data = self.clinical_data.copy()
+        self.encoded_clinical_data = self.categorical_data_handler.encode_categorical_values(
+            self.clinical_data.copy())
 
         self.genomic_data = self.file_reader.get_genomic_data()
         self.radiomic_data = self.file_reader.get_radiomic_data()
 
-        self.get_data_of_selected_options()
+        # build the key indices of the modalities that are merged with the imputed clinical data
+        self.file_merger.set_modalities([self.radiomic_data, self.genomic_data], Opt.ID.value)
+
+        # profile the columns once, so that the stages do not derive them from the data on every request
+        self.schema_profile = SchemaProfile([('clinical', self.encoded_clinical_data),
+                                             ('clinical', self.clinical_data),
+                                             ('radiomic', self.radiomic_data),
+                                             ('genomic', self.genomic_data)])
+
+        # record the originally missing values of all modalities, to mark the imputed values of the merged data
+        self.missingness = [MissingnessBitmap.from_data(self.encoded_clinical_data, Opt.ID.value),
+                            MissingnessBitmap.from_data(self.clinical_data, Opt.ID.value),
+                            MissingnessBitmap.from_data(self.radiomic_data, Opt.ID.value),
+                            MissingnessBitmap.from_data(self.genomic_data, Opt.ID.value)]
+
+        self.stage_cache = StageCache(Opt.stage_cache_size.value)
+        self.result_store = ResultStore(Opt.result_folder.value)
+        self.input_key = (dfo.get_data_fingerprint(self.clinical_data),
+                          dfo.get_data_fingerprint(self.radiomic_data),
+                          dfo.get_data_fingerprint(self.genomic_data))
+
+        # evaluate the imputation methods on the complete samples, to store the best method per feature for BEST
+        if Opt.evaluate_best_imputation_method_for_data.value:
+            self.missing_data_handler.evaluate_best_imputation_methods(self.encoded_clinical_data.copy())
+
+        # worker processes of the precalculation, the multiple imputation and the comparison of reductions,
+        # started on first use and reused by all requests
+        self.process_pool = None
+        self.process_pool_lock = threading.Lock()
+
+        self.default_state = PipelineState()
+        self.get_data_of_selected_options(self.default_state)
+
+    def get_process_pool(self):
+        """
+        Get the process pool of the data manager. The pool is started on first use and reused, so that each
+        worker process receives the data manager only once, when it is started.
 
-    def get_data_of_selected_options(self):
+            :return: the process pool, whose workers hold a copy of the data manager.
         """
-            Process the data with the selected options.
+        with self.process_pool_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(
+                    max_workers=Opt.number_of_processes.value,
+                    mp_context=multiprocessing.get_context(Opt.process_start_method.value),
+                    initializer=init_manager_worker, initargs=(self,))
+            return self.process_pool
+
+    def create_state(self):
         """
-        # encode categorical values of clinical data, except for FAMD
-        encoded_clinical_data = self.clinical_data.copy()
+        Create the pipeline state of a new session with the default options. The results of the default
+        options are processed once at startup and copied, so that a new session does not process the data.
 
-        if self.dim_reduction != DimReduction.FAMD:
-            encoded_clinical_data = self.categorical_data_handler.encode_categorical_values(
-                self.clinical_data.copy())
+            :return: the pipeline state with the default options and their results.
+        """
+        state = PipelineState()
+        state.set_options(self.default_state.get_options())
+        state.set_results(copy.deepcopy(self.default_state.get_results()))
+        return state
 
-        # handle imputation - based on selection
-        imputed_clinical_data = self.handle_imputation(encoded_clinical_data.copy())
+    def get_data_of_selected_options(self, state, progress=None):
+        """
+        Process the data with the options selected in a session and store the results in its state.
+        If the results of these options are precalculated in the result store, they are loaded from it.
+        Otherwise, the result of each stage is cached with a key of all upstream options and inputs and
+        shared by all sessions. Therefore, only the stages downstream of a changed option are recomputed.
+
+            :param state: the pipeline state of the session.
+            :param progress: an optional function that receives the name of the current stage
+            and the percentage of the processing that is complete.
+        """
+        keys = self.get_stage_keys(state)
+
+        stored_results = self.result_store.get(keys['analysis'])
+        if stored_results is not None:
+            state.set_results(stored_results)
+            print("Data loaded from the result store")
+            return
+
+        self.report_progress(progress, 'imputation')
+        imputed_clinical_data = self.stage_cache.get_or_compute(
+            'imputation', keys['imputation'], lambda: self.compute_imputed_clinical_data(state))
 
         # feature list per dataset without index and id to send it to frontend
-        self.dataset_tag = {'clinical': imputed_clinical_data.columns[1:].tolist(),
-                            'radiomic': self.radiomic_data.columns[2:].tolist(),
-                            'genomic': self.genomic_data.columns[2:].tolist()
-                            }
+        state.dataset_tag = {'clinical': imputed_clinical_data.columns[1:].tolist(),
+                             'radiomic': self.radiomic_data.columns[2:].tolist(),
+                             'genomic': self.genomic_data.columns[2:].tolist()
+                             }
+
+        self.report_progress(progress, 'merge')
+        clean_merged_data = self.stage_cache.get_or_compute(
+            'merge', keys['merge'], lambda: self.compute_merged_data(state, imputed_clinical_data))
+        state.clean_merged_imputed_data_no_encoding = clean_merged_data.copy()
+        state.missingness = self.stage_cache.get_or_compute(
+            'missingness', keys['merge'], lambda: self.compute_merged_missingness(clean_merged_data))
+
+        self.report_progress(progress, 'outlier_removal')
+        data_out_rem = self.stage_cache.get_or_compute(
+            'outlier_removal', keys['outlier_removal'],
+            lambda: self.compute_data_without_outliers(state, clean_merged_data))
+
+        self.report_progress(progress, 'scaling')
+        scaled_data = self.stage_cache.get_or_compute(
+            'scaling', keys['scaling'], lambda: self.compute_scaled_data(state, data_out_rem))
+
+        self.report_progress(progress, 'subset')
+        selected_data = self.stage_cache.get_or_compute(
+            'subset', keys['subset'], lambda: self.compute_selected_subset(state, scaled_data))
+
+        self.report_progress(progress, 'reduction')
+        reduced_data = self.stage_cache.get_or_compute(
+            'reduction', keys['reduction'],
+            lambda: self.compute_reduced_data(state, selected_data, scaled_data, keys['scaling']))
+        state.reduced_data = reduced_data.copy()
+
+        self.report_progress(progress, 'clustering')
+        labels = self.stage_cache.get_or_compute(
+            'clustering', keys['clustering'], lambda: self.compute_cluster_labels(state, reduced_data))
+        state.clustered_data = labels.copy()
+
+        state.label_agreement, state.chain_embeddings = None, None
+        if state.imputation == Imputation.MULTI:
+            self.report_progress(progress, 'agreement')
+            state.label_agreement, state.chain_embeddings = self.stage_cache.get_or_compute(
+                'agreement', keys['clustering'],
+                lambda: self.compute_label_agreement(state, selected_data, reduced_data, labels))
+
+        self.report_progress(progress, 'analysis')
+        state.shap_data, state.weights_lda, state.weights_sgd = self.stage_cache.get_or_compute(
+            'analysis', keys['analysis'],
+            lambda: self.compute_cluster_features(state, data_out_rem, selected_data, labels))
+
+        print("Data successfully processed")
+
+    def get_all_reductions(self, state, progress=None):
+        """
+        Reduce the dimensionality of the data of a session with all methods in parallel, to compare them
+        side by side, while the other options of the session are kept. Each reduction is cached like the
+        reduction of the selected method, so that a compared method is not computed again when it is selected.
+
+            :param state: the pipeline state of the session.
+            :param progress: an optional function that receives the name of the finished method
+            and the percentage of the methods that are finished.
+            :return: the dictionary of the reduced data per dimensionality reduction method.
+        """
+        reductions = {}
+        tasks = []
+        for dim_reduction in DimReduction:
+            method_state = PipelineState()
+            method_state.set_options(state.get_options())
+            method_state.dim_reduction = dim_reduction
+            keys = self.get_stage_keys(method_state)
+
+            reduced_data = self.get_cached_reduction(keys)
+            if reduced_data is not None:
+                reductions[dim_reduction] = reduced_data
+                continue
+
+            # FAMD reduces the data without encoded categorical values, which has its own upstream stages
+            scaled_data, selected_data = self.get_selected_data(method_state, keys)
+            tasks.append((dim_reduction, keys['reduction'], (method_state.get_options(), selected_data, scaled_data)))
+
+        if len(tasks) > 0:
+            results = self.get_process_pool().map(process_reduction, [task for _, _, task in tasks])
+            for (dim_reduction, key, _), reduced_data in zip(tasks, results):
+                self.stage_cache.put('reduction', key, reduced_data)
+                reductions[dim_reduction] = reduced_data
+                if progress is not None:
+                    progress(dim_reduction.value, round(100 * len(reductions) / len(DimReduction)))
+
+        return {dim_reduction: reductions[dim_reduction] for dim_reduction in DimReduction}
+
+    def get_cached_reduction(self, keys):
+        """
+        Get the reduced data from the stage cache, or from the result store if the options are precalculated.
 
-        # merge all datasets
-        merged_data = self.file_merger.merge_data(
-            [imputed_clinical_data, self.radiomic_data, self.genomic_data], Opt.ID.value)
-        clean_merged_data = self.file_merger.clean_merged_data(merged_data)
+            :param keys: the cache keys of the stages.
+            :return: the reduced data, or `None` if it is neither cached nor stored.
+        """
+        reduced_data = self.stage_cache.get('reduction', keys['reduction'])
+        if reduced_data is not None:
+            return reduced_data
+
+        stored_results = self.result_store.get(keys['analysis'])
+        if stored_results is not None:
+            return stored_results['reduced_data']
+
+        return None
+
+    def get_selected_data(self, state, keys):
+        """
+        Get the scaled data of all samples and of the selected samples, whose stages are computed
+        and cached like in `get_data_of_selected_options`, unless they are already cached.
+
+            :param state: the pipeline state with the selected options.
+            :param keys: the cache keys of the stages.
+            :return: the scaled data of all samples and the scaled data of the selected samples.
+        """
+        imputed_clinical_data = self.stage_cache.get_or_compute(
+            'imputation', keys['imputation'], lambda: self.compute_imputed_clinical_data(state))
+        clean_merged_data = self.stage_cache.get_or_compute(
+            'merge', keys['merge'], lambda: self.compute_merged_data(state, imputed_clinical_data))
+        data_out_rem = self.stage_cache.get_or_compute(
+            'outlier_removal', keys['outlier_removal'],
+            lambda: self.compute_data_without_outliers(state, clean_merged_data))
+        scaled_data = self.stage_cache.get_or_compute(
+            'scaling', keys['scaling'], lambda: self.compute_scaled_data(state, data_out_rem))
+        selected_data = self.stage_cache.get_or_compute(
+            'subset', keys['subset'], lambda: self.compute_selected_subset(state, scaled_data))
+
+        return scaled_data, selected_data
+
+    def get_stage_keys(self, state):
+        """
+        Get the cache key of each processing stage. A key consists of the fingerprints of the input
+        data and all options that the stage and its upstream stages depend on.
+
+            :param state: the pipeline state with the selected options.
+            :return: the dictionary of the keys per stage.
+        """
+        keys = {'imputation': self.input_key + (state.imputation, state.dim_reduction == DimReduction.FAMD)}
+        keys['merge'] = keys['imputation'] + (tuple(state.features) if len(state.features) > 1 else (),)
+        keys['outlier_removal'] = keys['merge'] + (state.out_removal,)
+        keys['scaling'] = keys['outlier_removal'] + (state.scaling,)
+        keys['subset'] = keys['scaling'] + (tuple(state.indices),)
+        keys['reduction'] = keys['subset'] + (state.dim_reduction, self.uses_cohort_embedding(state))
+        keys['clustering'] = keys['reduction'] + (state.clustering, tuple(state.clusters))
+        keys['analysis'] = keys['clustering']
+        return keys
+
+    def report_progress(self, progress, stage):
+        """
+        Report the processing stage that starts and the percentage of the processing that is complete.
+
+            :param progress: the function that receives the progress, or `None` if it is not reported.
+            :param stage: the name of the stage that starts.
+        """
+        if progress is not None:
+            progress(stage, round(100 * self.stages.index(stage) / len(self.stages)))
+
+    def get_clinical_data_to_impute(self, state):
+        """
+        Get the clinical data with encoded categorical values, except for FAMD.
+
+            :param state: the pipeline state with the selected options.
+            :return: the clinical data to impute.
+        """
+        # the categorical values are encoded once when loading the data
+        if state.dim_reduction != DimReduction.FAMD:
+            return self.encoded_clinical_data
+
+        return self.clinical_data
+
+    def compute_imputed_clinical_data(self, state):
+        """
+        Encode categorical values of the clinical data, except for FAMD, and impute them.
+
+            :param state: the pipeline state with the selected options.
+            :return: the encoded and imputed clinical data.
+        """
+        # handle imputation - based on selection
+        return self.handle_imputation(self.get_clinical_data_to_impute(state).copy(), state.imputation)
+
+    def compute_merged_data(self, state, imputed_clinical_data):
+        """
+        Merge the imputed clinical data with the radiomic and genomic data and keep the selected features.
+
+            :param state: the pipeline state with the selected options.
+            :param imputed_clinical_data: the encoded and imputed clinical data.
+            :return: the merged data with the selected features.
+        """
+        clean_merged_data = self.file_merger.merge_with_modalities(imputed_clinical_data)
 
         # get only selected columns of a dataframe
-        if len(self.features) > 1:
-            clean_merged_data = clean_merged_data.filter(self.features, axis=1)
+        if len(state.features) > 1:
+            clean_merged_data = clean_merged_data.filter(state.features, axis=1)
+
+        return clean_merged_data
+
+    def compute_merged_missingness(self, clean_merged_data):
+        """
+        Align the missingness bitmaps of the modalities with the merged data by the sample ids in its first column.
 
-        self.clean_merged_imputed_data_no_encoding = clean_merged_data.copy()
+            :param clean_merged_data: the merged data.
+            :return: the missingness bitmap of the originally missing values of the merged data.
+        """
+        return MissingnessBitmap.merge(self.missingness, clean_merged_data.iloc[:, 0], clean_merged_data.columns)
+
+    def compute_data_without_outliers(self, state, clean_merged_data):
+        """
+        Remove outliers from the merged data based on the selected option.
 
-        # outlier removal - based on selection
+            :param state: the pipeline state with the selected options.
+            :param clean_merged_data: the merged data.
+            :return: the merged data without outliers.
+        """
         data_out_rem = clean_merged_data.copy()
-        if self.out_removal == OutlierRemoval.GLOBAL:
+        if state.out_removal == OutlierRemoval.GLOBAL:
             data_out_rem = self.outlier_detector.remove_global_outliers(
-                clean_merged_data)
-        elif self.out_removal == OutlierRemoval.LOCAL:
+                clean_merged_data, self.schema_profile)
+        elif state.out_removal == OutlierRemoval.LOCAL:
             data_out_rem = self.outlier_detector.remove_local_outliers(
-                clean_merged_data)
+                clean_merged_data, self.schema_profile)
 
-        selected_lda_data = data_out_rem.copy()
-        lda_input_data = data_out_rem.copy()
-        if len(self.indices) > 0:
-            selected_lda_data.set_index(
-                selected_lda_data.columns[0], inplace=True)
-            lda_input_data = selected_lda_data.iloc[self.indices].copy()
-
-        # scaling
-        if self.scaling == Scaling.STAND:
-            scaled_data = self.data_scaler.standardize_data(data_out_rem)
-        else:
-            scaled_data = self.data_scaler.normalize_data(data_out_rem)
+        return data_out_rem
 
-        # reduction
-        reduced_data = scaled_data.copy()
-        selected_data = scaled_data.copy()
+    def compute_scaled_data(self, state, data_out_rem):
+        """
+        Scale the data based on the selected option.
 
-        if len(self.indices) > 0:
+            :param state: the pipeline state with the selected options.
+            :param data_out_rem: the data without outliers.
+            :return: the scaled data.
+        """
+        if state.scaling == Scaling.STAND:
+            return self.data_scaler.standardize_data(data_out_rem.copy(), self.schema_profile)
+
+        return self.data_scaler.normalize_data(data_out_rem.copy(), self.schema_profile)
+
+    def compute_selected_subset(self, state, scaled_data):
+        """
+        Get the subset of the scaled data that is selected in the frontend.
+
+            :param state: the pipeline state with the selected options.
+            :param scaled_data: the scaled data.
+            :return: the selected samples of the scaled data, or all samples if none are selected.
+        """
+        if len(state.indices) > 0:
+            selected_data = scaled_data.copy()
             selected_data.set_index(selected_data.columns[0], inplace=True)
-            scaled_data = selected_data.iloc[self.indices].copy()
+            return selected_data.iloc[state.indices].copy()
+
+        return scaled_data
+
+    def uses_cohort_embedding(self, state):
+        """
+        Check whether the selected samples keep their positions in the embedding of all samples. This is the case
+        for UMAP and PCA, unless a subset of samples is selected that should be reduced anew.
+
+            :param state: the pipeline state with the selected options.
+            :return: `true` if the embedding of all samples is used, otherwise `false`.
+        """
+        return state.dim_reduction in self.cohort_embedding_reductions and (len(state.indices) == 0
+                                                                            or not state.refit_subset)
+
+    def get_cohort_embedding(self, state, scaled_data, embedding_key=None):
+        """
+        Get the UMAP or PCA embedding of all samples of the scaled data. The embedding is cached with
+        the key of the scaling stage, so that it is computed once for all subsets.
 
-        mask = dfo.get_all_numeric_features(scaled_data)
-        if self.dim_reduction == DimReduction.UMAP:
+            :param state: the pipeline state with the selected options.
+            :param scaled_data: the scaled data of all samples.
+            :param embedding_key: the cache key of the scaled data, or `None` if the embedding is not cached.
+            :return: the embedding of all samples.
+        """
+        if embedding_key is None:
+            return self.reduce_data(state, scaled_data)
+
+        return self.stage_cache.get_or_compute('cohort_embedding', embedding_key + (state.dim_reduction,),
+                                               lambda: self.reduce_data(state, scaled_data))
+
+    def compute_reduced_data(self, state, selected_data, scaled_data=None, embedding_key=None):
+        """
+        Reduce the dimensionality of the scaled data based on the selected option. With UMAP and PCA, a selected
+        subset keeps the positions of its samples in the embedding of all samples, which keeps the layout stable,
+        unless `refit_subset` is set. Otherwise, the selected samples are reduced anew.
+
+            :param state: the pipeline state with the selected options.
+            :param selected_data: the scaled data of the selected samples.
+            :param scaled_data: the scaled data of all samples, or `None` to reduce the selected samples anew.
+            :param embedding_key: the cache key of the scaled data of all samples, or `None` if the embedding
+            is not cached.
+            :return: the reduced data.
+        """
+        if scaled_data is not None and self.uses_cohort_embedding(state):
+            embedding = self.get_cohort_embedding(state, scaled_data, embedding_key)
+            if len(state.indices) == 0:
+                return embedding.copy()
+
+            return embedding.iloc[state.indices].reset_index(drop=True)
+
+        return self.reduce_data(state, selected_data)
+
+    def reduce_data(self, state, scaled_data):
+        """
+        Reduce the dimensionality of the scaled data with the selected method.
+
+            :param state: the pipeline state with the selected options.
+            :param scaled_data: the scaled data to reduce.
+            :return: the reduced data.
+        """
+        reduced_data = scaled_data.copy()
+        columns = dfo.get_numeric_feature_names(scaled_data, self.schema_profile)
+        if state.dim_reduction == DimReduction.UMAP:
             reduced_data = self.data_reducer.apply_umap(
-                scaled_data[mask.columns])
-        elif self.dim_reduction == DimReduction.PCA:
+                scaled_data[columns], self.schema_profile)
+        elif state.dim_reduction == DimReduction.PCA:
             reduced_data = self.data_reducer.apply_pca(
-                scaled_data[mask.columns])
-        elif self.dim_reduction == DimReduction.TSNE:
+                scaled_data[columns])
+        elif state.dim_reduction == DimReduction.TSNE:
             reduced_data = self.data_reducer.apply_tsne(
-                scaled_data[mask.columns])
-        elif self.dim_reduction == DimReduction.MDS:
+                scaled_data[columns])
+        elif state.dim_reduction == DimReduction.MDS:
             reduced_data = self.data_reducer.apply_mds(
-                scaled_data[mask.columns])
-        elif self.dim_reduction == DimReduction.FAMD:
-            reduced_data = self.data_reducer.apply_famd(scaled_data)
-        self.reduced_data = reduced_data.copy()
+                scaled_data[columns])
+        elif state.dim_reduction == DimReduction.FAMD:
+            reduced_data = self.data_reducer.apply_famd(scaled_data.copy())
+
+        return reduced_data
+
+    def compute_cluster_labels(self, state, reduced_data):
+        """
+        Cluster the reduced data based on the selected option, unless the clusters are defined in the frontend.
 
-        # clustering
+            :param state: the pipeline state with the selected options.
+            :param reduced_data: the reduced data.
+            :return: the labels of the clusters.
+        """
         labels = []
-        if len(self.clusters) > 0:
-            labels = self.clusters
+        if len(state.clusters) > 0:
+            labels = state.clusters
 
         else:
-            if self.clustering == Clustering.KMEANS:
+            if state.clustering == Clustering.KMEANS:
                 labels = self.clustering_handler.kmeans_clustering(
                     reduced_data)
-            elif self.clustering == Clustering.MSHIFT:
+            elif state.clustering == Clustering.MSHIFT:
                 labels = self.clustering_handler.mean_shift_clustering(
                     reduced_data)
-            elif self.clustering == Clustering.HIERA4:
+            elif state.clustering == Clustering.HIERA4:
                 labels = self.clustering_handler.hierarchical_clustering(
                     reduced_data)
-            elif self.clustering == Clustering.HIERA6:
+            elif state.clustering == Clustering.HIERA6:
                 labels = self.clustering_handler.hierarchical_clustering_2(
                     reduced_data)
-            elif self.clustering == Clustering.DBSCAN:
+            elif state.clustering == Clustering.DBSCAN:
                 labels = self.clustering_handler.dbscan_clustering(
                     reduced_data)
-            elif self.clustering == Clustering.OPTICS:
+            elif state.clustering == Clustering.OPTICS:
                 labels = self.clustering_handler.optics_clustering(
                     reduced_data)
-            elif self.clustering == Clustering.GMM:
+            elif state.clustering == Clustering.GMM:
                 labels = self.clustering_handler.gmm_clustering(reduced_data)
-        self.clustered_data = labels.copy()
+
+        return labels
+
+    def get_imputation_chains(self, data):
+        """
+        Get the clinical data imputed by each chain of the multiple imputation. The chains are imputed
+        once per clinical data and shared by the pooled imputation and the label agreement.
+
+            :param data: the clinical data with missingness.
+            :return: the list of the clinical data imputed by each chain.
+        """
+        return self.stage_cache.get_or_compute(
+            'imputation_chains', dfo.get_data_fingerprint(data), lambda: self.compute_imputation_chains(data))
+
+    def compute_imputation_chains(self, data):
+        """
+        Impute the clinical data by the chains of the multiple imputation in parallel.
+
+            :param data: the clinical data with missingness.
+            :return: the list of the clinical data imputed by each chain.
+        """
+        columns = dfo.get_numeric_feature_names(data, self.schema_profile)
+        col_names = self.schema_profile.get_column_names_with_missing_data(data)
+
+        chains = []
+        for imputed_data in self.missing_data_handler.apply_multiple_imputation(data[columns], col_names,
+                                                                                  self.get_process_pool()):
+            chain = data.copy()
+            chain[columns] = imputed_data
+            chains.append(chain)
+
+        return chains
+
+    def compute_chain_results(self, state, imputed_clinical_data):
+        """
+        Process the clinical data imputed by one chain from the merge to the clustering, like
+        `get_data_of_selected_options` without the stage cache.
+
+            :param state: the pipeline state with the selected options.
+            :param imputed_clinical_data: the clinical data imputed by the chain.
+            :return: the ids of the processed samples, their embedding and their cluster labels.
+        """
+        clean_merged_data = self.compute_merged_data(state, imputed_clinical_data)
+        data_out_rem = self.compute_data_without_outliers(state, clean_merged_data)
+        scaled_data = self.compute_scaled_data(state, data_out_rem)
+        selected_data = self.compute_selected_subset(state, scaled_data)
+        reduced_data = self.compute_reduced_data(state, selected_data, scaled_data)
+        labels = self.compute_cluster_labels(state, reduced_data)
+
+        return self.get_sample_ids(state, selected_data), reduced_data.iloc[:, :2].to_numpy(dtype=float), labels
+
+    def compute_label_agreement(self, state, scaled_data, reduced_data, labels):
+        """
+        Process the data of each chain of the multiple imputation in parallel with the options of the session,
+        and compare the embeddings and cluster labels of each chain with the ones of the pooled imputation.
+
+            :param state: the pipeline state with the selected options.
+            :param scaled_data: the scaled data of the selected samples of the pooled imputation.
+            :param reduced_data: the reduced data of the pooled imputation.
+            :param labels: the labels of the clusters of the pooled imputation.
+            :return: the agreement of the cluster label per patient and the aligned embedding of each chain.
+        """
+        chains = self.get_imputation_chains(self.get_clinical_data_to_impute(state).copy())
+        tasks = [(state.get_options(), chain) for chain in chains]
+
+        chain_results = list(self.get_process_pool().map(process_imputation_chain, tasks))
+
+        return ca.get_label_agreement(self.get_sample_ids(state, scaled_data),
+                                      reduced_data.iloc[:, :2].to_numpy(dtype=float), labels, chain_results)
+
+    @staticmethod
+    def get_sample_ids(state, scaled_data):
+        """
+        Get the ids of the samples of the scaled data, which are the first column of the data,
+        or its index if a subset of samples is selected.
+
+            :param state: the pipeline state with the selected options.
+            :param scaled_data: the scaled data of the selected samples.
+            :return: the array of the sample ids.
+        """
+        if len(state.indices) > 0:
+            return scaled_data.index.to_numpy()
+
+        return scaled_data.iloc[:, 0].to_numpy()
+
+    def compute_cluster_features(self, state, data_out_rem, scaled_data, labels):
+        """
+        Calculate the SHAP values and the pairwise LDA and SGD weights of the features for the clusters.
+
+            :param state: the pipeline state with the selected options.
+            :param data_out_rem: the data without outliers and scaling.
+            :param scaled_data: the scaled data of the selected samples.
+            :param labels: the labels of the clusters.
+            :return: a tuple of the SHAP values, the LDA weights and the SGD weights.
+        """
+        lda_input_data = data_out_rem.copy()
+        if len(state.indices) > 0:
+            lda_input_data.set_index(
+                lda_input_data.columns[0], inplace=True)
+            lda_input_data = lda_input_data.iloc[state.indices].copy()
 
         # shap values
+        columns = dfo.get_numeric_feature_names(scaled_data, self.schema_profile)
         shap_values = self.shap_handler.calculate_shap_values(
-            scaled_data[mask.columns].copy(), labels)
-        self.shap_data = shap_values.copy()
+            scaled_data[columns].copy(), labels, self.schema_profile)
 
         # all feature values of first class (e.g. 0) and second class (e.g. 1) as input
         # identify features that differentiate the most between both groups as output
-        lda_input = lda_input_data[mask.columns].copy()
+        lda_input = lda_input_data[columns].copy()
         lda_input['labels'] = labels
 
         # at least two clusters and no NaN values
@@ -198,121 +712,96 @@ class ManageData(object):
             lda_input_data.isnull().values.any())
 
         if lda_sgd_possible:
-            self.weights_lda = self.inter_handler.get_features_by_LDA_classifier(
+            weights_lda = self.inter_handler.get_features_by_LDA_classifier(
                 lda_input, labels)
 
-            self.weights_sgd = self.inter_handler.get_features_by_SGD_classifier(
+            weights_sgd = self.inter_handler.get_features_by_SGD_classifier(
                 lda_input, labels)
         else:
-            self.weights_lda = pd.DataFrame()
-            self.weights_sgd = pd.DataFrame()
+            weights_lda = pd.DataFrame()
+            weights_sgd = pd.DataFrame()
 
-        print("Data successfully processed")
+        return shap_values, weights_lda, weights_sgd
 
     def precalculate_and_store_all_options(self):
         """
-            Precalculate and store all result of all options. This method is replaced
-            by the "getDataOfSelectedOptions" method to widen the interaction possibilities.
+        Precalculate the results of all combinations of options for the whole dataset and store them
+        in the result store, from which they are loaded by `get_data_of_selected_options`. Each combination
+        of imputation method, outlier removal and scaling is processed in its own task, where its scaled data
+        is reused for all combinations of dimensionality reduction and clustering. Results that are already
+        stored are skipped, so an interrupted precalculation continues where it stopped.
+
+            :return: the number of results that were calculated and stored.
         """
-        self.missing_data_handler = ImputeData()
-        self.file_reader = ReadData()
-        self.file_merger = MergeData()
-        self.categorical_data_handler = EncodeData()
-        self.missing_data_handler = ImputeData()
-        self.data_scaler = ScaleData()
-        self.outlier_detector = DetectOutliers()
-        self.data_reducer = ReduceData()
-        self.clustering_handler = ClusterData()
-        self.shap_handler = ShapValues()
+        # the multiple imputation runs its chains on its own process pool, so it is not precalculated
+        tasks = [(imputation, out_removal, scaling) for imputation in Imputation if imputation != Imputation.MULTI
+                 for out_removal in OutlierRemoval for scaling in Scaling]
+        stored_results = sum(self.get_process_pool().map(precalculate_options, tasks))
+
+        print(str(stored_results) + " results precalculated and stored")
+        return stored_results
 
-        clinical_data = self.file_reader.get_clinical_data()
-        self.orig_clinical_data = clinical_data.copy()
-
-        genomic_data = self.file_reader.get_genomic_data()
-        radiomic_data = self.file_reader.get_radiomic_data()
-
-        # impute encoded clinical data with BEST, MICE, KNN, CONST methods and save results in a list
-        clinical_data_list = self.missing_data_handler.impute_missing_values(
-            self.categorical_data_handler.encode_categorical_values(clinical_data))
-
-        self.merged_data_for_vis = self.file_merger.get_merged_data(
-            clinical_data_list.copy(), genomic_data, radiomic_data)
-        self.data_imp_list_for_hovering_and_table = self.merged_data_for_vis
-
-        # merge datasets
-        merged_data_list = self.file_merger.get_merged_data(
-            clinical_data_list, genomic_data, radiomic_data)
-
-        # remove outliers
-        best_without_global_outliers = self.outlier_detector.remove_global_outliers(
-            merged_data_list[0].copy())
-        best_without_local_outliers = self.outlier_detector.remove_local_outliers(
-            merged_data_list[0].copy())
-        merged_data_list.append(best_without_global_outliers)
-        merged_data_list.append(best_without_local_outliers)
-
-        # normalize/standardize data
-        normalized_data_list = self.data_scaler.normalize_data_list(
-            merged_data_list)
-        standardized_data_list = self.data_scaler.standardize_data_list(
-            merged_data_list)
-
-        # reduce data
-        self.reduced_norm_data_list = self.data_reducer.get_reduced_data(
-            normalized_data_list)
-        self.reduced_stand_data_list = self.data_reducer.get_reduced_data(
-            standardized_data_list)
-
-        # cluster data
-        self.clustered_norm_data_list = self.clustering_handler.cluster_list(
-            self.reduced_norm_data_list)
-        self.clustered_stand_data_list = self.clustering_handler.cluster_list(
-            self.reduced_stand_data_list)
-
-        # shap values for t-SNE with mean shift
-        tsne_res = normalized_data_list[0].copy()
-        mask = dfo.get_all_numeric_features(tsne_res)
-        tsne_reduced = self.data_reducer.apply_tsne(
-            normalized_data_list[0].copy()[mask.columns])
-        self.clustering_handler.mean_shift_clustering(
-            tsne_reduced)
-
-    def handle_imputation(self, data):
+    def __getstate__(self):
+        """
+        Get the attributes of the data manager to transfer it to another process.
+        The stage cache, the default state and the process pool are not transferred.
+
+            :return: the attributes of the data manager.
+        """
+        attributes = self.__dict__.copy()
+        attributes['stage_cache'] = None
+        attributes['default_state'] = None
+        attributes['process_pool'] = None
+        attributes['process_pool_lock'] = None
+        return attributes
+
+    def __setstate__(self, attributes):
+        """
+        Restore the attributes of the data manager in another process with an empty stage cache
+        and without a process pool.
+
+            :param attributes: the transferred attributes of the data manager.
+        """
+        self.__dict__.update(attributes)
+        self.stage_cache = StageCache(Opt.stage_cache_size.value)
+        self.process_pool_lock = threading.Lock()
+
+    def handle_imputation(self, data, imputation):
         """
         Apply the selected imputation option on the data.
 
             @param data: the data to impute.
+            @param imputation: the selected imputation option.
             @return: the imputed data with no missingness.
         """
-        mask = dfo.get_all_numeric_features(data)
-        col_names = dfo.get_column_names_with_missing_data(data)
-        if self.imputation == Imputation.BEST:
+        columns = dfo.get_numeric_feature_names(data, self.schema_profile)
+        col_names = self.schema_profile.get_column_names_with_missing_data(data)
+        if imputation == Imputation.BEST:
             return self.missing_data_handler.apply_best_imputation_method_per_feature(data, col_names)
-        elif self.imputation == Imputation.MICE:
-            data[mask.columns] = self.missing_data_handler.apply_mice_for_all_features(
-                data[mask.columns], col_names)
+        elif imputation == Imputation.MICE:
+            data[columns] = self.missing_data_handler.apply_mice_for_all_features(
+                data[columns], col_names)
             return data
-        elif self.imputation == Imputation.KNN:
-            data[mask.columns] = self.missing_data_handler.apply_knn_for_all_features(
-                data[mask.columns], col_names)
+        elif imputation == Imputation.MULTI:
+            chains = self.get_imputation_chains(data)
+            data[columns] = self.missing_data_handler.pool_imputations(
+                data[columns], [chain[columns] for chain in chains], col_names)
             return data
-        elif self.imputation == Imputation.CONST:
-            return data.copy().fillna("-1")
-        elif self.imputation == Imputation.HCONST:
-            return data.copy().fillna("1000")
-        elif self.imputation == Imputation.NOIMP:
+        elif imputation == Imputation.KNN:
+            data[columns] = self.missing_data_handler.apply_knn_for_all_features(
+                data[columns], col_names)
+            return data
+        elif imputation == Imputation.CONST:
+            return self.missing_data_handler.apply_constant_for_all_features(
+                data, Opt.constant_imputation_value.value, self.schema_profile)
+        elif imputation == Imputation.HCONST:
+            return self.missing_data_handler.apply_constant_for_all_features(
+                data, Opt.high_constant_imputation_value.value, self.schema_profile)
+        elif imputation == Imputation.NOIMP:
             return data.copy()
-        elif self.imputation == Imputation.COMPL:
+        elif imputation == Imputation.COMPL:
             return dfo.get_complete_samples_of_dataset(data)
 
-    def get_merged_imputed_data_for_hovering_and_table(self):
-        """
-        Get merged, imputed data without one-hot encoding.
-
-            :return: the imputed and merged data.
-        """
-        return self.clean_merged_imputed_data_no_encoding
-
     def get_original_clinical_data(self):
         """
         Get original clinical data without any processing.
@@ -320,51 +809,3 @@ class ManageData(object):
             :return: the original clinical data.
         """
         return self.orig_clinical_data
-
-    def get_reduced_data(self):
-        """
-        Scale and reduce the data to two dimensions.
-
-            :return: the reduced data.
-        """
-        return self.reduced_data
-
-    def get_clustered_data(self):
-        """
-        Get labels that represent the clusters of data.
-
-            :return: the labels of the clusters.
-        """
-        return self.clustered_data
-
-    def get_shap_data(self):
-        """
-        Get SHAP values of clusters.
-
-            :return: the SHAP values of the clusters sorted descending by their values.
-        """
-        return self.shap_data
-
-    def get_lda_data(self):
-        """
-        Get LDA weights of features that discriminate between clusters.
-
-            :return: the LDA features between the clusters sorted descending by their weight.
-        """
-        return self.weights_lda
-
-    def get_sgd_data(self):
-        """
-        Get SGD weights of features that discriminate between clusters.
-
-            :return: the SGD features between the clusters sorted descending by their weight.
-        """
-        return self.weights_sgd
-
-    def get_dataset_tag(self):
-        """
-        Get feature names per dataset to differentiate between them in data filtering.
-
-            :return: the object that holds the feature names per dataset.
-        """
-        return self.dataset_tag
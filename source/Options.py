@@ -49,6 +49,73 @@ class Opt(Enum):
         Min and max boarders for the simulation of missingness in the data.
     """
 
+    imputation_evaluation_file = 'imputation/evaluation/evaluation_errors_data.csv'
+    imputation_checkpoint_size = 50
+    """
+        File in `output_folder` to which the error metrics of the imputation evaluation are appended
+        every `imputation_checkpoint_size` evaluated tasks. An interrupted evaluation resumes from this file,
+        delete it to start a new evaluation.
+    """
+
+    mice_max_iter = 10
+    mice_tol = 1e-3
+    mice_estimator = 'bayesian_ridge'
+    mice_warm_start = True
+    """
+        Maximum number of rounds, tolerance of the stopping condition and estimator
+        ('bayesian_ridge', 'linear_regression', 'extra_trees' or 'knn') of the MICE imputation.
+        If `mice_warm_start` is set, the MICE imputation of a feature subset starts from the
+        previously imputed values of the same samples.
+    """
+
+    constant_imputation_value = -1
+    high_constant_imputation_value = 1000
+    """
+        Constants by which all missing values are imputed for the `CONST` and `HCONST` imputation.
+        Numeric features are filled by the numeric constant and keep their data type.
+    """
+
+    number_of_imputations = 5
+    """
+        Number of MICE chains of the multiple imputation, which are imputed and processed in parallel
+        to compare the cluster label of each patient across the chains.
+    """
+
+    knn_block_size = 512
+    """
+        Number of samples whose neighbor distances are computed together in the KNN imputation.
+    """
+
+    graph_neighbors = 30
+    approximate_neighbors_min_samples = 4096
+    """
+        Number of neighbors of each sample, including the sample itself, in the neighbor graph that is shared by
+        UMAP, t-SNE, the local outlier detection and DBSCAN. For at least `approximate_neighbors_min_samples`
+        samples, the graph is approximated by a nearest neighbor descent. UMAP only uses the shared graph
+        from this number of samples on, below it computes all distances exactly.
+    """
+
+    pre_reduction_max_components = 50
+    pre_reduction_explained_variance = 0.9
+    """
+        Maximum number of components and explained variance of the linear pre-reduction, which t-SNE, MDS and
+        UMAP share to reduce wide scaled data before their nonlinear reduction. Data with at most
+        `pre_reduction_max_components` features is not pre-reduced.
+    """
+
+    mds_smacof_max_samples = 1000
+    mds_landmarks = 300
+    """
+        Maximum number of samples that MDS embeds by SMACOF, which needs the distances between all samples.
+        For more samples, MDS is computed as landmark MDS with `mds_landmarks` randomly selected landmarks.
+    """
+
+    imputation_plan_file = 'imputation/evaluation/imputation_plan.json'
+    """
+        File in `output_folder` that stores the best imputation method per feature, selected from the
+        evaluation results. Delete it to select the methods again after a new evaluation.
+    """
+
     file_type = '.csv'
     separator = ';'
     decimal_point = '.'
@@ -56,26 +123,92 @@ class Opt(Enum):
     encoding = 'UTF-8'
     input_folder = 'data/input/'
     output_folder = 'data/output/'
+    cache_folder = 'data/cache/'
     imputation_path = 'data/output/imputation/'
     """
         For reading and writing files.
     """
 
+    result_folder = 'data/output/results/'
+    result_file_type = '.pkl'
+    precalculate_all_options = False
+    number_of_processes = None
+    """
+        Folder of the precalculated results of all options. Set `precalculate_all_options` to `True`
+        to precalculate missing results when starting the application by `python app.py`, using
+        `number_of_processes` processes (`None` uses all processors).
+    """
+
+    process_start_method = 'spawn'
+    """
+        Start method of the worker processes of the multiple imputation, the evaluation of the imputation
+        methods, the precalculation and the comparison of reductions. Spawned workers do not inherit the
+        threads and held locks of the server, e.g. of the stage cache, and receive the data manager by pickling.
+        As spawned workers import the main module again, `app.py` creates its data manager on first use only.
+    """
+
+    result_store_version = 'v1'
+    """
+        Version of the stored results, which is part of their key together with the options that change the
+        processing results (see `ResultStore.processing_options`). Increase the version to invalidate all
+        stored results, e.g. after changing the processing code.
+    """
+
     server_deployment = False
     server_path = '/home/vaci/htdocs/vaci/data/input/'
     """
         Set to `True` and update server path if deployed on server.
     """
 
+    stage_cache_size = 8
+    """
+        Number of results that are cached per processing stage, before the least recently used one is evicted.
+    """
+
+    number_of_job_workers = 4
+    number_of_stored_jobs = 100
+    """
+        Number of background threads that process the data, and number of jobs whose status is kept for polling.
+    """
+
+    session_id = 'pipeline_session'
+    max_sessions = 32
+    session_idle_timeout = 3600
+    """
+        Cookie key of the session id, maximum number of sessions, and number of seconds
+        after which the pipeline state of an idle session is evicted.
+    """
+
+    sparse_genomic_data = False
+    """
+        Specifies whether the genomic data is stored sparse. This reduces the memory of mostly zero
+        genomic data, and sparse matrices are passed to the methods that support them.
+    """
+
+    use_input_cache = True
+    input_cache_version = 'v2'
+    """
+        Specifies whether the cleaned input data is cached in `cache_folder`. Increase the version
+        to invalidate all cached input data, e.g. after changing the cleanup of the data.
+    """
+
     number_of_bytes = 10000
     """
         Number of bytes analyzed to determine the file encoding.
+        The encoding is determined once per file version and cached in `cache_folder`.
+    """
+
+    use_pyarrow_csv_reader = True
+    """
+        Specifies whether input files are read by the multithreaded CSV reader of `pyarrow`, if it is installed.
     """
 
     X_score = 'X_score'
     Y_score = 'Y_score'
     Z_score = 'Z_score'
     categorical_score = 'clinical stage'
+    categorical_columns = [categorical_score]
+    columns_with_smaller_symbol = [Z_score]
     cohort_number = 'cohort_number'
     """
         Options for feature specific data processing.
@@ -0,0 +1,191 @@
+from source.InterfaceOptions import DimReduction
+from source.InterfaceOptions import Imputation
+from source.InterfaceOptions import OutlierRemoval
+from source.InterfaceOptions import Clustering
+from source.InterfaceOptions import Scaling
+
+import threading
+
+
+class PipelineState(object):
+    """
+        A class for storing the selected options and the processing results of one session.
+    """
+
+    def __init__(self):
+        """
+            The constructor that sets the default options and empty results of the session.
+        """
+        # default values of options
+        self.imputation = Imputation.BEST
+        self.out_removal = OutlierRemoval.NO
+        self.dim_reduction = DimReduction.UMAP
+        self.clustering = Clustering.KMEANS
+        self.scaling = Scaling.NORM
+        self.indices = []
+        self.features = []
+        self.clusters = []
+        self.refit_subset = False
+
+        # results of the processing with the selected options
+        self.dataset_tag = None
+        self.weights_sgd = None
+        self.weights_lda = None
+        self.shap_data = None
+        self.clustered_data = None
+        self.reduced_data = None
+        self.clean_merged_imputed_data_no_encoding = None
+        self.missingness = None
+        self.label_agreement = None
+        self.chain_embeddings = None
+
+        # the options and results of a session are processed by one job at a time
+        self.lock = threading.Lock()
+
+    def get_options(self):
+        """
+        Get the selected options of the session to process them in another process.
+
+            :return: the dictionary of the selected options.
+        """
+        return {'imputation': self.imputation,
+                'out_removal': self.out_removal,
+                'dim_reduction': self.dim_reduction,
+                'clustering': self.clustering,
+                'scaling': self.scaling,
+                'indices': list(self.indices),
+                'features': list(self.features),
+                'clusters': list(self.clusters),
+                'refit_subset': self.refit_subset
+                }
+
+    def set_options(self, options):
+        """
+        Set the selected options of the session.
+
+            :param options: the dictionary of the selected options.
+        """
+        self.imputation = options['imputation']
+        self.out_removal = options['out_removal']
+        self.dim_reduction = options['dim_reduction']
+        self.clustering = options['clustering']
+        self.scaling = options['scaling']
+        self.indices = options['indices']
+        self.features = options['features']
+        self.clusters = options['clusters']
+        self.refit_subset = options['refit_subset']
+
+    def get_results(self):
+        """
+        Get all processing results of the session to store them.
+
+            :return: the dictionary of the processing results.
+        """
+        return {'dataset_tag': self.dataset_tag,
+                'merged_data': self.clean_merged_imputed_data_no_encoding,
+                'missingness': self.missingness,
+                'reduced_data': self.reduced_data,
+                'clustered_data': self.clustered_data,
+                'shap_data': self.shap_data,
+                'weights_lda': self.weights_lda,
+                'weights_sgd': self.weights_sgd,
+                'label_agreement': self.label_agreement,
+                'chain_embeddings': self.chain_embeddings
+                }
+
+    def set_results(self, results):
+        """
+        Set all processing results of the session from stored results.
+
+            :param results: the dictionary of the processing results.
+        """
+        self.dataset_tag = results['dataset_tag']
+        self.clean_merged_imputed_data_no_encoding = results['merged_data']
+        self.missingness = results.get('missingness')
+        self.reduced_data = results['reduced_data']
+        self.clustered_data = results['clustered_data']
+        self.shap_data = results['shap_data']
+        self.weights_lda = results['weights_lda']
+        self.weights_sgd = results['weights_sgd']
+        self.label_agreement = results.get('label_agreement')
+        self.chain_embeddings = results.get('chain_embeddings')
+
+    def get_merged_imputed_data_for_hovering_and_table(self):
+        """
+        Get merged, imputed data without one-hot encoding.
+
+            :return: the imputed and merged data.
+        """
+        return self.clean_merged_imputed_data_no_encoding
+
+    def get_missingness(self):
+        """
+        Get the bitmap of the values of the merged data that were originally missing and are imputed.
+
+            :return: the missingness bitmap of the merged data.
+        """
+        return self.missingness
+
+    def get_reduced_data(self):
+        """
+        Scale and reduce the data to two dimensions.
+
+            :return: the reduced data.
+        """
+        return self.reduced_data
+
+    def get_clustered_data(self):
+        """
+        Get labels that represent the clusters of data.
+
+            :return: the labels of the clusters.
+        """
+        return self.clustered_data
+
+    def get_shap_data(self):
+        """
+        Get SHAP values of clusters.
+
+            :return: the SHAP values of the clusters sorted descending by their values.
+        """
+        return self.shap_data
+
+    def get_lda_data(self):
+        """
+        Get LDA weights of features that discriminate between clusters.
+
+            :return: the LDA features between the clusters sorted descending by their weight.
+        """
+        return self.weights_lda
+
+    def get_sgd_data(self):
+        """
+        Get SGD weights of features that discriminate between clusters.
+
+            :return: the SGD features between the clusters sorted descending by their weight.
+        """
+        return self.weights_sgd
+
+    def get_label_agreement(self):
+        """
+        Get the agreement of the cluster label of each patient across the chains of the multiple imputation.
+
+            :return: the agreement per patient, or `None` if the data is not imputed multiple times.
+        """
+        return self.label_agreement
+
+    def get_chain_embeddings(self):
+        """
+        Get the embeddings of the chains of the multiple imputation, aligned with the shown embedding.
+
+            :return: the list of the aligned embeddings, or `None` if the data is not imputed multiple times.
+        """
+        return self.chain_embeddings
+
+    def get_dataset_tag(self):
+        """
+        Get feature names per dataset to differentiate between them in data filtering.
+
+            :return: the object that holds the feature names per dataset.
+        """
+        return self.dataset_tag
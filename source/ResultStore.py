@@ -0,0 +1,89 @@
+from source.Options import Opt
+import pandas as pd
+import pathlib
+import hashlib
+import os
+
+
+class ResultStore(object):
+    """
+        A class for storing processing results on disk. Each result is stored in its own
+        file, whose name is derived from the key of the options and inputs it was computed with,
+        the version of the stored results and the backend options that change the results.
+    """
+
+    # backend options that change the processing results, besides the options selected in the frontend
+    processing_options = ['mice_max_iter', 'mice_tol', 'mice_estimator', 'mice_warm_start',
+                          'constant_imputation_value', 'high_constant_imputation_value', 'number_of_imputations',
+                          'graph_neighbors', 'approximate_neighbors_min_samples', 'pre_reduction_max_components',
+                          'pre_reduction_explained_variance', 'mds_smacof_max_samples', 'mds_landmarks',
+                          'sparse_genomic_data']
+
+    def __init__(self, folder):
+        """
+            The constructor that sets the initialization parameters for the result store.
+
+            :param folder: the folder to store the results in, relative to the working directory.
+        """
+        self.directory = str(os.path.join(pathlib.Path().resolve(), folder))
+
+    def get_path(self, key):
+        """
+        Get the path of the file that stores the result of a key.
+
+            :param key: the key of the result.
+            :return: the file path as a string.
+        """
+        versioned_key = (Opt.result_store_version.value, self.get_processing_options(), key)
+        filename = hashlib.sha1(repr(versioned_key).encode()).hexdigest() + Opt.result_file_type.value
+        return os.path.join(self.directory, filename)
+
+    def get_processing_options(self):
+        """
+        Get the current values of the backend options that change the processing results.
+
+            :return: the tuple of the name and value of each option.
+        """
+        return tuple((name, Opt[name].value) for name in self.processing_options)
+
+    def contains(self, key):
+        """
+        Check whether a result is stored for a key.
+
+            :param key: the key of the result.
+            :return: `true` if the result is stored, otherwise `false`.
+        """
+        return os.path.exists(self.get_path(key))
+
+    def get(self, key):
+        """
+        Get the stored result of a key.
+
+            :param key: the key of the result.
+            :return: the stored result, or `None` if no result is stored for this key.
+        """
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            print("Stored result '" + path + "' could not be read: " + str(e))
+            return None
+
+    def put(self, key, result):
+        """
+        Store the result of a key. The result is first written to a temporary file, so that
+        readers never see a partially written result.
+
+            :param key: the key of the result.
+            :param result: the result to store.
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+
+        path = self.get_path(key)
+        temp_path = path + '.' + str(os.getpid()) + '.tmp'
+        pd.to_pickle(result, temp_path)
+        os.replace(temp_path, path)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class SessionRegistry(object):
+    """
+        A class for holding the pipeline state of each browser session. The number of sessions
+        is bounded, and sessions that were idle for too long are evicted.
+    """
+
+    def __init__(self, max_sessions, idle_timeout, create_state):
+        """
+            The constructor that sets the initialization parameters for the session registry.
+
+            :param max_sessions: the maximum number of sessions, before the least recently used one is evicted.
+            :param idle_timeout: the number of seconds after which an idle session is evicted.
+            :param create_state: the function without arguments that creates the state of a new session.
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.create_state = create_state
+        self.sessions = OrderedDict()
+        self.last_access = {}
+        self.lock = threading.Lock()
+
+    def get_state(self, session_id):
+        """
+        Get the pipeline state of a session. Create the state, if the session is new or was evicted.
+
+            :param session_id: the id of the session.
+            :return: the pipeline state of the session.
+        """
+        with self.lock:
+            self.evict_idle_sessions()
+            state = self.sessions.get(session_id)
+            if state is not None:
+                self.sessions.move_to_end(session_id)
+                self.last_access[session_id] = time.time()
+                return state
+
+        state = self.create_state()
+        with self.lock:
+            state = self.sessions.setdefault(session_id, state)
+            self.sessions.move_to_end(session_id)
+            self.last_access[session_id] = time.time()
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, _ = self.sessions.popitem(last=False)
+                del self.last_access[evicted_id]
+
+        return state
+
+    def evict_idle_sessions(self):
+        """
+            Remove all sessions that were not accessed within the idle timeout.
+        """
+        now = time.time()
+        idle = [session_id for session_id, last_access in self.last_access.items()
+                if now - last_access > self.idle_timeout]
+        for session_id in idle:
+            del self.sessions[session_id]
+            del self.last_access[session_id]
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import threading
+
+
+class StageCache(object):
+    """
+        A class for caching the intermediate results of the processing stages. Each stage
+        holds its own bounded cache, in which the least recently used entry is evicted first.
+    """
+
+    def __init__(self, max_size):
+        """
+            The constructor that sets the initialization parameters for the stage cache.
+
+            :param max_size: the maximum number of results cached per stage.
+        """
+        self.max_size = max_size
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, stage, key, compute):
+        """
+        Get the cached result of a stage for the given key. If no result is cached yet,
+        compute it, store it and evict the least recently used result of this stage
+        if the cache is full. The result is computed outside the lock, so that sessions
+        processing different stages do not wait for each other.
+
+            :param stage: the name of the processing stage.
+            :param key: the hashable key built from the upstream options and inputs.
+            :param compute: the function without arguments that computes the result.
+            :return: the cached or newly computed result.
+        """
+        with self.lock:
+            entries = self.stages.setdefault(stage, OrderedDict())
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key]
+
+        value = compute()
+        self.put(stage, key, value)
+        return value
+
+    def get(self, stage, key):
+        """
+        Get the cached result of a stage for the given key.
+
+            :param stage: the name of the processing stage.
+            :param key: the key of the result.
+            :return: the cached result, or `None` if no result is cached for this key.
+        """
+        with self.lock:
+            entries = self.stages.get(stage, {})
+            if key not in entries:
+                return None
+
+            entries.move_to_end(key)
+            return entries[key]
+
+    def put(self, stage, key, value):
+        """
+        Store the result of a stage for the given key, replacing a result that is already cached.
+
+            :param stage: the name of the processing stage.
+            :param key: the key of the result.
+            :param value: the result to store.
+        """
+        with self.lock:
+            entries = self.stages.setdefault(stage, OrderedDict())
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def contains(self, stage, key):
+        """
+        Check whether a result of a stage is cached for the given key.
+
+            :param stage: the name of the processing stage.
+            :param key: the key of the result.
+            :return: `true` if the result is cached, otherwise `false`.
+        """
+        with self.lock:
+            return key in self.stages.get(stage, {})
+
+    def clear(self):
+        """
+            Remove all cached results of all stages.
+        """
+        with self.lock:
+            self.stages = {}
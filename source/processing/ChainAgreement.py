@@ -0,0 +1,92 @@
+from scipy.linalg import orthogonal_procrustes
+from scipy.optimize import linear_sum_assignment
+import numpy as np
+import pandas as pd
+
+
+def align_embedding(reference, embedding):
+    """
+    Align an embedding with a reference embedding of the same samples by an orthogonal Procrustes
+    analysis, as the embeddings of different imputations may be rotated, reflected, shifted or scaled
+    against each other.
+
+        :param reference: the matrix of the reference embedding.
+        :param embedding: the matrix of the embedding to align, with the samples in the same order.
+        :return: the matrix of the aligned embedding.
+    """
+    reference_mean = reference.mean(axis=0)
+    embedding_mean = embedding.mean(axis=0)
+    centered_reference = reference - reference_mean
+    centered_embedding = embedding - embedding_mean
+
+    rotation, scale = orthogonal_procrustes(centered_embedding, centered_reference)
+    norm = np.sum(centered_embedding ** 2)
+    if norm == 0:
+        return np.tile(reference_mean, (len(embedding), 1))
+
+    return centered_embedding @ rotation * (scale / norm) + reference_mean
+
+
+def match_labels(reference_labels, labels):
+    """
+    Rename the cluster labels of an imputation to the reference labels they overlap the most with,
+    as the clusterings of different imputations may number the same clusters differently.
+    Clusters without a matching reference cluster are labeled `None`.
+
+        :param reference_labels: the array of the reference labels.
+        :param labels: the array of the labels to rename, with the samples in the same order.
+        :return: the array of the renamed labels.
+    """
+    reference_clusters, reference_codes = np.unique(reference_labels, return_inverse=True)
+    clusters, codes = np.unique(labels, return_inverse=True)
+
+    overlap = np.zeros((len(clusters), len(reference_clusters)), dtype=int)
+    np.add.at(overlap, (codes, reference_codes), 1)
+    rows, columns = linear_sum_assignment(overlap, maximize=True)
+
+    names = np.full(len(clusters), None, dtype=object)
+    names[rows] = reference_clusters[columns]
+    return names[codes]
+
+
+def get_label_agreement(reference_ids, reference_embedding, reference_labels, chain_results):
+    """
+    Compare the results of several imputation chains with the reference result per patient.
+    The embedding and labels of each chain are aligned with the reference, and the agreement of a
+    patient is the percentage of chains, which contain this patient, that assign it to its reference cluster.
+    Patients may be missing in a chain, e.g. if they are removed as outliers.
+
+        :param reference_ids: the ids of the reference samples.
+        :param reference_embedding: the matrix of the reference embedding.
+        :param reference_labels: the array of the reference labels.
+        :param chain_results: the list of tuples of the ids, the embedding matrix and the labels of each chain.
+        :return: the dataframe of the agreement and the number of chains per patient, and the list of
+        the dataframes of the aligned embedding of each chain, whose rows are `NaN` for missing patients.
+    """
+    reference_ids = pd.Index(reference_ids)
+    reference_labels = np.asarray(reference_labels)
+    agreeing_chains = np.zeros(len(reference_ids))
+    containing_chains = np.zeros(len(reference_ids))
+    aligned_embeddings = []
+
+    for ids, embedding, labels in chain_results:
+        positions = pd.Index(ids).get_indexer(reference_ids)
+        available = positions >= 0
+        chain_positions = positions[available]
+
+        aligned_embedding = np.full((len(reference_ids), 2), np.nan)
+        if available.sum() > 0:
+            aligned_embedding[available] = align_embedding(reference_embedding[available],
+                                                           embedding[chain_positions])
+            matched_labels = match_labels(reference_labels[available], np.asarray(labels)[chain_positions])
+            agreeing_chains[available] += matched_labels == reference_labels[available]
+            containing_chains[available] += 1
+
+        aligned_embeddings.append(pd.DataFrame(data=aligned_embedding, columns=['x', 'y']))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        agreement = np.round(100 * agreeing_chains / containing_chains, 2)
+
+    label_agreement = pd.DataFrame({'id': reference_ids, 'agreement': agreement,
+                                    'chains': containing_chains.astype(int)})
+    return label_agreement, aligned_embeddings
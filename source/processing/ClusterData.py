@@ -1,3 +1,4 @@
+import source.processing.NeighborGraph as ng
 from sklearn.cluster import KMeans
 from sklearn.cluster import MeanShift
 from sklearn.cluster import AgglomerativeClustering
@@ -105,7 +106,16 @@ class ClusterData(object):
             :param data: the data to cluster.
             :return: the resulting labels for the clusters.
         """
-        clustering = DBSCAN(min_samples=5).fit(data)
+        eps = 0.5
+        min_samples = 5
+
+        # the shared neighbor graph is used, if it contains all neighbors within `eps` of each sample
+        graph = ng.get_neighbor_graph(data, min_samples)
+        if graph.covers_radius(eps):
+            clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit(
+                graph.get_sparse_graph(graph.n_neighbors))
+        else:
+            clustering = DBSCAN(eps=eps, min_samples=min_samples).fit(data)
         labels = clustering.labels_
 
         #print("Silhouette Coeff. dbscan: ", metrics.silhouette_score(data, labels, metric="sqeuclidean"))
@@ -1,4 +1,7 @@
 import numpy as np
+import pandas as pd
+import scipy.sparse
+import hashlib
 
 
 def feature_is_binary(data, column):
@@ -38,34 +41,61 @@ def feature_has_object_type(data, column):
     return data[column].dtype == 'object'
 
 
+def get_feature_kinds(data):
+    """
+    Classify all features of the dataframe at once as `object`, `binary`, `discrete` or `continuous`.
+    Like `feature_is_binary` and `feature_is_discrete`, missing entries are ignored.
+
+        :param data: the dataframe to classify its features.
+        :return: the series with the kind of each feature.
+    """
+    kinds = pd.Series('object', index=data.columns, dtype=object)
+    numeric = [column for column, dtype in data.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)
+               and not pd.api.types.is_bool_dtype(dtype)]
+    if len(numeric) == 0:
+        return kinds
+
+    values = data[numeric].to_numpy(dtype=float)
+    missing = np.isnan(values)
+    binary = np.all(missing | (values == 0) | (values == 1), axis=0)
+    with np.errstate(invalid='ignore'):
+        discrete = np.all(missing | (values == np.trunc(values)), axis=0)
+
+    kinds[numeric] = np.where(binary, 'binary', np.where(discrete, 'discrete', 'continuous'))
+    return kinds
+
+
 def round_feature_to_binary(feature):
     """
     Round the feature to a binary value.
 
-        :param feature: the feature data to round.
+        :param feature: the feature data to round, as series or as dataframe of several features.
         :return: the rounded feature.
     """
-    return feature.apply(lambda x: 0 if x < 0.5 else 1)
+    return (~(feature < 0.5)).astype(int)
 
 
 def round_feature_to_discrete_positive(feature):
     """
     Round the feature to a discrete positive value.
 
-        :param feature: the feature data to round.
+        :param feature: the feature data to round, as series or as dataframe of several features.
         :return: the rounded feature.
     """
-    return feature.apply(lambda x: 0 if x < 0 else round(x))
+    rounded = feature.round().clip(lower=0)
+    if rounded.isna().to_numpy().any():
+        return rounded
+    return rounded.astype(int)
 
 
 def round_feature_to_continuous_positive(feature):
     """
     Round the feature to a positive value with two decimal points.
 
-        :param feature: the feature data to round.
+        :param feature: the feature data to round, as series or as dataframe of several features.
         :return: the rounded feature.
     """
-    return feature.apply(lambda x: 0 if (x < 0 and x != -1) else round(x, 2))
+    return feature.round(2).mask((feature < 0) & (feature != -1), 0)
 
 
 def get_all_object_features(data):
@@ -89,15 +119,110 @@ def get_all_features_of_same_type_as_column(data, column):
     return data.select_dtypes([data[column].dtypes])
 
 
-def get_all_numeric_features(data):
+def get_all_numeric_features(data, profile=None):
     """
     Determine a subset of the data with all columns that include numeric data.
-    In our case the datatypes `float64`, `int64` are available in the data.
+    In our case the datatypes `float64`, `int64` are available in the data, and
+    their sparse variants, if the genomic data is stored sparse.
 
         :param data: the whole dataframe.
+        :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
         :return: a subset of the data with numeric features.
     """
-    return data.select_dtypes(['float64', 'int64'])
+    return data[get_numeric_feature_names(data, profile)]
+
+
+def get_numeric_feature_names(data, profile=None):
+    """
+    Get the names of all columns that include numeric data, without copying the data.
+    If a schema profile is given, the numeric columns are looked up in the profile.
+
+        :param data: the whole dataframe.
+        :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
+        :return: the index of the names of the numeric features.
+    """
+    if profile is not None:
+        return profile.get_numeric_feature_names(data)
+
+    numeric_types = [np.dtype('float64'), np.dtype('int64')]
+    numeric = [dtype in numeric_types or (isinstance(dtype, pd.SparseDtype) and dtype.subtype in numeric_types)
+               for dtype in data.dtypes]
+    return data.columns[np.array(numeric, dtype=bool)]
+
+
+def get_sparse_feature_names(data, zero_fill_only=False):
+    """
+    Get the names of all features of the dataframe that are stored sparse.
+
+        :param data: the dataframe to check its features.
+        :param zero_fill_only: whether only sparse features, whose omitted entries are 0, are considered.
+        :return: the list of names of the sparse features.
+    """
+    return [column for column, dtype in data.dtypes.items()
+            if isinstance(dtype, pd.SparseDtype) and (not zero_fill_only or dtype.fill_value == 0)]
+
+
+def convert_to_sparse_features(data, columns):
+    """
+    Store the specified features of the dataframe sparse, omitting all entries that are 0.
+
+        :param data: the dataframe to process.
+        :param columns: the names of the features to store sparse.
+        :return: the dataframe with the sparse features.
+    """
+    sparse_features = data[columns].astype(pd.SparseDtype('float64', 0))
+    return pd.concat([data.drop(columns, axis=1), sparse_features], axis=1)[data.columns]
+
+
+def convert_to_dense_features(data):
+    """
+    Store all sparse features of the dataframe dense.
+
+        :param data: the dataframe to process.
+        :return: the dataframe without sparse features.
+    """
+    sparse_columns = get_sparse_feature_names(data)
+    if len(sparse_columns) == 0:
+        return data
+
+    data = data.copy()
+    data[sparse_columns] = data[sparse_columns].sparse.to_dense()
+    return data
+
+
+def get_feature_matrix(data):
+    """
+    Get the feature matrix of a dataframe with numeric features to pass it to an estimator.
+    If the dataframe contains sparse features, whose omitted entries are 0, the matrix is a sparse
+    CSR matrix with the features in the same order as in the dataframe. Otherwise, the dataframe
+    is returned unchanged.
+
+        :param data: the dataframe with numeric features.
+        :return: the sparse matrix, or the unchanged dataframe.
+    """
+    sparse_columns = get_sparse_feature_names(data, zero_fill_only=True)
+    if len(sparse_columns) == 0:
+        return data
+
+    dense_columns = [column for column in data.columns if column not in set(sparse_columns)]
+    dense_part = scipy.sparse.csr_matrix(
+        convert_to_dense_features(data[dense_columns]).to_numpy(dtype='float64'))
+    sparse_part = data[sparse_columns].sparse.to_coo().tocsr()
+    matrix = scipy.sparse.hstack([dense_part, sparse_part], format='csr')
+
+    # restore the order of the features in the dataframe
+    position = {column: i for i, column in enumerate(dense_columns + sparse_columns)}
+    return matrix[:, [position[column] for column in data.columns]]
+
+
+def is_sparse_matrix(data):
+    """
+    Check whether the data is a sparse matrix.
+
+        :param data: the data to check.
+        :return: `true` if the data is a sparse matrix, otherwise `false`.
+    """
+    return scipy.sparse.issparse(data)
 
 
 def set_to_minus_one(data, col_to_check, col_to_replace):
@@ -110,6 +235,9 @@ def set_to_minus_one(data, col_to_check, col_to_replace):
         :param col_to_check: the feature to check in the dataframe.
         :param col_to_replace: the feature to replace in the dataframe.
     """
+    if col_to_check not in data or col_to_replace not in data:
+        return data
+
     data.loc[data[col_to_check] == 0, col_to_replace] = -1
     return data
 
@@ -144,3 +272,18 @@ def fill_nan_values_by_constant(data, constant):
         :return: the dataframe with all missing values filled in by a constant.
     """
     return data.fillna(constant)
+
+
+def get_data_fingerprint(data):
+    """
+    Determine a fingerprint of the dataframe that changes, whenever its values, index or column names change.
+    The fingerprint is used as a key for caching results that are computed from the dataframe.
+
+        :param data: the dataframe to determine its fingerprint.
+        :return: the fingerprint of the dataframe as a hexadecimal string.
+    """
+    hash_function = hashlib.sha1()
+    hash_function.update(str(data.shape).encode())
+    hash_function.update(str(data.columns.tolist()).encode())
+    hash_function.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    return hash_function.hexdigest()
@@ -1,4 +1,5 @@
 import source.processing.DataFrameOps as dfo
+import source.processing.NeighborGraph as ng
 from sklearn.ensemble import IsolationForest
 from sklearn.neighbors import LocalOutlierFactor
 import numpy as np
@@ -9,17 +10,19 @@ class DetectOutliers(object):
         A class for detecting global and local outliers in the data.
     """
 
-    def remove_global_outliers(self, data):
+    def remove_global_outliers(self, data, profile=None):
         """
         Detect and remove global outliers from the data.
 
             :param data: the data to process.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: the processed data without global outliers.
         """
         data_without_outliers = data.copy()
 
-        mask = dfo.get_all_numeric_features(data)
-        df = data[mask.columns]
+        df = data[dfo.get_numeric_feature_names(data, profile)]
+
+        df = dfo.get_feature_matrix(df)
 
         clf = IsolationForest(random_state=0)
         clf.fit(df)
@@ -30,21 +33,26 @@ class DetectOutliers(object):
 
         return data_without_outliers
 
-    def remove_local_outliers(self, data):
+    def remove_local_outliers(self, data, profile=None):
         """
         Detect and remove local outliers from the data.
 
             :param data: the data to process.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: the processed data without local outliers.
         """
         data_without_outliers = data.copy()
 
-        mask = dfo.get_all_numeric_features(data)
-        df = data[mask.columns]
+        df = data[dfo.get_numeric_feature_names(data, profile)]
 
-        clf = LocalOutlierFactor(n_neighbors=2)
-        clf.fit(df)
-        y_pred = clf.fit_predict(df)
+        df = dfo.get_feature_matrix(df)
+
+        # the neighbors are taken from the shared neighbor graph
+        n_neighbors = 2
+        graph = ng.get_neighbor_graph(df, n_neighbors + 1).get_sparse_graph(n_neighbors + 1)
+
+        clf = LocalOutlierFactor(n_neighbors=n_neighbors, metric='precomputed')
+        y_pred = clf.fit_predict(graph)
 
         outliers = np.where(y_pred == -1)[0]
         data_without_outliers.drop(outliers, axis=0, inplace=True)
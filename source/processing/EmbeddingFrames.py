@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+import threading
+
+try:
+    import sklearn.manifold._t_sne as sklearn_tsne
+except ImportError:
+    sklearn_tsne = None
+
+try:
+    import umap.umap_ as umap_module
+except ImportError:
+    umap_module = None
+
+# the function of each thread that receives the embedding while it is optimized
+observers = threading.local()
+
+
+@contextmanager
+def observe_embedding(report):
+    """
+    Report the embedding that t-SNE or UMAP optimizes in the current thread, so that intermediate layouts
+    can be shown before the optimization is finished. The reported array is updated in place by the
+    optimization, so that it must be copied to take a frame of it.
+
+        :param report: the function that receives the matrix of the embedding at the start of each
+        optimization phase.
+    """
+    observers.report = report
+    try:
+        yield
+    finally:
+        observers.report = None
+
+
+def report_embedding(embedding):
+    """
+    Report the embedding that is optimized to the observer of the current thread, if any.
+
+        :param embedding: the matrix of the embedding.
+    """
+    report = getattr(observers, 'report', None)
+    if report is not None:
+        report(embedding)
+
+
+def observe_tsne_objective(objective):
+    """
+    Wrap the objective function of the t-SNE gradient descent, which receives the flattened embedding
+    that is optimized in place.
+
+        :param objective: the objective function of t-SNE.
+        :return: the objective function that reports the embedding.
+    """
+    def observed_objective(params, *args, **kwargs):
+        report_embedding(params.reshape(-1, args[3]))
+        return objective(params, *args, **kwargs)
+
+    return observed_objective
+
+
+def observe_umap_layout(optimize_layout):
+    """
+    Wrap the layout optimization of UMAP, which optimizes its first argument in place.
+
+        :param optimize_layout: the layout optimization of UMAP.
+        :return: the layout optimization that reports the embedding.
+    """
+    def observed_layout(head_embedding, *args, **kwargs):
+        report_embedding(head_embedding)
+        return optimize_layout(head_embedding, *args, **kwargs)
+
+    return observed_layout
+
+
+# neither t-SNE nor UMAP provide callbacks, so that the functions that they look up for their optimization are
+# wrapped once, which only reports the embedding in threads that observe it
+if sklearn_tsne is not None and hasattr(sklearn_tsne, '_kl_divergence_bh'):
+    sklearn_tsne._kl_divergence_bh = observe_tsne_objective(sklearn_tsne._kl_divergence_bh)
+
+if umap_module is not None and hasattr(umap_module, 'optimize_layout_euclidean'):
+    umap_module.optimize_layout_euclidean = observe_umap_layout(umap_module.optimize_layout_euclidean)
@@ -1,5 +1,5 @@
 from source.Options import Opt
-from sklearn.preprocessing import OneHotEncoder
+import numpy as np
 import pandas as pd
 
 
@@ -8,6 +8,13 @@ class EncodeData(object):
         A class for processing categorical data by encoding them.
     """
 
+    def __init__(self):
+        """
+            The constructor that sets the initialization parameters for the encoder.
+        """
+        # fitted vocabularies by categorical feature and its distinct values
+        self.vocabularies = {}
+
     def encode_categorical_list(self, data_list):
         """
         Handle a list of categorical values in the dataset by transforming
@@ -26,72 +33,85 @@ class EncodeData(object):
     def encode_categorical_values(self, data):
         """
         Handle categorical values in the dataset by transforming them into numerical values.
+        Each configured categorical column is replaced by one indicator column per category.
+        Entries that combine several categories (e.g. 'C + A') set the indicators of all of them.
 
             :param data: the dataframe to handle.
             :return: the handled dataframe with numerical values only.
         """
-
-        col_name = Opt.categorical_score.value
-        if col_name not in data:
+        col_names = [col_name for col_name in Opt.categorical_columns.value if col_name in data]
+        if len(col_names) == 0:
             return data
 
-        concatenation_symbol = Opt.plus_symbol.value
-        encoder = OneHotEncoder(handle_unknown='ignore')
-        each_cell_as_column_df = pd.DataFrame(
-            encoder.fit_transform(data[[col_name]]).toarray())
+        blocks = []
+        start = 0
+        for col_name in sorted(col_names, key=data.columns.get_loc):
+            col_pos = data.columns.get_loc(col_name)
+            blocks.append(data.iloc[:, start:col_pos])
+            blocks.append(self.get_indicator_block(data[col_name]))
+            start = col_pos + 1
+        blocks.append(data.iloc[:, start:])
 
-        column_name = encoder.get_feature_names_out([col_name])
-        each_cell_as_column_df.columns = column_name
+        # combine the encoded features with the original dataset by preserving their position
+        data = pd.concat(blocks, axis=1)
 
-        # remove prefix to facilitate the processing of the features
-        each_cell_as_column_df.columns = each_cell_as_column_df.columns.str.lstrip(
-            col_name + Opt.underline_symbol.value)
+        # remove duplicated index
+        return data.drop(Opt.idx.value, axis=1, errors='ignore')
 
-        cols_with_symb = [
-            col for col in each_cell_as_column_df.columns if concatenation_symbol in col]
-        cols_without_symb = [
-            col for col in each_cell_as_column_df.columns if concatenation_symbol not in col]
-        single_val_df = each_cell_as_column_df[cols_without_symb].copy()
+    def get_indicator_block(self, feature):
+        """
+        Encode a categorical feature into indicator columns. The categories are taken
+        in one pass over the distinct values, so that the indicator rows are just taken per entry.
 
-        for combined_value in cols_with_symb:
-            combined_value_array = combined_value.split(concatenation_symbol)
-            for element in combined_value_array:
-                single_value = element.strip()
+            :param feature: the categorical feature to encode.
+            :return: the dataframe with one indicator column per category.
+        """
+        codes, categories = pd.factorize(feature, sort=True)
+        vocabulary, category_matrix = self.get_vocabulary(feature.name, tuple(categories))
 
-                if single_value in single_val_df.columns:
-                    # set available column to 1, when the combined column is 1
-                    single_val_df.loc[each_cell_as_column_df[combined_value]
-                                      == 1, single_value] = 1
+        # append a row of zeros, which is taken for missing entries
+        category_matrix = np.vstack([category_matrix, np.zeros((1, len(vocabulary)))])
+        indicators = category_matrix[codes]
 
-                else:  # it is a new feature, add it to the dataframe
-                    single_val_df[single_value] = each_cell_as_column_df[combined_value].to_numpy(
-                    )
+        # set missing values to 'NaN' to impute them afterward
+        indicators[~indicators.any(axis=1)] = np.nan
 
         # add name of original column to encoded features as prefix
-        single_val_df.columns = col_name + Opt.space.value + single_val_df.columns
+        columns = [feature.name + Opt.space.value + category for category in vocabulary]
+        return pd.DataFrame(indicators, index=feature.index, columns=columns)
 
-        # remove 'nan' column
-        single_val_df = single_val_df[single_val_df.columns.drop(
-            list(single_val_df.filter(regex='nan')))]
+    def get_vocabulary(self, col_name, categories):
+        """
+        Get the vocabulary of a categorical feature. Each distinct value is split into its single
+        categories, and combined categories that do not occur as single values are added as new
+        categories. The vocabulary is cached, so repeated requests do not refit it.
 
-        # set missing values to 'NaN' to impute them afterward
-        single_val_df.loc[(single_val_df == 0).all(axis=1)] = "NaN"
-        single_val_df = single_val_df.astype(float)
+            :param col_name: the name of the categorical feature.
+            :param categories: the sorted distinct values of the feature.
+            :return: the list of single categories, and the indicator matrix of each distinct value.
+        """
+        key = (col_name, categories)
+        if key in self.vocabularies:
+            return self.vocabularies[key]
 
-        # combine the encoded dataframe with the original dataset by preserving its position
-        col_pos = data.columns.get_loc(col_name)
-        for val in range(len(single_val_df.columns)):
-            if val < len(single_val_df.columns):
-                data.insert(
-                    col_pos + val, single_val_df.columns[val], single_val_df.values[:, val])
+        concatenation_symbol = Opt.plus_symbol.value
+        split_categories = [[element.strip() for element in str(category).split(concatenation_symbol)]
+                            for category in categories]
 
-        # remove original column of categorical data as it is already included in an encoded way
-        data.drop(col_name, axis=1, inplace=True)
+        vocabulary = [elements[0] for elements in split_categories if len(elements) == 1]
+        for elements in split_categories:
+            vocabulary.extend(element for element in elements if element not in vocabulary)
 
-        # remove duplicated index
-        data.drop(Opt.idx.value, axis=1, inplace=True)
+        # remove 'nan' category
+        vocabulary = [category for category in vocabulary if 'nan' not in category]
 
-        return data
+        positions = {category: i for i, category in enumerate(vocabulary)}
+        category_matrix = np.zeros((len(categories), len(vocabulary)))
+        for row, elements in enumerate(split_categories):
+            category_matrix[row, [positions[element] for element in elements if element in positions]] = 1
+
+        self.vocabularies[key] = (vocabulary, category_matrix)
+        return self.vocabularies[key]
 
     def drop_columns(self, data):
         """
@@ -1,7 +1,7 @@
 import numpy as np
 
 
-def calculateMAPE(imputed_data, ground_truth, data_with_missingness, column):
+def calculateMAPE(imputed_data, ground_truth, data_with_missingness, column, mask=None):
     """
     Calculate the Mean Absolute Percentage Error (MAPE) of the imputed data.
 
@@ -9,9 +9,10 @@ def calculateMAPE(imputed_data, ground_truth, data_with_missingness, column):
         :param ground_truth: the ground truth of the dataset.
         :param data_with_missingness: the data with missing values.
         :param column: the column to calculate the MAPE for.
+        :param mask: the boolean array of the missing values of the column, or `None` to check the data.
         :return: the MAPE of the imputed values.
     """
-    mask_training_missing = data_with_missingness[column].isna()
+    mask_training_missing = data_with_missingness[column].isna() if mask is None else mask
 
     res_feature = imputed_data[column]
     imputed_res = res_feature[mask_training_missing]
@@ -22,7 +23,7 @@ def calculateMAPE(imputed_data, ground_truth, data_with_missingness, column):
     return (np.abs((gt_values - imputed_res) / gt_values)).mean() * 100
 
 
-def calculateRMSE(imputed_data, ground_truth, data_with_missingness, column):
+def calculateRMSE(imputed_data, ground_truth, data_with_missingness, column, mask=None):
     """
     Calculate the Root Mean Square Error (RMSE) of the imputed data.
 
@@ -30,9 +31,10 @@ def calculateRMSE(imputed_data, ground_truth, data_with_missingness, column):
         :param ground_truth: the ground truth of the dataset.
         :param data_with_missingness: the data with missing values.
         :param column: the column to calculate the RMSE for.
+        :param mask: the boolean array of the missing values of the column, or `None` to check the data.
         :return: the RMSE of the imputed values.
     """
-    mask_training_missing = data_with_missingness[column].isna()
+    mask_training_missing = data_with_missingness[column].isna() if mask is None else mask
 
     res_feature = imputed_data[column]
     imputed_res = res_feature[mask_training_missing]
@@ -43,7 +45,7 @@ def calculateRMSE(imputed_data, ground_truth, data_with_missingness, column):
     return np.sqrt(((imputed_res - gt_values) ** 2).mean())
 
 
-def get_percentage_of_correct_imputation(imputed_data, ground_truth, data_with_missingness, column):
+def get_percentage_of_correct_imputation(imputed_data, ground_truth, data_with_missingness, column, mask=None):
     """
     Calculate the percentage of correct imputations with respect to all imputed values.
 
@@ -51,9 +53,10 @@ def get_percentage_of_correct_imputation(imputed_data, ground_truth, data_with_m
         :param ground_truth: the ground truth of the dataset.
         :param data_with_missingness: the data with missing values.
         :param column: the column to calculate the percentage for.
+        :param mask: the boolean array of the missing values of the column, or `None` to check the data.
         :return: the percentage of correct imputations with respect to all imputed values.
     """
-    mask_training_missing = data_with_missingness[column].isna()
+    mask_training_missing = data_with_missingness[column].isna() if mask is None else mask
 
     res_feature = imputed_data[column]
     imputed_res = res_feature[mask_training_missing]
@@ -1,4 +1,6 @@
 import source.processing.DataFrameOps as dfo
+from source.processing.NeighborIndex import get_neighbor_index
+import source.processing.MiceImputation as mi
 
 from source.Options import Opt
 import numpy as np
@@ -11,7 +13,6 @@ from sklearn.impute import SimpleImputer
 from sklearn.impute import KNNImputer
 
 from fancyimpute import IterativeImputer
-from impyute.imputation.cs import fast_knn
 from impyute.imputation.cs import mice
 sys.setrecursionlimit(100000)
 
@@ -113,15 +114,30 @@ def mice_impute_all_values(data, col_names):
         :return: the imputed data without missingness
     """
     result = data.copy()
-    processed_data = drop_columns(data.copy())
+    processed_data = drop_columns(data.copy()).select_dtypes(include=np.number)
+
+    imputed_data = mi.impute_numeric_features(processed_data)
+    columns = [col for col in col_names if col in imputed_data]
+    result[columns] = round_imputed_types(data, imputed_data[columns])
+
+    return result
+
+
+def mice_posterior_impute_all_values(data, col_names, random_state):
+    """
+    Impute all features of a dataframe through one MICE chain that samples from the posterior.
+
+        :param data: the data with missingness to impute its values.
+        :param col_names: the columns that contain missing values.
+        :param random_state: the seed of the chain.
+        :return: the imputed data without missingness
+    """
+    result = data.copy()
+    processed_data = drop_columns(data.copy()).select_dtypes(include=np.number)
 
-    mice_impute = IterativeImputer()
-    imputed_data = pd.DataFrame(data=mice_impute.fit_transform(processed_data.select_dtypes(include=np.number)),
-                                index=None, columns=processed_data.select_dtypes(include=np.number).columns.tolist())
-    for col in col_names:
-        if col in imputed_data:
-            res = round_imputed_type(data, col, imputed_data[col])
-            result[col] = res
+    imputed_data = mi.impute_posterior_sample(processed_data, random_state)
+    columns = [col for col in col_names if col in imputed_data]
+    result[columns] = round_imputed_types(data, imputed_data[columns])
 
     return result
 
@@ -138,13 +154,10 @@ def knn_impute_all_values(data, col_names):
 
     neighbors = 5
     processed_data = drop_columns(data.copy())
-    imputer = KNNImputer(n_neighbors=neighbors)
-    imputed_data = pd.DataFrame(data=imputer.fit_transform(processed_data),
+    imputed_data = pd.DataFrame(data=knn_impute_matrix(processed_data.to_numpy(dtype=float), neighbors),
                                 index=None, columns=processed_data.columns)
-    for col in col_names:
-        if col in imputed_data:
-            res = round_imputed_type(data, col, imputed_data[col])
-            result[col] = res
+    columns = [col for col in col_names if col in imputed_data]
+    result[columns] = round_imputed_types(data, imputed_data[columns])
 
     return result
 
@@ -180,9 +193,9 @@ def knn_same_type_features(data, column):
     neighbors = 5
 
     mask = dfo.get_all_features_of_same_type_as_column(data, column)
-    res = fast_knn(data[mask.columns].values, k=neighbors)
+    res = knn_impute_matrix(data[mask.columns].values, neighbors)
 
-    data[column] = res
+    data[column] = res[:, mask.columns.get_loc(column)]
     return data
 
 
@@ -198,9 +211,9 @@ def knn_numeric_features(data, column):
     neighbors = 5
 
     mask = dfo.get_all_numeric_features(data)
-    res = fast_knn(data[mask.columns].values, k=neighbors)
+    res = knn_impute_matrix(data[mask.columns].values, neighbors)
 
-    data[column] = res
+    data[column] = res[:, mask.columns.get_loc(column)]
     return data
 
 
@@ -283,6 +296,80 @@ def multivariate_more_iter_numeric_features(data, column):
     return data
 
 
+def impute_features(data, columns, function_name):
+    """
+    Apply the imputation method specified by `function_name` on several features of the dataframe.
+    Univariate methods are fitted once on all features, and methods that consider further features
+    are fitted once per set of considered features, instead of once per feature.
+    The other methods are applied per feature.
+
+        :param data: the dataframe to impute its features.
+        :param columns: the feature names of the dataframe to impute.
+        :param function_name: the name of the imputation function to apply.
+        :return: the dataframe with the imputed features.
+    """
+    if function_name in univariate_strategies:
+        # fit once per data type, so that numeric features keep their type
+        for _, group in data[columns].dtypes.groupby(data[columns].dtypes.astype(str)):
+            imp = SimpleImputer(missing_values=np.nan, strategy=univariate_strategies[function_name])
+            data[group.index.tolist()] = imp.fit_transform(data[group.index.tolist()].to_numpy())
+        return data
+
+    if function_name in context_imputations:
+        get_context, impute_matrix = context_imputations[function_name]
+        return impute_features_with_context(data, columns, get_context, impute_matrix)
+
+    for column in columns:
+        data = globals()[function_name](data, column)
+    return data
+
+
+def impute_features_with_context(data, columns, get_context, impute_matrix):
+    """
+    Impute several features of the dataframe, considering further features for the imputation.
+    The features that consider the same features are imputed by one fit.
+
+        :param data: the dataframe to impute its features.
+        :param columns: the feature names of the dataframe to impute.
+        :param get_context: the function that determines the subset of the data considered for a feature.
+        :param impute_matrix: the function that imputes the values of a matrix.
+        :return: the dataframe with the imputed features.
+    """
+    groups = {}
+    for column in columns:
+        context = tuple(get_context(data, column).columns)
+        groups.setdefault(context, []).append(column)
+
+    for context, group in groups.items():
+        res = impute_matrix(data[list(context)].values)
+        for column in group:
+            data[column] = res[:, context.index(column)]
+    return data
+
+
+def iterative_impute_matrix(matrix):
+    """
+    Impute the values of a matrix by multivariate imputation with a higher number of iterations.
+
+        :param matrix: the matrix with missing values.
+        :return: the imputed matrix.
+    """
+    iter_number = 50
+    return IterativeImputer(max_iter=iter_number, random_state=0).fit_transform(matrix)
+
+
+def knn_impute_matrix(matrix, neighbors=5):
+    """
+    Impute the values of a matrix by K-Nearest Neighbors (KNN) imputation. The neighbor index
+    of the matrix is built once and reused for further imputations of the same matrix.
+
+        :param matrix: the matrix with missing values.
+        :param neighbors: the number of neighbors to consider.
+        :return: the imputed matrix.
+    """
+    return get_neighbor_index(matrix).impute(neighbors)
+
+
 def round_imputed_type(data_with_missingness, column, imputed_feature):
     """
     Round the imputed value to match the same characteristics
@@ -293,21 +380,29 @@ def round_imputed_type(data_with_missingness, column, imputed_feature):
         :param imputed_feature: the imputed data values.
         :return: the rounded imputed data values.
     """
-    if dfo.feature_has_object_type(data_with_missingness, column):
-        return imputed_feature
+    return round_imputed_types(data_with_missingness, imputed_feature.to_frame(column))[column]
 
-    elif dfo.feature_is_binary(data_with_missingness, column):
-        imputed_feature = dfo.round_feature_to_binary(imputed_feature)
 
-    elif dfo.feature_is_discrete(data_with_missingness, column):
-        imputed_feature = dfo.round_feature_to_discrete_positive(
-            imputed_feature)
+def round_imputed_types(data_with_missingness, imputed_data):
+    """
+    Round the imputed values of several features to match the same characteristics
+    (e.g. binary, discrete) as the not imputed feature values. The features are classified
+    once, and all features of the same kind are rounded together.
 
-    else:
-        imputed_feature = dfo.round_feature_to_continuous_positive(
-            imputed_feature)
+        :param data_with_missingness: the data with missing values.
+        :param imputed_data: the dataframe with the imputed features.
+        :return: the dataframe with the rounded imputed features.
+    """
+    kinds = dfo.get_feature_kinds(data_with_missingness[imputed_data.columns])
+    rounding = {'binary': dfo.round_feature_to_binary,
+                'discrete': dfo.round_feature_to_discrete_positive,
+                'continuous': dfo.round_feature_to_continuous_positive}
+
+    rounded_blocks = [imputed_data[kinds.index[kinds == 'object']]]
+    for kind, round_features in rounding.items():
+        rounded_blocks.append(round_features(imputed_data[kinds.index[kinds == kind]]))
 
-    return imputed_feature
+    return pd.concat(rounded_blocks, axis=1)[imputed_data.columns]
 
 
 def drop_columns(data):
@@ -325,3 +420,23 @@ def drop_columns(data):
     if Opt.ID in data:
         data.drop(Opt.ID, axis=1, inplace=True)
     return data
+
+
+# strategies of the univariate imputation methods
+univariate_strategies = {
+    univariate_mean.__name__: 'mean',
+    univariate_median.__name__: 'median',
+    univariate_most_frequent.__name__: 'most_frequent',
+}
+
+# considered features and matrix imputation of the methods that consider further features
+context_imputations = {
+    mice_imp.__name__: (dfo.get_all_features_of_same_type_as_column, mice),
+    mice_numeric_features.__name__: (lambda data, column: dfo.get_all_numeric_features(data), mice),
+    knn_same_type_features.__name__: (dfo.get_all_features_of_same_type_as_column, knn_impute_matrix),
+    knn_numeric_features.__name__: (lambda data, column: dfo.get_all_numeric_features(data), knn_impute_matrix),
+    multivariate_more_iter_same_type_features.__name__: (dfo.get_all_features_of_same_type_as_column,
+                                                         iterative_impute_matrix),
+    multivariate_more_iter_numeric_features.__name__: (lambda data, column: dfo.get_all_numeric_features(data),
+                                                       iterative_impute_matrix),
+}
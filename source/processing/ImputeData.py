@@ -2,13 +2,78 @@ import source.FileWriter as fw
 import source.processing.ErrorMetrics as em
 import source.processing.DataFrameOps as dfo
 import source.processing.ImputationMethods as im
+from source.processing.MissingnessBitmap import MissingnessBitmap
 from source.Options import Opt
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import numpy as np
+import pandas as pd
+import json
 import sys
+import os
 
 sys.setrecursionlimit(100000)
 
+# imputation methods that are evaluated for each feature with missingness
+function_list = [
+    im.univariate_mean.__name__,
+    im.univariate_median.__name__,
+    im.univariate_most_frequent.__name__,  # also suitable for categorical features
+    im.linear_regression.__name__,
+    im.mice_imp.__name__,
+    im.mice_numeric_features.__name__,
+    im.knn_one_feature.__name__,
+    im.knn_same_type_features.__name__,
+    im.knn_numeric_features.__name__,
+    im.multivariate.__name__,
+    im.multivariate_more_iter.__name__,
+    im.multivariate_more_iter_same_type_features.__name__,
+    im.multivariate_more_iter_numeric_features.__name__,
+]
+
+# columns of the tidy evaluation results
+evaluation_columns = ['Dataset', 'Feature', 'Method', 'Missingness', 'Corr', 'RMSE', 'MAPE']
+
+# evaluation data of an imputation evaluation worker process
+evaluation_data_of_worker = None
+
+
+def init_evaluation_worker(evaluation_data):
+    """
+    Initialize a worker process of the imputation evaluation with the data to evaluate.
+
+        :param evaluation_data: the dictionary of the ground truth dataframe and the dataframes with
+        different percentages of missingness and their missingness bitmaps, by the name of the dataset.
+    """
+    global evaluation_data_of_worker
+    evaluation_data_of_worker = evaluation_data
+
+
+def evaluate_imputation_task(task):
+    """
+    Evaluate one imputation method on one feature of a dataset with one percentage of missingness.
+
+        :param task: the tuple of the dataset name, feature, imputation method and missingness percentage.
+        :return: the task extended by the percentage of correct imputations, the RMSE and the MAPE.
+    """
+    dataset, column, function_name, level = task
+    ground_truth_data, missingness_levels_data = evaluation_data_of_worker[dataset]
+    data_with_missingness, missingness = missingness_levels_data[level]
+    return task + ImputeData().evaluate_imputation_method(
+        data_with_missingness, ground_truth_data, column, function_name, missingness)
+
+
+def impute_posterior_chain(task):
+    """
+    Impute the data through one MICE chain of the multiple imputation.
+
+        :param task: the tuple of the data with missingness, the columns with missing values and the seed of the chain.
+        :return: the imputed data of the chain.
+    """
+    data, col_names, random_state = task
+    return im.mice_posterior_impute_all_values(data, col_names, random_state)
+
 
 class ImputeData(object):
     """
@@ -56,25 +121,52 @@ class ImputeData(object):
             fw.write_df_to_file(self.mask_missing, 'missing-values.csv')
 
         if Opt.evaluate_best_imputation_method_for_data.value:
-            step = Opt.min_limit.value
-            self.create_missingness_and_apply_imputation(
-                train, Opt.min_limit.value, Opt.max_limit.value, step, col_names)
-            self.create_missingness_and_apply_imputation(
-                test, Opt.min_limit.value, Opt.max_limit.value, step, col_names)
-            self.create_missingness_and_apply_imputation(
-                complete_dataset, Opt.min_limit.value, Opt.max_limit.value, step, col_names)
+            self.evaluate_best_imputation_methods(data)
 
         best = self.apply_best_imputation_method_per_feature(
             data.copy(), col_names)
         mice = self.apply_mice_for_all_features(data.copy(), col_names)
         knn = self.apply_knn_for_all_features(data.copy(), col_names)
-        const = data.copy().fillna("-1")
-        hconst = data.copy().fillna("1000")
+        const = self.apply_constant_for_all_features(data.copy(), Opt.constant_imputation_value.value)
+        hconst = self.apply_constant_for_all_features(data.copy(), Opt.high_constant_imputation_value.value)
         none = data.copy()
         compl = complete_dataset.copy()
 
         return [best, mice, knn, const, hconst, none, compl]
 
+    def __init__(self):
+        """
+            The constructor that sets the initialization parameters for the imputation handler.
+        """
+        # best imputation method per feature, loaded on the first imputation
+        self.imputation_plan = None
+
+    def evaluate_best_imputation_methods(self, data, min_limit=Opt.min_limit.value, max_limit=Opt.max_limit.value,
+                                         step=Opt.min_limit.value):
+        """
+        Evaluate all imputation methods on the complete samples of the data, and store the best method
+        per feature as imputation plan, which is applied by `apply_best_imputation_method_per_feature`.
+        The complete samples are split into training, test and validation set, and the missingness
+        between `min_limit` and `max_limit` percent is simulated in each of them.
+
+            :param data: the dataframe with missing values.
+            :param min_limit: the minimum percentage of missingness to simulate in the data.
+            :param max_limit: the maximum percentage of missingness to simulate in the data.
+            :param step: the step size to use for the simulation of the missingness in the data.
+            :return: the dictionary of the imputation function names by feature.
+        """
+        data = dfo.set_to_minus_one(data, Opt.X_score.value, Opt.Y_score.value)
+        complete_dataset = dfo.get_complete_samples_of_dataset(data).copy()
+        train, validate, test = self.split_data_into_training_test_validation_sets(
+            complete_dataset, Opt.percentage_training.value, Opt.percentage_test.value)
+        col_names = dfo.get_column_names_with_missing_data(data)
+
+        evaluation_results = self.evaluate_imputation_methods(
+            {'training': train, 'test': test, 'complete': complete_dataset}, min_limit, max_limit, step, col_names)
+        self.imputation_plan = self.create_imputation_plan(evaluation_results, data)
+        fw.write_string_to_file(json.dumps(self.imputation_plan, indent=4), Opt.imputation_plan_file.value)
+        return self.imputation_plan
+
     def get_missingness_indicator(self):
         """
         Get an indicator matrix that shows which values were originally
@@ -98,8 +190,9 @@ class ImputeData(object):
         """
         Apply the selected imputation methods to the data with missingness.
         These are selected per feature based on the evaluation of the training set.
+        Features that share the same method are imputed together. Features without
+        a selected method are imputed by MICE.
 
-        This method was replaced with MICE as it is data specific.
         To identify the best method for each feature in new data sets, the evaluation
         needs to be repeated on the data (through `apply_all_imputation_methods`).
 
@@ -110,7 +203,81 @@ class ImputeData(object):
         if len(col_names) < 1:
             return data
 
-        return self.apply_mice_for_all_features(data, col_names)
+        plan = self.get_imputation_plan(data)
+        methods = {}
+        for column in col_names:
+            if column in plan:
+                methods.setdefault(plan[column], []).append(column)
+
+        data_with_missingness = data.copy()
+        for function_name, columns in methods.items():
+            data = im.impute_features(data, columns, function_name)
+            data = self.check_imputed_types(data_with_missingness, data, columns)
+
+        remaining = [column for column in col_names if column not in plan]
+        if len(remaining) > 0:
+            data = self.apply_mice_for_all_features(data, remaining)
+
+        return data
+
+    def get_imputation_plan(self, data):
+        """
+        Get the best imputation method per feature. The plan is loaded from its file, or created from
+        the evaluation results and stored, if no plan exists yet.
+
+            :param data: the dataframe with missingness to impute.
+            :return: the dictionary of the imputation function names by feature, which is empty
+            if no evaluation results exist.
+        """
+        if self.imputation_plan is not None:
+            return self.imputation_plan
+
+        path = fw.get_path_to_output_data(Opt.imputation_plan_file.value)
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                self.imputation_plan = json.load(file)
+            return self.imputation_plan
+
+        evaluation_results = self.read_evaluation_results()
+        if len(evaluation_results) == 0:
+            return {}
+
+        self.imputation_plan = self.create_imputation_plan(evaluation_results, data)
+        fw.write_string_to_file(json.dumps(self.imputation_plan, indent=4), Opt.imputation_plan_file.value)
+        return self.imputation_plan
+
+    def create_imputation_plan(self, evaluation_results, data):
+        """
+        Select the best imputation method per feature from the evaluation results. The results on the training
+        set are used, if available. For each feature, the simulated missingness closest to the missingness
+        of the feature in the data is considered. Numeric features are ranked by the lowest RMSE,
+        then MAPE, and other features by the highest percentage of correct imputations.
+
+            :param evaluation_results: the tidy dataframe with the error metrics of the evaluation.
+            :param data: the dataframe with missingness to impute.
+            :return: the dictionary of the imputation function names by feature.
+        """
+        if (evaluation_results['Dataset'] == 'training').any():
+            evaluation_results = evaluation_results[evaluation_results['Dataset'] == 'training']
+
+        missingness = em.get_percentage_of_missing_data(data)
+        plan = {}
+        for column, results in evaluation_results.groupby('Feature'):
+            if column not in data:
+                continue
+
+            distance = (results['Missingness'] - missingness[column]).abs()
+            results = results[distance == distance.min()]
+            results = results.groupby('Method')[['Corr', 'RMSE', 'MAPE']].mean()
+
+            if dfo.feature_has_object_type(data, column) or results['RMSE'].isna().all():
+                results = results.sort_values('Corr', ascending=False, kind='stable')
+            else:
+                results = results.sort_values(['RMSE', 'MAPE', 'Corr'], ascending=[True, True, False],
+                                              kind='stable')
+            plan[column] = results.index[0]
+
+        return plan
 
     def apply_mice_for_all_features(self, data, col_names):
         """
@@ -122,6 +289,41 @@ class ImputeData(object):
         """
         return im.mice_impute_all_values(data, col_names)
 
+    def apply_multiple_imputation(self, data, col_names, executor=None):
+        """
+        Apply multiple imputation to the data with missingness. The `number_of_imputations` MICE chains
+        sample their imputed values from the posterior with different seeds, and are run in parallel.
+
+            :param data: the dataframe with missingness to impute.
+            :param col_names: the columns of the dataframe that contain missing values.
+            :param executor: the process pool to run the chains on, or `None` to start a new pool.
+            :return: the list of the dataframes imputed by each chain.
+        """
+        tasks = [(data, col_names, random_state) for random_state in range(Opt.number_of_imputations.value)]
+        if executor is not None:
+            return list(executor.map(impute_posterior_chain, tasks))
+
+        with ProcessPoolExecutor(max_workers=Opt.number_of_processes.value,
+                                 mp_context=multiprocessing.get_context(Opt.process_start_method.value)) as executor:
+            return list(executor.map(impute_posterior_chain, tasks))
+
+    def pool_imputations(self, data_with_missingness, imputed_data_list, col_names):
+        """
+        Pool the imputations of several chains into one imputation by the mean of their imputed values.
+        The pooled values are checked like the values of a single imputation.
+
+            :param data_with_missingness: the dataframe with missingness.
+            :param imputed_data_list: the list of the dataframes imputed by each chain.
+            :param col_names: the columns of the dataframe that contain missing values.
+            :return: the dataframe imputed by the pooled values.
+        """
+        result = data_with_missingness.copy()
+        columns = [col for col in col_names if col in result]
+
+        pooled_data = sum(imputed_data[columns].astype(float) for imputed_data in imputed_data_list)
+        result[columns] = pooled_data / len(imputed_data_list)
+        return self.check_imputed_types(data_with_missingness, result, columns)
+
     def apply_knn_for_all_features(self, data, col_names):
         """
         Apply KNN imputation to the data with missingness.
@@ -132,24 +334,25 @@ class ImputeData(object):
         """
         return im.knn_impute_all_values(data, col_names)
 
-    def create_missingness_and_apply_imputation(self, data, min_limit, max_limit, step, col_names):
+    def apply_constant_for_all_features(self, data, value, profile=None):
         """
-        Create different missingness percentages in data and apply all imputation methods on it.
-        This method is used for the evaluation of the imputation methods on the dataframe to select
-        the best imputation technique for each of the features with missingness.
+        Impute all missing values by a constant. The missing values of numeric features are filled in place
+        by the numeric constant, so that these features keep their data type (e.g. float64 or float32) and
+        stay numeric for the further processing. Other features are filled by the constant as a string.
+        The indicator of the originally missing values is kept by `get_missingness_indicator`.
 
-            :param data: the complete data to simulate missingness in it.
-            :param min_limit: the minimum percentage of missingness to simulate in the data.
-            :param max_limit: the maximum percentage of missingness to simulate in the data.
-            :param step: the step size to use for the simulation of the missingness in the data.
-            :param col_names: the names of the columns to use for the simulation of missingness.
+            :param data: the dataframe with missingness to impute.
+            :param value: the numeric constant to impute.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
+            :return: the dataframe imputed by the constant.
         """
-        missingness_levels_data = self.create_data_with_different_missingness(
-            min_limit, max_limit, step, data, col_names)
-        eval_errors_file_content = self.create_header_for_evaluation_file(
-            min_limit, max_limit, step)
-        self.apply_all_imputation_methods(
-            missingness_levels_data, data, col_names, eval_errors_file_content)
+        self.mask_missing = self.mark_missing_values(data)
+
+        numeric_columns = set(dfo.get_numeric_feature_names(data, profile))
+        fill_values = {column: value if column in numeric_columns else str(value)
+                       for column in dfo.get_column_names_with_missing_data(data)}
+        data.fillna(fill_values, inplace=True)
+        return data
 
     def split_data_into_training_test_validation_sets(self, data, percentage_training, percentage_test):
         """
@@ -160,149 +363,196 @@ class ImputeData(object):
             :param percentage_test: the percentage that defines the size of the test set.
             :return: the three subsets of the dataset.
         """
-        return np.split(data.sample(frac=1, random_state=42), [int(percentage_training * len(data)),
-                                                               int((1 - percentage_test) * len(data))])
+        shuffled = data.sample(frac=1, random_state=42)
+        training_end, test_start = int(percentage_training * len(data)), int((1 - percentage_test) * len(data))
+        return shuffled.iloc[:training_end], shuffled.iloc[training_end:test_start], shuffled.iloc[test_start:]
 
     def create_data_with_different_missingness(self, min_limit, max_limit, step, data, col_names):
         """
-        Create an array of dataframes with different missingness percentages.
+        Create a dictionary of dataframes with different missingness percentages. The missingness of
+        each percentage is simulated with a fixed seed, so that a resumed evaluation uses the same data.
 
             :param min_limit: the minimum percentage of missingness to simulate in the data.
             :param max_limit: the maximum percentage of missingness to simulate in the data.
             :param step: the step size to use for the simulation of the missingness in the data.
             :param data: the dataframe to use for the simulation of missingness in the data.
             :param col_names: the column names of features to use for the simulation of missingness in the data.
-            :return: A list of dataframes with different missingness percentages of the data simulated.
+            :return: A dictionary of the dataframes with different missingness percentages of the data simulated
+            and their missingness bitmaps, by their missingness percentage.
         """
         missingness_percent = min_limit
-        missingness_levels_data = []
-        i = 0
+        missingness_levels_data = {}
 
+        # the missingness of the data is scanned once and shared by all simulated missingness percentages
+        missingness = MissingnessBitmap.from_data(data)
         while missingness_percent <= max_limit:
-            missingness_levels_data.append(self.sim_missingness(
-                data, col_names, missingness_percent))
+            missingness_levels_data[missingness_percent] = self.sim_missingness(
+                data, col_names, missingness_percent, random_state=int(missingness_percent), missingness=missingness)
             missingness_percent += step
-            i += 1
         return missingness_levels_data
 
-    def sim_missingness(self, data, col, percentage):
+    def sim_missingness(self, data, col, percentage, random_state=None, missingness=None):
         """
         Simulate the specified amount of missingness in the specified column of the dataframe.
+        The simulated missing values are marked in a copy of the missingness bitmap of the data,
+        so that the evaluation does not scan the data for missing values again.
 
             :param data: the complete dataframe to use for the simulation of missingness.
             :param col: the name of the colum to use for the simulation of missingness.
             :param percentage: the percentage of missingness to simulate.
-            :return: the dataframe with simulated missingness.
+            :param random_state: the seed of the simulation, or `None` for a random simulation.
+            :param missingness: the missingness bitmap of the data, or `None` to create it from the data.
+            :return: the dataframe with simulated missingness and its missingness bitmap.
         """
+        if missingness is None:
+            missingness = MissingnessBitmap.from_data(data)
+
         data_with_missingness = data.copy()
         sim_missing_number = em.calculate_number_from_percentage(
             len(data), percentage)
 
-        data_with_missingness.loc[data_with_missingness[col].sample(
-            n=sim_missing_number).index, col] = np.NaN
-        return data_with_missingness
+        rows = data_with_missingness[col].sample(n=sim_missing_number, random_state=random_state).index
+        data_with_missingness.loc[rows, col] = np.nan
+
+        columns = [col] if np.isscalar(col) else col
+        return data_with_missingness, missingness.with_missing_values(data.index.get_indexer(rows), columns)
 
-    def create_header_for_evaluation_file(self, min_limit, max_limit, step):
+    def evaluate_imputation_methods(self, datasets, min_limit, max_limit, step, col_names):
         """
-        Create list from `min_limit` to `max_limit` with missingness percentages and use it for the file header.
+        Create different missingness percentages in each dataset and apply all imputation methods on them.
+        This method is used for the evaluation of the imputation methods on the dataframe to select
+        the best imputation technique for each of the features with missingness.
 
+            :param datasets: the dictionary of complete datasets (e.g. training and test set) by their name.
             :param min_limit: the minimum percentage of missingness to simulate in the data.
             :param max_limit: the maximum percentage of missingness to simulate in the data.
             :param step: the step size to use for the simulation of the missingness in the data.
-            :return: the file header including the percentages of missingness in the data and the error metrics used
-            for the evaluation of the data.
+            :param col_names: the names of the columns to use for the simulation of missingness.
+            :return: the tidy dataframe with the error metrics of all datasets, features, methods and
+            missingness levels.
         """
-        eval_errors_file_header = "Method + Feature"
-        header_missingness_scale = np.arange(
-            min_limit, max_limit + step, step).tolist()
+        evaluation_data = {}
+        for name, data in datasets.items():
+            evaluation_data[name] = (data, self.create_data_with_different_missingness(
+                min_limit, max_limit, step, data, col_names))
 
-        for header_entry in header_missingness_scale:
-            eval_errors_file_header += Opt.separator.value + \
-                str(header_entry) + "% missing_Corr"
-            eval_errors_file_header += Opt.separator.value + \
-                str(header_entry) + "% missing_RMSE"
-            eval_errors_file_header += Opt.separator.value + \
-                str(header_entry) + "% missing_MAPE"
+        return self.apply_all_imputation_methods(evaluation_data, col_names)
 
-        return eval_errors_file_header
+    def apply_all_imputation_methods(self, evaluation_data, col_names):
+        """
+        Apply all imputation methods on the data with different missingness percentages and evaluate them.
+        Each combination of dataset, feature, imputation method and missingness percentage is evaluated as
+        a separate task on a process pool. The error metrics are appended to the evaluation file in batches,
+        so that an interrupted evaluation resumes with the tasks that are not evaluated yet.
 
-    def apply_specified_imputation_method(self, missingness_levels_data, ground_truth_data, column, function_name):
+            :param evaluation_data: the dictionary of the ground truth dataframe and the dataframes with
+            different percentages of missingness and their missingness bitmaps, by the name of the dataset.
+            :param col_names: the column names of features with missing data.
+            :return: the tidy dataframe with the error metrics of all evaluated tasks.
+        """
+        evaluated = self.read_evaluation_results()
+        done = set(evaluated[evaluation_columns[:4]].itertuples(index=False, name=None))
+        tasks = [task for task in self.get_evaluation_tasks(evaluation_data, col_names)
+                 if task not in done]
+        print(str(len(done)) + " imputation tasks already evaluated, " + str(len(tasks)) + " tasks remaining")
+
+        results = []
+        try:
+            with ProcessPoolExecutor(max_workers=Opt.number_of_processes.value, initializer=init_evaluation_worker,
+                                     initargs=(evaluation_data,),
+                                     mp_context=multiprocessing.get_context(Opt.process_start_method.value)) as executor:
+                futures = {executor.submit(evaluate_imputation_task, task): task for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        print("Imputation task " + str(futures[future]) + " could not be evaluated: " + repr(e))
+
+                    if len(results) >= Opt.imputation_checkpoint_size.value:
+                        self.write_evaluation_results(results)
+                        results = []
+        finally:
+            self.write_evaluation_results(results)
+
+        return self.read_evaluation_results()
+
+    def get_evaluation_tasks(self, evaluation_data, col_names):
         """
-        Apply the imputation method specified by `function_name` to the `missingness_levels_data`.
+        Get all evaluation tasks as tuples of the dataset name, feature, imputation method and missingness
+        percentage. Features of object type are only evaluated with the imputation of the most frequent value.
 
-            :param missingness_levels_data: the dataframes with different percentages of missingness.
+            :param evaluation_data: the dictionary of the ground truth dataframe and the dataframes with
+            different percentages of missingness and their missingness bitmaps, by the name of the dataset.
+            :param col_names: the column names of features with missing data.
+            :return: the list of evaluation tasks.
+        """
+        tasks = []
+        for dataset, (ground_truth_data, missingness_levels_data) in evaluation_data.items():
+            for column in col_names:
+                for function_name in function_list:
+                    if ((function_name != im.univariate_most_frequent.__name__)
+                            and dfo.feature_has_object_type(ground_truth_data, column)):
+                        continue
+                    tasks.extend((dataset, column, function_name, level) for level in missingness_levels_data)
+
+        return tasks
+
+    def evaluate_imputation_method(self, data_with_missingness, ground_truth_data, column, function_name,
+                                   missingness=None):
+        """
+        Apply the imputation method specified by `function_name` to the `data_with_missingness` and
+        evaluate the imputed values of `column`.
+
+            :param data_with_missingness: the dataframe with simulated missingness.
             :param ground_truth_data: the ground truth dataframe without missingness.
             :param column: the column name of the feature to impute.
             :param function_name: the name of the imputation function to apply.
-            :return: the string variable that holds the evaluation results.
-        """
-        eval_errors = "\n" + function_name + Opt.underline_symbol.value + column
-        for data_with_missingness in missingness_levels_data:
-
-            res = getattr(im, function_name)(
-                data_with_missingness.copy(), column)
-            res = self.check_imputed_type(data_with_missingness, res, column)
-            if Opt.write_data_to_file.value:
-                fw.write_df_to_file(res[column], Opt.imputation_path.value +
-                                    Opt.underline_symbol.value + function_name + column + Opt.file_type.value)
-
-            correctly_imputed = em.get_percentage_of_correct_imputation(
-                res, ground_truth_data, data_with_missingness, column)
-            eval_errors += Opt.separator.value + str(correctly_imputed).replace(
-                Opt.decimal_point.value, Opt.decimal_comma.value)
-
-            if not (dfo.feature_has_object_type(data_with_missingness, column)):
-                rmse = em.calculateRMSE(
-                    res, ground_truth_data, data_with_missingness, column)
-                mape = em.calculateMAPE(
-                    res, ground_truth_data, data_with_missingness, column)
-                eval_errors += (Opt.separator.value
-                                + str(rmse).replace(Opt.decimal_point.value,
-                                                    Opt.decimal_comma.value)
-                                + Opt.separator.value
-                                + str(mape).replace(Opt.decimal_point.value, Opt.decimal_comma.value))
-            else:
-                eval_errors += Opt.separator.value + Opt.dash_symbol.value + \
-                    Opt.separator.value + Opt.dash_symbol.value
-        return eval_errors
+            :param missingness: the missingness bitmap of `data_with_missingness`, or `None` to check the data.
+            :return: the percentage of correct imputations, the RMSE and the MAPE of the imputed values.
+            RMSE and MAPE are `NaN` for features of object type.
+        """
+        res = getattr(im, function_name)(
+            data_with_missingness.copy(), column)
+        res = self.check_imputed_type(data_with_missingness, res, column)
+        if Opt.write_data_to_file.value:
+            fw.write_df_to_file(res[column], Opt.imputation_path.value +
+                                Opt.underline_symbol.value + function_name + column + Opt.file_type.value)
+
+        mask = None if missingness is None else missingness.get_column(column)
+        correctly_imputed = em.get_percentage_of_correct_imputation(
+            res, ground_truth_data, data_with_missingness, column, mask)
 
-    def apply_all_imputation_methods(self, missingness_levels_data, ground_truth_data, col_names,
-                                     eval_errors_file_content):
+        if dfo.feature_has_object_type(data_with_missingness, column):
+            return correctly_imputed, np.nan, np.nan
+
+        rmse = em.calculateRMSE(
+            res, ground_truth_data, data_with_missingness, column, mask)
+        mape = em.calculateMAPE(
+            res, ground_truth_data, data_with_missingness, column, mask)
+        return correctly_imputed, rmse, mape
+
+    def read_evaluation_results(self):
         """
-        Apply all imputation methods on `missingness_levels_data` with different missingness percentages and write the
-        resulting error metrics for all missingness levels and imputation methods to a file.
+        Read the error metrics that are already written to the evaluation file.
 
-            :param missingness_levels_data: the dataframes with different percentages of missingness.
-            :param ground_truth_data: the ground truth dataframe without missingness.
-            :param col_names: the column names of features with missing data.
-            :param eval_errors_file_content: the string variable with a header to safe the evaluation results to.
-        """
-        function_list = [
-            im.univariate_mean.__name__,
-            im.univariate_median.__name__,
-            im.univariate_most_frequent.__name__,  # also suitable for categorical features
-            im.linear_regression.__name__,
-            im.mice_imp.__name__,
-            im.mice_numeric_features.__name__,
-            im.knn_one_feature.__name__,
-            im.knn_same_type_features.__name__,
-            im.knn_numeric_features.__name__,
-            im.multivariate.__name__,
-            im.multivariate_more_iter.__name__,
-            im.multivariate_more_iter_same_type_features.__name__,
-            im.multivariate_more_iter_numeric_features.__name__,
-        ]
-        for column in col_names:
-            for function_name in function_list:
-                if ((function_name != im.univariate_most_frequent.__name__)
-                        and dfo.feature_has_object_type(missingness_levels_data[0], column)):
-                    pass
-                else:
-                    eval_errors_file_content += self.apply_specified_imputation_method(
-                        missingness_levels_data, ground_truth_data, column, function_name)
+            :return: the tidy dataframe with the error metrics, which is empty if no file exists.
+        """
+        path = fw.get_path_to_output_data(Opt.imputation_evaluation_file.value)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=evaluation_columns)
 
-        fw.write_string_to_file(
-            eval_errors_file_content, "/imputation/evaluation/evaluation_errors_data.csv")
+        return pd.read_csv(path, sep=Opt.separator.value, decimal=Opt.decimal_comma.value,
+                           encoding=Opt.encoding.value)
+
+    def write_evaluation_results(self, results):
+        """
+        Append error metrics to the evaluation file.
+
+            :param results: the list of evaluated tasks with their error metrics.
+        """
+        if len(results) > 0:
+            fw.append_df_to_file(pd.DataFrame(results, columns=evaluation_columns),
+                                 Opt.imputation_evaluation_file.value)
 
     def check_imputed_type(self, data_with_missingness, imputed_data, column):
         """
@@ -318,15 +568,27 @@ class ImputeData(object):
             :param column: the column of the data to check.
             :return: the checked and updated imputed data.
         """
-        if dfo.feature_has_object_type(data_with_missingness, column):
-            return imputed_data
+        return self.check_imputed_types(data_with_missingness, imputed_data, [column])
 
-        elif dfo.feature_is_binary(data_with_missingness, column):
-            if not dfo.feature_is_binary(imputed_data, column):
-                imputed_data[column] = imputed_data[column].round()
+    def check_imputed_types(self, data_with_missingness, imputed_data, columns):
+        """
+        Check the imputed values of several features like `check_imputed_type`. The features are
+        classified once, and all binary or discrete features that are not binary or discrete
+        anymore after the imputation are rounded together.
+
+            :param data_with_missingness: the data with missing values.
+            :param imputed_data: the data with the imputed values.
+            :param columns: the columns of the data to check.
+            :return: the checked and updated imputed data.
+        """
+        kinds = dfo.get_feature_kinds(data_with_missingness[columns])
+        if (kinds == 'object').all():
+            return imputed_data
 
-        elif dfo.feature_is_discrete(data_with_missingness, column):
-            if not dfo.feature_is_discrete(imputed_data, column):
-                imputed_data[column] = imputed_data[column].round()
+        imputed_kinds = dfo.get_feature_kinds(imputed_data[columns])
+        to_round = kinds.index[((kinds == 'binary') & (imputed_kinds != 'binary'))
+                               | ((kinds == 'discrete') & (imputed_kinds.isin(['object', 'continuous'])))]
+        if len(to_round) > 0:
+            imputed_data[to_round] = imputed_data[to_round].round()
 
         return dfo.set_to_minus_one(imputed_data, Opt.X_score.value, Opt.Y_score.value)
@@ -0,0 +1,179 @@
+from source.Options import Opt
+import pandas as pd
+import pathlib
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+fingerprint_file_type = '.json'
+feather_file_type = '.feather'
+pickle_file_type = '.pkl'
+
+
+def get_path_to_cache(source_path, file_type):
+    """
+    Get the path of a cache file that belongs to an input file.
+
+        :param source_path: the path of the input file.
+        :param file_type: the file type of the cache file.
+        :return: the file path as a string.
+    """
+    directory = str(os.path.join(pathlib.Path().resolve(), Opt.cache_folder.value))
+    if not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    name = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()
+    return os.path.join(directory, name + file_type)
+
+
+def get_file_fingerprint(source_path):
+    """
+    Determine the fingerprint of an input file by its path, size, modification time and content hash.
+
+        :param source_path: the path of the input file.
+        :return: the fingerprint as a dictionary.
+    """
+    stat = os.stat(source_path)
+    hash_function = hashlib.sha1()
+    with open(source_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            hash_function.update(block)
+
+    return {'path': os.path.abspath(source_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'hash': hash_function.hexdigest(),
+            'version': Opt.input_cache_version.value
+            }
+
+
+def read_fingerprint(source_path):
+    """
+    Read the stored fingerprint of an input file.
+
+        :param source_path: the path of the input file.
+        :return: the stored fingerprint as a dictionary, or `None` if no fingerprint is stored.
+    """
+    path = get_path_to_cache(source_path, fingerprint_file_type)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def write_fingerprint(source_path, fingerprint):
+    """
+    Store the fingerprint of an input file.
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the fingerprint as a dictionary.
+    """
+    with open(get_path_to_cache(source_path, fingerprint_file_type), 'w') as file:
+        json.dump(fingerprint, file)
+
+
+def read_valid_fingerprint(source_path, fingerprint):
+    """
+    Read the stored fingerprint of an input file, if the file did not change since it was stored.
+    Besides the fingerprint, it contains the cached properties of the file (e.g. its encoding).
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the current fingerprint of the input file.
+        :return: the stored fingerprint as a dictionary, or `None` if no valid fingerprint is stored.
+    """
+    stored_fingerprint = read_fingerprint(source_path)
+    if stored_fingerprint is None:
+        return None
+
+    if any(stored_fingerprint.get(key) != value for key, value in fingerprint.items()):
+        return None
+
+    return stored_fingerprint
+
+
+def load_cached_encoding(source_path, fingerprint):
+    """
+    Load the cached encoding of an input file, if the file did not change since it was cached.
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the current fingerprint of the input file.
+        :return: the cached encoding, or `None` if no valid cache exists.
+    """
+    stored_fingerprint = read_valid_fingerprint(source_path, fingerprint)
+    if stored_fingerprint is None:
+        return None
+
+    return stored_fingerprint.get('encoding')
+
+
+def store_cached_encoding(source_path, fingerprint, encoding):
+    """
+    Store the encoding of an input file together with the fingerprint of the file.
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the current fingerprint of the input file.
+        :param encoding: the encoding of the input file.
+    """
+    stored_fingerprint = read_valid_fingerprint(source_path, fingerprint) or dict(fingerprint)
+    stored_fingerprint['encoding'] = encoding
+    write_fingerprint(source_path, stored_fingerprint)
+
+
+def load_cached_data(source_path, fingerprint):
+    """
+    Load the cached dataframe of an input file, if the file did not change since it was cached.
+    Feather files are read with `pyarrow` and converted into a dataframe, which copies their columns.
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the current fingerprint of the input file.
+        :return: the cached dataframe, or `None` if no valid cache exists.
+    """
+    stored_fingerprint = read_valid_fingerprint(source_path, fingerprint)
+    if stored_fingerprint is None or stored_fingerprint.get('data') is None:
+        return None
+
+    path = get_path_to_cache(source_path, stored_fingerprint['data'])
+    if not os.path.exists(path):
+        return None
+
+    try:
+        if stored_fingerprint['data'] == feather_file_type and feather is not None:
+            return feather.read_feather(path)
+        if stored_fingerprint['data'] == pickle_file_type:
+            return pd.read_pickle(path)
+    except Exception as e:
+        print("Cache of '" + source_path + "' could not be read: " + str(e))
+
+    return None
+
+
+def store_cached_data(source_path, fingerprint, data):
+    """
+    Store the dataframe of an input file in the columnar cache, together with the fingerprint of the file.
+    The dataframe is stored as a Feather file, if `pyarrow` is available, otherwise it is pickled.
+
+        :param source_path: the path of the input file.
+        :param fingerprint: the current fingerprint of the input file.
+        :param data: the cleaned dataframe of the input file.
+    """
+    fingerprint = read_valid_fingerprint(source_path, fingerprint) or dict(fingerprint)
+    fingerprint['data'] = None
+
+    try:
+        if feather is not None:
+            feather.write_feather(data, get_path_to_cache(source_path, feather_file_type))
+            fingerprint['data'] = feather_file_type
+    except Exception as e:
+        print("Feather cache of '" + source_path + "' could not be written: " + str(e))
+
+    if fingerprint['data'] is None:
+        data.to_pickle(get_path_to_cache(source_path, pickle_file_type))
+        fingerprint['data'] = pickle_file_type
+
+    write_fingerprint(source_path, fingerprint)
@@ -1,12 +1,82 @@
 from source.Options import Opt
+from source.StageCache import StageCache
+import numpy as np
 import pandas as pd
+import hashlib
 
 
 class MergeData(object):
     """
-        A class for merging the data of three csv files for radiomic, genomic, and clinical data.
+        A class for merging the data of any number of modalities (e.g. radiomic, genomic, and clinical data)
+        by their common id. The ids of each modality are mapped to integer codes, whose sorted order is
+        stored as key index, so that the samples of all modalities are aligned by a positional take
+        instead of repeated hash joins. The modalities that do not change between requests can be
+        registered once, so that their aligned blocks are cached.
     """
 
+    def __init__(self):
+        """
+            The constructor that sets the initialization parameters for the data merger.
+        """
+        self.id_column = Opt.ID.value
+        self.modalities = []
+        self.id_vocabulary = pd.Index([])
+        self.block_cache = StageCache(Opt.stage_cache_size.value)
+
+    def __getstate__(self):
+        """
+        Get the attributes of the data merger to transfer it to another process.
+        The cached aligned blocks are not transferred.
+
+            :return: the attributes of the data merger.
+        """
+        attributes = self.__dict__.copy()
+        attributes['block_cache'] = None
+        return attributes
+
+    def __setstate__(self, attributes):
+        """
+        Restore the attributes of the data merger in another process with an empty block cache.
+
+            :param attributes: the transferred attributes of the data merger.
+        """
+        self.__dict__.update(attributes)
+        self.block_cache = StageCache(Opt.stage_cache_size.value)
+
+    def set_modalities(self, data_list, id_column=Opt.ID.value):
+        """
+        Register the modalities that are merged with every further dataframe, and build their key indices.
+
+            :param data_list: the list of dataframes of the modalities.
+            :param id_column: the unique id for each sample in the dataframes.
+        """
+        self.id_column = id_column
+        self.id_vocabulary = self.build_id_vocabulary(data_list, id_column)
+        self.modalities = [(self.get_block(data, id_column),
+                            self.build_key_index(self.get_codes(data, id_column, self.id_vocabulary)))
+                           for data in data_list]
+        self.block_cache.clear()
+
+    def merge_with_modalities(self, data):
+        """
+        Merge a dataframe with the registered modalities. The samples keep the order of the dataframe,
+        and only samples available in all modalities are kept. The aligned blocks of the registered
+        modalities are cached by the ids they were aligned to.
+
+            :param data: the dataframe to merge, e.g. the imputed clinical data.
+            :return: the merged dataframe.
+        """
+        codes = self.get_codes(data, self.id_column, self.id_vocabulary)
+        positions = self.align_positions(codes, [key_index for _, key_index in self.modalities])
+
+        lead_block = self.get_block(data, self.id_column, keep_id=True)
+        key = hashlib.sha1(codes[positions[0]].tobytes()).hexdigest()
+        blocks = self.block_cache.get_or_compute(
+            'aligned_blocks', key, lambda: [self.take_block(block, modality_positions) for (block, _), modality_positions
+                                            in zip(self.modalities, positions[1:])])
+
+        return self.concat_blocks([self.take_block(lead_block, positions[0])] + blocks)
+
     def get_merged_data(self, clinical_list, genomic, radiomic):
         """
         Merge all datasets together and return a list of dataframes with the merged data.
@@ -19,17 +89,13 @@ class MergeData(object):
         if len(clinical_list) == 1:
             return self.merge_data([clinical_list[0], genomic, radiomic], Opt.ID.value)
 
-        merged_list = []
-        for clinical in clinical_list:
-            merged_df = self.merge_data(
-                [clinical, genomic, radiomic], Opt.ID.value)
-            merged_list.append(self.clean_merged_data(merged_df))
-
-        return merged_list
+        return [self.merge_data([clinical, genomic, radiomic], Opt.ID.value) for clinical in clinical_list]
 
     def merge_data(self, data_list, id_column):
         """
-        Merge the data of a list of dataframes together by a unique id.
+        Merge the data of a list of dataframes together by a unique id. The samples keep the order of
+        the first dataframe, and only samples available in all dataframes are kept. Columns that occur
+        in several dataframes (e.g. ids) are kept from the first dataframe that contains them.
 
             :param data_list: the list of dataframes to merge.
             :param id_column: the unique id for each sample in the dataframes.
@@ -41,30 +107,119 @@ class MergeData(object):
         if len(data_list) == 1:
             return data_list[0]
 
-        merged_df = data_list[0]
-        for i in range(len(data_list)):
-            if i < len(data_list) - 1:
-                merged_df = pd.merge(
-                    merged_df, data_list[i + 1], how='inner', left_on=id_column, right_on=id_column)
+        id_vocabulary = self.build_id_vocabulary(data_list[1:], id_column)
+        codes = self.get_codes(data_list[0], id_column, id_vocabulary)
+        positions = self.align_positions(
+            codes, [self.build_key_index(self.get_codes(data, id_column, id_vocabulary)) for data in data_list[1:]])
 
-        return merged_df
+        blocks = [self.get_block(data, id_column, keep_id=i == 0) for i, data in enumerate(data_list)]
+        return self.concat_blocks([self.take_block(block, block_positions)
+                                   for block, block_positions in zip(blocks, positions)])
 
-    def clean_merged_data(self, data):
+    @staticmethod
+    def build_id_vocabulary(data_list, id_column):
         """
-        Clean the merged dataframe. Remove duplicated columns (e.g. ids) and indices of original
-        dataframes. Rename columns with a postfix back to their original name. Keep only the first
-        occurrence of duplicated rows.
+        Build the sorted vocabulary of all ids of the dataframes, whose positions are used as integer codes.
 
-            :param data: the dataframe to clean.
-            :return: the cleaned dataframe.
+            :param data_list: the list of dataframes.
+            :param id_column: the unique id for each sample in the dataframes.
+            :return: the sorted index of the ids.
         """
-        data.drop(data.filter(regex='_y$').columns.tolist(),
-                  axis=1, inplace=True)
-        data.drop(data.filter(regex=Opt.idx.value +
-                  '_x').columns.tolist(), axis=1, inplace=True)
+        ids = pd.Index(np.concatenate([data[id_column].to_numpy(dtype=object) for data in data_list]))
+        return pd.Index(ids.unique()).sort_values()
 
-        data.rename(columns={Opt.cohort_number.value +
-                    '_x': Opt.cohort_number.value}, inplace=True)
-        data = data[~data.index.duplicated(keep='first')]
+    @staticmethod
+    def get_codes(data, id_column, id_vocabulary):
+        """
+        Map the ids of a dataframe to their integer codes.
+
+            :param data: the dataframe.
+            :param id_column: the unique id for each sample in the dataframe.
+            :param id_vocabulary: the sorted index of all known ids.
+            :return: the integer code of each sample, or -1 if its id is unknown.
+        """
+        return id_vocabulary.get_indexer(data[id_column].to_numpy(dtype=object))
+
+    @staticmethod
+    def build_key_index(codes):
+        """
+        Build the sorted key index of a modality. Unknown ids are excluded, and only the first
+        occurrence of a duplicated id is kept.
+
+            :param codes: the integer code of each sample of the modality.
+            :return: the sorted unique codes and the row position of each of them.
+        """
+        sorted_codes, positions = np.unique(codes, return_index=True)
+        known = sorted_codes >= 0
+        return sorted_codes[known], positions[known]
+
+    @staticmethod
+    def align_positions(codes, key_indices):
+        """
+        Align the samples of the leading dataframe with the key indices of further modalities.
+
+            :param codes: the integer code of each sample of the leading dataframe.
+            :param key_indices: the key indices of the further modalities.
+            :return: the row positions of the aligned samples in the leading dataframe, followed by
+                     the row positions of the same samples in each further modality.
+        """
+        codes = np.asarray(codes)
+        _, first_occurrence = np.unique(codes, return_index=True)
+        available = np.zeros(len(codes), dtype=bool)
+        available[first_occurrence] = True
+        available &= codes >= 0
+
+        lookups = []
+        for sorted_codes, positions in key_indices:
+            lookup = np.searchsorted(sorted_codes, codes)
+            lookup = np.minimum(lookup, max(len(sorted_codes) - 1, 0))
+            if len(sorted_codes) == 0:
+                available[:] = False
+            else:
+                available &= sorted_codes[lookup] == codes
+            lookups.append((lookup, positions))
+
+        lead_positions = np.flatnonzero(available)
+        return [lead_positions] + [positions[lookup[lead_positions]] for lookup, positions in lookups]
+
+    @staticmethod
+    def get_block(data, id_column, keep_id=False):
+        """
+        Get the block of a modality that is merged, without the index column of the original dataframe.
+
+            :param data: the dataframe of the modality.
+            :param id_column: the unique id for each sample in the dataframe.
+            :param keep_id: `true` if the id column is kept, otherwise `false`.
+            :return: the block of the modality.
+        """
+        dropped = [Opt.idx.value] if keep_id else [Opt.idx.value, id_column]
+        return data.drop(columns=dropped, errors='ignore')
+
+    @staticmethod
+    def take_block(block, positions):
+        """
+        Take the rows of a block at the given positions.
+
+            :param block: the block of a modality.
+            :param positions: the row positions to take.
+            :return: the aligned block with a new range index.
+        """
+        return block.take(positions).reset_index(drop=True)
+
+    @staticmethod
+    def concat_blocks(blocks):
+        """
+        Concatenate the aligned blocks column-wise. A column that occurs in several blocks
+        is kept from the first block that contains it.
+
+            :param blocks: the list of aligned blocks.
+            :return: the merged dataframe.
+        """
+        columns = set()
+        unique_blocks = []
+        for block in blocks:
+            block = block.loc[:, ~block.columns.isin(columns)]
+            columns.update(block.columns)
+            unique_blocks.append(block)
 
-        return data
+        return pd.concat(unique_blocks, axis=1)
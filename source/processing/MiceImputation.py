@@ -0,0 +1,135 @@
+import source.processing.DataFrameOps as dfo
+from source.Options import Opt
+from source.StageCache import StageCache
+
+from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+from sklearn.impute import IterativeImputer
+from sklearn.linear_model import BayesianRidge
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import ExtraTreesRegressor
+from sklearn.neighbors import KNeighborsRegressor
+
+import numpy as np
+import pandas as pd
+
+# estimators of the MICE imputation that can be selected by `Opt.mice_estimator`
+estimators = {
+    'bayesian_ridge': lambda: BayesianRidge(),
+    'linear_regression': lambda: LinearRegression(),
+    'extra_trees': lambda: ExtraTreesRegressor(n_estimators=10, random_state=0),
+    'knn': lambda: KNeighborsRegressor(n_neighbors=5),
+}
+
+# fitted MICE imputers by dataset fingerprint, feature subset and MICE options
+fitted_imputers = StageCache(Opt.stage_cache_size.value)
+
+# latest MICE imputations by the samples of the dataset, to warm-start the imputation of other feature subsets
+previous_imputations = StageCache(Opt.stage_cache_size.value)
+
+
+class WarmStartIterativeImputer(IterativeImputer):
+    """
+        An `IterativeImputer` whose missing values are initially filled with given values, e.g. with
+        the imputed values of a previous imputation, instead of the mean of each feature. As the
+        imputation starts close to its result, it converges within fewer iterations.
+    """
+
+    def __init__(self, estimator=None, max_iter=10, tol=1e-3, random_state=None, initial_values=None):
+        """
+            The constructor that sets the initialization parameters for the imputer.
+
+            :param estimator: the estimator to predict each feature from the other features.
+            :param max_iter: the maximum number of imputation rounds.
+            :param tol: the tolerance of the stopping condition.
+            :param random_state: the seed of the imputer.
+            :param initial_values: the matrix of initial values, which are `NaN` where the mean is used.
+        """
+        super().__init__(estimator=estimator, max_iter=max_iter, tol=tol, random_state=random_state)
+        self.initial_values = initial_values
+
+    def _initial_imputation(self, X, in_fit=False):
+        """
+        Fill the missing values with the initial values, where available, after the initial imputation
+        by the mean.
+
+            :param X: the matrix with missing values.
+            :param in_fit: `true` if the imputer is fitted, otherwise `false`.
+            :return: the results of the initial imputation of `IterativeImputer`.
+        """
+        results = super()._initial_imputation(X, in_fit)
+        if self.initial_values is None or np.shape(X) != self.initial_values.shape:
+            return results
+
+        X_filled, mask_missing_values = results[1], results[2]
+        initial_values = self.initial_values[:, ~np.isnan(np.asarray(X, dtype=float)).all(axis=0)]
+        warm_start = mask_missing_values & ~np.isnan(initial_values)
+        X_filled[warm_start] = initial_values[warm_start]
+        return results
+
+
+def impute_numeric_features(data):
+    """
+    Impute the numeric features of a dataframe through MICE. The fitted imputer is cached per dataset
+    fingerprint and feature subset, so that the same data is imputed by `transform` only, while the
+    imputation of the fit is used directly when the imputer is not cached yet. If the same
+    samples were imputed before with another feature subset, the imputation starts from the previously
+    imputed values of the shared features.
+
+        :param data: the numeric data with missingness to impute its values.
+        :return: the imputed dataframe.
+    """
+    options = (Opt.mice_max_iter.value, Opt.mice_tol.value, Opt.mice_estimator.value)
+    key = (dfo.get_data_fingerprint(data), tuple(data.columns)) + options
+    samples = dfo.get_data_fingerprint(pd.DataFrame(index=data.index))
+
+    imputer = fitted_imputers.get('mice', key)
+    if imputer is None:
+        imputer, imputed_matrix = fit_imputer(data, samples)
+        fitted_imputers.put('mice', key, imputer)
+    else:
+        imputed_matrix = imputer.transform(data.to_numpy(dtype=float))
+    imputed_data = pd.DataFrame(data=imputed_matrix, index=None, columns=data.columns)
+
+    previous_imputations.put('mice', samples, imputed_data)
+    return imputed_data
+
+
+def fit_imputer(data, samples):
+    """
+    Fit a MICE imputer on the data with the options `mice_max_iter`, `mice_tol` and `mice_estimator`,
+    and impute the data by the same fit.
+    If `mice_warm_start` is set, the imputer starts from the latest imputation of the same samples.
+
+        :param data: the numeric data with missingness.
+        :param samples: the fingerprint of the samples of the data.
+        :return: the fitted imputer and the matrix of the imputed data.
+    """
+    initial_values = None
+    previous = previous_imputations.get('mice', samples)
+    if Opt.mice_warm_start.value and previous is not None:
+        shared = previous.reindex(columns=data.columns)
+        initial_values = np.where(data.isna().to_numpy(), shared.to_numpy(dtype=float), np.nan)
+
+    imputer = WarmStartIterativeImputer(estimator=estimators[Opt.mice_estimator.value](),
+                                        max_iter=Opt.mice_max_iter.value, tol=Opt.mice_tol.value,
+                                        random_state=0, initial_values=initial_values)
+    imputed_matrix = imputer.fit_transform(data.to_numpy(dtype=float))
+    return imputer, imputed_matrix
+
+
+def impute_posterior_sample(data, random_state):
+    """
+    Impute the numeric features of a dataframe through one MICE chain that draws each imputed value
+    from the posterior predictive distribution of the estimator, instead of using its mean prediction.
+    Chains with different seeds yield different, equally plausible imputations. As the posterior
+    requires the standard deviation of the prediction, the estimator is always a Bayesian ridge.
+
+        :param data: the numeric data with missingness to impute its values.
+        :param random_state: the seed of the chain.
+        :return: the imputed dataframe.
+    """
+    imputer = IterativeImputer(estimator=BayesianRidge(), sample_posterior=True,
+                               max_iter=Opt.mice_max_iter.value, tol=Opt.mice_tol.value,
+                               random_state=random_state)
+    return pd.DataFrame(data=imputer.fit_transform(data.to_numpy(dtype=float)), index=None,
+                        columns=data.columns)
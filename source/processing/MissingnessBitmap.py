@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import base64
+
+
+class MissingnessBitmap(object):
+    """
+        A class for recording which values of a dataframe were originally missing, even if they are imputed
+        afterward. The indicator of each column is packed into bits, so that it needs one bit per value
+        instead of one byte of a boolean dataframe. The rows can be identified by the ids of the samples,
+        so that the bitmaps of several modalities can be aligned with the merged data.
+    """
+
+    def __init__(self, packed, columns, number_of_rows, ids=None):
+        """
+            The constructor that sets the initialization parameters for the missingness bitmap.
+
+            :param packed: the matrix of the packed bits with one row per column of the data.
+            :param columns: the names of the columns of the data.
+            :param number_of_rows: the number of rows of the data.
+            :param ids: the id of each row of the data, or `None` if the rows are not identified.
+        """
+        self.packed = packed
+        self.columns = pd.Index(columns)
+        self.number_of_rows = number_of_rows
+        self.ids = None if ids is None else np.asarray(ids, dtype=object)
+
+    @staticmethod
+    def from_mask(mask, columns, ids=None):
+        """
+        Create a missingness bitmap from a boolean indicator matrix.
+
+            :param mask: the boolean matrix that is `true` for missing values.
+            :param columns: the names of the columns of the matrix.
+            :param ids: the id of each row of the matrix, or `None` if the rows are not identified.
+            :return: the missingness bitmap.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        return MissingnessBitmap(np.packbits(mask.T, axis=1), columns, mask.shape[0], ids)
+
+    @staticmethod
+    def from_data(data, id_column=None):
+        """
+        Create a missingness bitmap of the missing values of a dataframe.
+
+            :param data: the dataframe with missing values.
+            :param id_column: the column with the id of each sample, or `None` if the rows are not identified.
+            :return: the missingness bitmap.
+        """
+        ids = None
+        if id_column is not None and id_column in data:
+            ids = data[id_column].to_numpy(dtype=object)
+
+        return MissingnessBitmap.from_mask(data.isna().to_numpy(dtype=bool), data.columns, ids)
+
+    @staticmethod
+    def merge(bitmaps, ids, columns):
+        """
+        Align the bitmaps of several modalities with merged data. The rows are aligned by their ids, where
+        the first occurrence of an id in a modality is used, like in the merge of the data. A column that occurs
+        in several bitmaps is taken from the first bitmap that contains it. Values of columns or ids that are
+        not contained in any bitmap are not marked as missing.
+
+            :param bitmaps: the list of the identified bitmaps of the modalities.
+            :param ids: the id of each row of the merged data.
+            :param columns: the names of the columns of the merged data.
+            :return: the missingness bitmap of the merged data.
+        """
+        ids = np.asarray(ids, dtype=object)
+        columns = pd.Index(columns)
+        mask = np.zeros((len(ids), len(columns)), dtype=bool)
+        assigned = np.zeros(len(columns), dtype=bool)
+
+        for bitmap in bitmaps:
+            positions = bitmap.columns.get_indexer(columns)
+            targets = np.flatnonzero((positions >= 0) & ~assigned)
+            if len(targets) == 0:
+                continue
+
+            rows = bitmap.get_row_positions(ids)
+            available = rows >= 0
+            block = bitmap.get_mask(positions[targets])
+            mask[np.ix_(available, targets)] = block[rows[available]]
+            assigned[targets] = True
+
+        return MissingnessBitmap.from_mask(mask, columns, ids)
+
+    def get_row_positions(self, ids):
+        """
+        Get the positions of the rows with the given ids. If an id occurs several times, its first row is used.
+
+            :param ids: the ids of the rows.
+            :return: the array of the row positions, which are `-1` for unknown ids.
+        """
+        index = pd.Index(self.ids)
+        first_occurrence = np.flatnonzero(~index.duplicated(keep='first'))
+        positions = index[first_occurrence].get_indexer(np.asarray(ids, dtype=object))
+        return np.where(positions >= 0, first_occurrence[positions], -1)
+
+    def get_mask(self, positions=None):
+        """
+        Unpack the boolean indicator matrix of the missing values.
+
+            :param positions: the positions of the columns to unpack, or `None` for all columns.
+            :return: the boolean matrix that is `true` for missing values.
+        """
+        packed = self.packed if positions is None else self.packed[positions]
+        return np.unpackbits(packed, axis=1, count=self.number_of_rows).astype(bool).T
+
+    def get_column(self, column):
+        """
+        Unpack the indicator of the missing values of a column.
+
+            :param column: the name of the column.
+            :return: the boolean array that is `true` for missing values.
+        """
+        return np.unpackbits(self.packed[self.columns.get_loc(column)], count=self.number_of_rows).astype(bool)
+
+    def with_missing_values(self, positions, columns):
+        """
+        Create a copy of the bitmap, in which further values are marked as missing.
+
+            :param positions: the positions of the rows to mark.
+            :param columns: the names of the columns to mark in these rows.
+            :return: the new missingness bitmap.
+        """
+        mask = self.get_mask()
+        mask[np.ix_(np.asarray(positions, dtype=int), self.columns.get_indexer(columns))] = True
+        return MissingnessBitmap.from_mask(mask, self.columns, self.ids)
+
+    def to_dict(self):
+        """
+        Encode the bitmap compactly to send it to the frontend. The bits of each column are stored in
+        `ceil(rows / 8)` consecutive bytes, with the first row in the most significant bit of the first byte.
+
+            :return: the dictionary of the number of rows, the column names, and the bitmap as a base64 string.
+        """
+        return {'rows': self.number_of_rows,
+                'columns': self.columns.tolist(),
+                'bitmap': base64.b64encode(self.packed.tobytes()).decode('ascii')
+                }
@@ -0,0 +1,146 @@
+import source.processing.DataFrameOps as dfo
+from source.Options import Opt
+from source.StageCache import StageCache
+from sklearn.neighbors import NearestNeighbors
+import numpy as np
+import scipy.sparse
+import hashlib
+
+try:
+    from pynndescent import NNDescent
+except ImportError:
+    NNDescent = None
+
+# neighbor graphs of the latest matrices by their fingerprint and metric
+neighbor_graphs = StageCache(Opt.stage_cache_size.value)
+
+
+def get_matrix_fingerprint(matrix):
+    """
+    Determine a fingerprint of a dense or sparse matrix that changes, whenever its values or shape change.
+
+        :param matrix: the dense or sparse matrix, or a dataframe.
+        :return: the fingerprint of the matrix as a hexadecimal string.
+    """
+    hash_function = hashlib.sha1(str(matrix.shape).encode())
+    if dfo.is_sparse_matrix(matrix):
+        matrix = matrix.tocsr()
+        for array in (matrix.data, matrix.indices, matrix.indptr):
+            hash_function.update(np.ascontiguousarray(array).tobytes())
+    else:
+        hash_function.update(np.ascontiguousarray(np.asarray(matrix, dtype=np.float64)).tobytes())
+
+    return hash_function.hexdigest()
+
+
+def get_neighbor_graph(matrix, n_neighbors, metric='euclidean'):
+    """
+    Get the neighbor graph of a matrix. The graph is computed once per matrix and metric with at least
+    `graph_neighbors` neighbors, and shared by all consumers that need the same or fewer neighbors.
+
+        :param matrix: the dense or sparse matrix, or a dataframe with numeric features.
+        :param n_neighbors: the number of neighbors of each sample, including the sample itself.
+        :param metric: the metric of the distances.
+        :return: the neighbor graph of the matrix.
+    """
+    key = (get_matrix_fingerprint(matrix), metric)
+    graph = neighbor_graphs.get('neighbor_graph', key)
+    if graph is None or graph.n_neighbors < min(n_neighbors, matrix.shape[0]):
+        graph = NeighborGraph(matrix, max(n_neighbors, Opt.graph_neighbors.value), metric)
+        neighbor_graphs.put('neighbor_graph', key, graph)
+
+    return graph
+
+
+class NeighborGraph(object):
+    """
+        A class for the k-nearest neighbor graph of a matrix, which is passed to all estimators that search the
+        neighbors of the same matrix, instead of letting each of them search the neighbors again. For at least
+        `approximate_neighbors_min_samples` samples, the graph is approximated by a nearest neighbor descent,
+        if `pynndescent` is available. Otherwise, the neighbors are searched exactly.
+    """
+
+    def __init__(self, matrix, n_neighbors, metric='euclidean'):
+        """
+            The constructor that computes the neighbor graph of a matrix.
+
+            :param matrix: the dense or sparse matrix, or a dataframe with numeric features.
+            :param n_neighbors: the number of neighbors of each sample, including the sample itself.
+            :param metric: the metric of the distances.
+        """
+        if not dfo.is_sparse_matrix(matrix):
+            matrix = np.asarray(matrix, dtype=np.float64)
+
+        self.number_of_samples = matrix.shape[0]
+        self.n_neighbors = min(n_neighbors, self.number_of_samples)
+        self.search_index = None
+
+        if NNDescent is not None and self.number_of_samples >= Opt.approximate_neighbors_min_samples.value:
+            self.search_index = NNDescent(matrix, n_neighbors=self.n_neighbors, metric=metric, random_state=42)
+            indices, distances = self.search_index.neighbor_graph
+        else:
+            search = NearestNeighbors(n_neighbors=self.n_neighbors, metric=metric).fit(matrix)
+            distances, indices = search.kneighbors(matrix)
+
+        self.indices, self.distances = self.put_samples_first(indices, distances)
+
+    @staticmethod
+    def put_samples_first(indices, distances):
+        """
+        Make each sample its own first neighbor at distance 0, which is not guaranteed by an approximate search
+        or for duplicated samples. A sample that is not among its own neighbors replaces its farthest neighbor.
+
+            :param indices: the matrix of the neighbor indices of each sample, sorted by distance.
+            :param distances: the matrix of the neighbor distances of each sample.
+            :return: the neighbor indices and distances with the sample itself in the first column.
+        """
+        indices = np.array(indices, dtype=np.int64)
+        distances = np.array(distances, dtype=np.float64)
+        samples = np.arange(len(indices))[:, None]
+
+        missing = ~(indices == samples).any(axis=1)
+        indices[missing, -1] = samples[missing, 0]
+
+        # the sample itself is sorted before other neighbors at distance 0
+        distances[indices == samples] = -1
+        order = np.argsort(distances, axis=1, kind='stable')
+        indices = np.take_along_axis(indices, order, axis=1)
+        distances = np.maximum(np.take_along_axis(distances, order, axis=1), 0)
+        return indices, distances
+
+    def get_knn(self, n_neighbors):
+        """
+        Get the nearest neighbors of each sample, e.g. as `precomputed_knn` of UMAP.
+
+            :param n_neighbors: the number of neighbors of each sample, including the sample itself.
+            :return: the neighbor indices, the neighbor distances and the search index, which is `None`
+            if the neighbors were searched exactly.
+        """
+        return self.indices[:, :n_neighbors], self.distances[:, :n_neighbors], self.search_index
+
+    def get_sparse_graph(self, n_neighbors):
+        """
+        Get the nearest neighbors of each sample as a sparse distance graph, which scikit-learn estimators
+        accept with `metric='precomputed'`. The sample itself is stored as an explicit zero.
+
+            :param n_neighbors: the number of neighbors of each sample, including the sample itself.
+            :return: the sparse CSR distance graph.
+        """
+        n_neighbors = min(n_neighbors, self.n_neighbors)
+        indptr = np.arange(0, self.number_of_samples * n_neighbors + 1, n_neighbors)
+        return scipy.sparse.csr_matrix((self.distances[:, :n_neighbors].ravel(),
+                                        self.indices[:, :n_neighbors].ravel(), indptr),
+                                       shape=(self.number_of_samples, self.number_of_samples))
+
+    def covers_radius(self, radius):
+        """
+        Check whether the graph contains all neighbors within a radius of each sample,
+        i.e. whether the farthest neighbor of each sample is outside of the radius.
+
+            :param radius: the radius around each sample.
+            :return: `true` if all neighbors within the radius are contained, otherwise `false`.
+        """
+        if self.n_neighbors >= self.number_of_samples:
+            return True
+
+        return bool((self.distances[:, -1] > radius).all())
@@ -0,0 +1,116 @@
+from source.Options import Opt
+from source.StageCache import StageCache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import hashlib
+
+# neighbor indices of the latest imputed matrices by their fingerprint
+neighbor_indices = StageCache(Opt.stage_cache_size.value)
+
+
+def get_neighbor_index(matrix):
+    """
+    Get the neighbor index of a matrix. The index is built once per matrix and reused
+    for all of its features and for further imputations of the same matrix.
+
+        :param matrix: the matrix with missing values.
+        :return: the neighbor index of the matrix.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    key = hashlib.sha1(str(matrix.shape).encode() + matrix.tobytes()).hexdigest()
+    return neighbor_indices.get_or_compute('neighbor_index', key, lambda: NeighborIndex(matrix))
+
+
+class NeighborIndex(object):
+    """
+        A class for imputing missing values by K-Nearest Neighbors (KNN). The nan-aware euclidean
+        distances of all samples with missing values to all samples are computed once in blocks
+        of float32 values, and reused for all features and further imputations.
+        Like the `KNNImputer` of scikit-learn, a missing value is imputed by the mean of the nearest
+        samples for which this feature is available.
+    """
+
+    def __init__(self, matrix):
+        """
+            The constructor that builds the neighbor index of a matrix.
+
+            :param matrix: the matrix with missing values.
+        """
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        self.missing = np.isnan(self.matrix)
+        self.receivers = np.flatnonzero(self.missing.any(axis=1))
+
+        present = (~self.missing).astype(np.float32)
+        values = np.where(self.missing, 0, self.matrix).astype(np.float32)
+        self.distances = self.compute_distances(values, present)
+
+    def compute_distances(self, values, present):
+        """
+        Compute the distances of all samples with missing values to all samples.
+        The distances are computed in blocks of `knn_block_size` samples, distributed over several threads.
+
+            :param values: the matrix as float32 values, with missing values set to 0.
+            :param present: the float32 indicator matrix of the available values.
+            :return: the float32 distance matrix of the samples with missing values to all samples.
+        """
+        blocks = [self.receivers[start:start + Opt.knn_block_size.value]
+                  for start in range(0, len(self.receivers), Opt.knn_block_size.value)]
+        if len(blocks) == 0:
+            return np.empty((0, len(self.matrix)), dtype=np.float32)
+
+        squared = values ** 2
+        with ThreadPoolExecutor(max_workers=Opt.number_of_processes.value) as executor:
+            return np.concatenate(list(executor.map(
+                lambda rows: self.compute_block_distances(values, present, squared, rows), blocks)))
+
+    @staticmethod
+    def compute_block_distances(values, present, squared, rows):
+        """
+        Compute the nan-aware euclidean distances of a block of samples to all samples. Only the features
+        available in both samples are compared, and the distance is scaled up by the ratio of all features
+        to the compared features. Samples without compared features have an infinite distance.
+
+            :param values: the matrix as float32 values, with missing values set to 0.
+            :param present: the float32 indicator matrix of the available values.
+            :param squared: the squared float32 values.
+            :param rows: the samples of the block.
+            :return: the float32 distance matrix of the block.
+        """
+        distances = (squared[rows] @ present.T + present[rows] @ squared.T
+                     - 2 * (values[rows] @ values.T))
+        number_of_compared = present[rows] @ present.T
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances = np.maximum(distances, 0) * (values.shape[1] / number_of_compared)
+        distances[number_of_compared == 0] = np.inf
+        return distances
+
+    def impute(self, n_neighbors):
+        """
+        Impute all missing values of the matrix by the mean of the `n_neighbors` nearest samples
+        for which the feature is available. If no such sample has a finite distance, the missing
+        value is imputed by the mean of the feature.
+
+            :param n_neighbors: the number of neighbors to consider.
+            :return: the imputed matrix.
+        """
+        result = self.matrix.copy()
+
+        for column in np.flatnonzero(self.missing.any(axis=0)):
+            donors = np.flatnonzero(~self.missing[:, column])
+            if len(donors) == 0:
+                continue
+
+            rows = np.flatnonzero(self.missing[:, column])
+            distances = self.distances[np.searchsorted(self.receivers, rows)][:, donors]
+
+            k = min(n_neighbors, len(donors))
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            imputed = self.matrix[donors[nearest], column].mean(axis=1)
+
+            no_finite_donor = ~np.isfinite(distances).any(axis=1)
+            imputed[no_finite_donor] = self.matrix[donors, column].mean()
+
+            result[rows, column] = imputed
+
+        return result
@@ -0,0 +1,86 @@
+import source.processing.DataFrameOps as dfo
+import source.processing.NeighborGraph as ng
+from sklearn.decomposition import PCA, TruncatedSVD
+from source.Options import Opt
+from source.StageCache import StageCache
+import numpy as np
+
+# pre-reductions of the latest matrices by their fingerprint
+pre_reductions = StageCache(Opt.stage_cache_size.value)
+
+
+def get_pre_reduction(matrix):
+    """
+    Get the pre-reduction of a matrix. The pre-reduction is computed once per matrix and shared by
+    all nonlinear dimensionality reductions of the same scaled data.
+
+        :param matrix: the dense or sparse matrix, or a dataframe with numeric features.
+        :return: the fitted pre-reduction of the matrix.
+    """
+    return pre_reductions.get_or_compute('pre_reduction', ng.get_matrix_fingerprint(matrix),
+                                         lambda: PreReduction().fit(matrix))
+
+
+class PreReduction(object):
+    """
+        A class for the linear pre-reduction of wide data before t-SNE, MDS or UMAP. The data is reduced by a
+        randomized PCA, or a truncated SVD for sparse data, to the smallest number of components that explains
+        `pre_reduction_explained_variance` of the variance, but to at most `pre_reduction_max_components`.
+        Data with at most `pre_reduction_max_components` features is not reduced.
+    """
+
+    def fit(self, matrix, y=None):
+        """
+        Fit the pre-reduction on a matrix and store the reduced matrix in `embedding_`.
+
+            :param matrix: the dense or sparse matrix, or a dataframe with numeric features.
+            :param y: ignored.
+            :return: the fitted pre-reduction.
+        """
+        number_of_samples, number_of_features = matrix.shape
+        max_components = min(Opt.pre_reduction_max_components.value, number_of_samples - 1, number_of_features - 1)
+        self.reducer_ = None
+        self.n_components_ = number_of_features
+
+        if number_of_features <= Opt.pre_reduction_max_components.value or max_components < 2:
+            self.embedding_ = self.to_dense_matrix(matrix)
+            return self
+
+        if dfo.is_sparse_matrix(matrix):
+            self.reducer_ = TruncatedSVD(n_components=max_components, algorithm='randomized', random_state=2)
+        else:
+            self.reducer_ = PCA(n_components=max_components, svd_solver='randomized', random_state=2)
+        embedding = self.reducer_.fit_transform(matrix)
+
+        explained_variance = np.cumsum(self.reducer_.explained_variance_ratio_)
+        number_of_components = np.searchsorted(explained_variance, Opt.pre_reduction_explained_variance.value) + 1
+        self.n_components_ = int(min(max(number_of_components, 2), max_components))
+        self.embedding_ = np.ascontiguousarray(embedding[:, :self.n_components_])
+
+        return self
+
+    def transform(self, matrix):
+        """
+        Reduce further samples with the fitted pre-reduction.
+
+            :param matrix: the dense or sparse matrix, or a dataframe with the same features as the fitted data.
+            :return: the reduced matrix.
+        """
+        if self.reducer_ is None:
+            return self.to_dense_matrix(matrix)
+
+        return self.reducer_.transform(matrix)[:, :self.n_components_]
+
+    @staticmethod
+    def to_dense_matrix(matrix):
+        """
+        Convert a dense or sparse matrix, or a dataframe, into a dense array.
+
+            :param matrix: the dense or sparse matrix, or a dataframe with numeric features.
+            :return: the dense array of floats.
+        """
+        if dfo.is_sparse_matrix(matrix):
+            return matrix.toarray()
+
+        return np.asarray(matrix, dtype=np.float64)
+
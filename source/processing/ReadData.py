@@ -1,5 +1,8 @@
 import source.processing.DataFrameOps as dfo
+import source.processing.InputCache as ic
 from source.Options import Opt
+from concurrent.futures import ThreadPoolExecutor
+from pandas._libs.parsers import STR_NA_VALUES
 import pandas as pd
 import chardet
 import pathlib
@@ -10,6 +13,11 @@ rad = Opt.radiomics_dataset.value + Opt.file_type.value
 gen = Opt.genomics_dataset.value + Opt.file_type.value
 cli = Opt.clinical_dataset.value + Opt.file_type.value
 
+try:
+    import pyarrow.csv as pyarrow_csv
+except ImportError:
+    pyarrow_csv = None
+
 enc_dict = "encoding"
 """
     Column of the dictionary resulting from chardet that contains the file encoding.
@@ -26,24 +34,6 @@ def get_path_to_input_data(filename):
     return str(os.path.join(pathlib.Path().resolve(), Opt.input_folder.value, filename))
 
 
-def process_symbols(entry, symbol, constant):
-    """
-    If `entry` contains `symbol`, remove `symbol` from `entry` and decrease it by `constant`.
-    Otherwise, no change is performed to `entry`.
-
-        :param entry: the entry to process.
-        :param symbol: the symbol to remove.
-        :param constant: the constant to decrease the entry with.
-        :return: the processed entry without the symbol and decreased by the constant.
-    """
-    if symbol in str(entry):
-        number = float(entry.replace(symbol, ""))
-        return number - constant
-
-    else:
-        return entry
-
-
 def get_file_encoding(file_path):
     """
     Determine the file encoding based on the first bytes of the file.
@@ -56,49 +46,124 @@ def get_file_encoding(file_path):
         return result[enc_dict]
 
 
+def get_cached_file_encoding(file_path, fingerprint):
+    """
+    Get the encoding of the file, which is determined only once per file version and cached together
+    with its fingerprint. If the first bytes are plain ASCII, the default encoding is used, as later
+    bytes of the file might not be.
+
+        :param file_path: the path of the file.
+        :param fingerprint: the current fingerprint of the file.
+        :return: the encoding of the file.
+    """
+    encoding = ic.load_cached_encoding(file_path, fingerprint)
+    if encoding is not None:
+        return encoding
+
+    encoding = get_file_encoding(file_path)
+    if encoding is None or encoding.lower() == 'ascii':
+        encoding = Opt.encoding.value
+
+    ic.store_cached_encoding(file_path, fingerprint, encoding)
+    return encoding
+
+
 def read_data_from_file(path, encoding):
     """
-    Read data from a file and return it as a dataframe.
+    Read data from a file and return it as a dataframe. If `pyarrow` is available, its
+    multithreaded CSV reader is used, otherwise the file is read by pandas. Both readers
+    treat empty strings and the default missing values of pandas as missing.
 
         :param path: the path of the file.
         :param encoding: the encoding of the file.
         :return: the dataframe that contains the data of the file.
     """
+    if pyarrow_csv is not None and Opt.use_pyarrow_csv_reader.value:
+        try:
+            return pyarrow_csv.read_csv(path,
+                                        read_options=pyarrow_csv.ReadOptions(encoding=encoding, use_threads=True),
+                                        parse_options=pyarrow_csv.ParseOptions(delimiter=Opt.separator.value),
+                                        convert_options=pyarrow_csv.ConvertOptions(
+                                            decimal_point=Opt.decimal_comma.value, strings_can_be_null=True,
+                                            null_values=sorted(STR_NA_VALUES))).to_pandas()
+        except Exception as e:
+            print("File '" + path + "' could not be read by pyarrow, it is read by pandas: " + str(e))
+
     return pd.read_csv(path, delimiter=Opt.separator.value, decimal=Opt.decimal_comma.value, encoding=encoding)
 
 
 def cleanup_data(data):
     """
     Cleanup the data object by removing whitespaces, and unifying the decimal symbols.
+    All operations are applied on whole columns instead of single entries.
 
         :param data: the dataframe object to process.
         :return: the cleaned data.
     """
-    # remove all leading and trailing whitespaces of string entries
     mask = dfo.get_all_object_features(data)
-    data[mask.columns] = mask.apply(lambda x: x.str.strip())
+    for column in mask.columns:
+        feature = data[column]
 
-    # symbol occurs only in the `post_PSA` column
-    column = Opt.Z_score.value
-    symbol = Opt.smaller_symbol.value
-    constant = Opt.constant_to_decrease.value
+        # decrease entries with the `<` symbol by a constant and remove the symbol
+        if column in Opt.columns_with_smaller_symbol.value:
+            feature = process_symbols_of_column(
+                feature.str.strip(), Opt.smaller_symbol.value, Opt.constant_to_decrease.value)
 
-    # decrease entries with the `<` symbol by a constant and remove the symbol
-    if column in data:
-        data[column] = data.apply(lambda x: process_symbols(
-            x[column], symbol, constant), axis=1)
+        # use unified decimal symbol for all numerical data
+        feature = convert_to_numeric(feature)
 
-    # use unified decimal symbol for all numerical data
-    for col in range(len(mask.columns)):
-        try:
-            data[mask.columns[col]] = [float(str(j).replace(
-                Opt.decimal_comma.value, Opt.decimal_point.value)) for j in data[mask.columns[col]]]
-        except ValueError:
-            pass
+        # remove all leading and trailing whitespaces of string entries
+        if feature.dtype == 'object':
+            feature = feature.str.strip()
+
+        data[column] = feature
 
     return data
 
 
+def process_symbols_of_column(feature, symbol, constant):
+    """
+    Remove `symbol` from all entries of the feature that contain it, and decrease these entries by `constant`.
+    The other entries are not changed.
+
+        :param feature: the feature to process.
+        :param symbol: the symbol to remove.
+        :param constant: the constant to decrease the entries with.
+        :return: the processed feature.
+    """
+    symbol_mask = feature.str.contains(symbol, regex=False, na=False).to_numpy()
+    if not symbol_mask.any():
+        return feature
+
+    numbers = pd.to_numeric(feature[symbol_mask].str.replace(symbol, '', regex=False).str.replace(
+        Opt.decimal_comma.value, Opt.decimal_point.value, regex=False))
+
+    processed = feature.copy()
+    processed[symbol_mask] = numbers - constant
+    return processed
+
+
+def convert_to_numeric(feature):
+    """
+    Convert a feature to a numeric feature, if all of its available entries are numbers with a decimal
+    point or a decimal comma. Otherwise, the feature is not changed. Conversion stops at the first entry
+    that is no number, so that categorical features are detected quickly.
+
+        :param feature: the feature to convert.
+        :return: the numeric feature, or the unchanged feature if it is not numeric.
+    """
+    try:
+        return pd.to_numeric(feature).astype(float)
+    except (ValueError, TypeError):
+        pass
+
+    try:
+        return pd.to_numeric(feature.astype(str).str.replace(
+            Opt.decimal_comma.value, Opt.decimal_point.value, regex=False).where(feature.notna())).astype(float)
+    except (ValueError, TypeError):
+        return feature
+
+
 class ReadData(object):
     """
         A class for reading the data of three csv files for radiomic, genomic, and clinical data.
@@ -112,20 +177,50 @@ class ReadData(object):
         if not Opt.server_deployment.value:
             path_to_use = Opt.input_folder.value
 
-        self.radiomics_df = pd.read_csv(path_to_use + rad, delimiter=Opt.separator.value,
-                                        decimal=Opt.decimal_comma.value, encoding=Opt.encoding.value)
-        self.genomics_df = pd.read_csv(path_to_use + gen, delimiter=Opt.separator.value,
-                                       decimal=Opt.decimal_comma.value, encoding=Opt.encoding.value)
-        self.clinical_df = pd.read_csv(path_to_use + cli, delimiter=Opt.separator.value,
-                                       decimal=Opt.decimal_comma.value, encoding=Opt.encoding.value)
+        # read the files concurrently, as reading them is mostly bound by I/O
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            radiomics = executor.submit(self.read_input_file, path_to_use + rad, False)
+            genomics = executor.submit(self.read_input_file, path_to_use + gen, False)
+            clinical = executor.submit(self.read_input_file, path_to_use + cli, True)
+            self.radiomics_df = radiomics.result()
+            self.genomics_df = genomics.result()
+            self.clinical_df = clinical.result()
+
+        # store the mostly zero genomic features sparse
+        if Opt.sparse_genomic_data.value:
+            mask = dfo.get_all_numeric_features(self.genomics_df)
+            self.genomics_df = dfo.convert_to_sparse_features(
+                self.genomics_df, mask.columns.drop(Opt.idx.value, errors='ignore').tolist())
+
+    def read_input_file(self, path, cleanup):
+        """
+        Read an input file and pair its index with the row number. The resulting dataframe is
+        cached in a columnar format, which is loaded instead of parsing the file again as long
+        as the file does not change.
+
+            :param path: the path of the input file.
+            :param cleanup: whether the data is cleaned up after reading it.
+            :return: the dataframe that contains the data of the file.
+        """
+        fingerprint = ic.get_file_fingerprint(path)
+        if Opt.use_input_cache.value:
+            data = ic.load_cached_data(path, fingerprint)
+            if data is not None:
+                return data
+
+        data = read_data_from_file(path, get_cached_file_encoding(path, fingerprint))
 
         # cleanup data
-        self.clinical_df = cleanup_data(self.clinical_df)
+        if cleanup:
+            data = cleanup_data(data)
 
         # pair the index with the row number
-        self.clinical_df = self.clinical_df.reset_index()
-        self.genomics_df = self.genomics_df.reset_index()
-        self.radiomics_df = self.radiomics_df.reset_index()
+        data = data.reset_index()
+
+        if Opt.use_input_cache.value:
+            ic.store_cached_data(path, fingerprint, data)
+
+        return data
 
     def get_clinical_data(self):
         """
@@ -1,10 +1,14 @@
 import source.processing.DataFrameOps as dfo
-from sklearn.decomposition import PCA
+import source.processing.NeighborGraph as ng
+import source.processing.PreReduction as pr
+from sklearn.decomposition import PCA, TruncatedSVD
 from sklearn.manifold import TSNE, MDS
+from sklearn.metrics.pairwise import euclidean_distances
 from source.Options import Opt
 
 import prince
 import pandas as pd
+import numpy as np
 import umap
 
 
@@ -37,19 +41,29 @@ class ReduceData(object):
 
         return reduced_data_list
 
-    def apply_umap(self, data):
+    def apply_umap(self, data, profile=None):
         """
         Reduce the dimensionality of the data by applying
         Uniform Manifold Approximation and Projection (UMAP)
         on the dataframe.
 
             :param data: the dataframe to reduce its dimensionality.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: the dataframe with reduced dimensionality.
         """
-        model = umap.UMAP(init='random', metric='euclidean',
+        pre_reduction = pr.get_pre_reduction(dfo.get_feature_matrix(data[dfo.get_numeric_feature_names(data,
+                                                                                                        profile)]))
+        matrix = pre_reduction.embedding_
+        n_neighbors = 15
+
+        # UMAP searches the neighbors of small datasets exactly, and uses the shared neighbor graph otherwise
+        precomputed_knn = (None, None, None)
+        if matrix.shape[0] >= Opt.approximate_neighbors_min_samples.value:
+            precomputed_knn = ng.get_neighbor_graph(matrix, n_neighbors).get_knn(n_neighbors)
+
+        model = umap.UMAP(init='random', metric='euclidean', n_neighbors=n_neighbors, precomputed_knn=precomputed_knn,
                           min_dist=0.1, random_state=42, n_components=2)
-        mask = dfo.get_all_numeric_features(data)
-        embedding = model.fit_transform(data[mask.columns])
+        embedding = model.fit_transform(matrix)
 
         return pd.DataFrame(data=embedding, columns=['u1', 'u2'])
 
@@ -57,12 +71,17 @@ class ReduceData(object):
         """
         Reduce the dimensionality of the data by applying
         Principal Component Analysis (PCA) on the dataframe.
+        For sparse data, a truncated SVD is applied, as it does not center the data.
 
             :param data: the dataframe to reduce its dimensionality.
             :return: the dataframe with reduced dimensionality.
         """
-        pca = PCA(n_components=2, random_state=2)
-        principalComponents = pca.fit_transform(data)
+        matrix = dfo.get_feature_matrix(data)
+        if dfo.is_sparse_matrix(matrix):
+            pca = TruncatedSVD(n_components=2, random_state=2)
+        else:
+            pca = PCA(n_components=2, random_state=2)
+        principalComponents = pca.fit_transform(matrix)
 
         return pd.DataFrame(data=principalComponents, columns=['p1', 'p2'])
 
@@ -83,27 +102,39 @@ class ReduceData(object):
         """
         Reduce the dimensionality of the data by applying
         T-distributed Stochastic Neighbor Embedding (TSNE)
-        on the dataframe.
+        on the pre-reduced dataframe.
 
             :param data: the dataframe to reduce its dimensionality.
             :return: the dataframe with reduced dimensionality.
         """
         numb_components = round(min(len(data.index), len(data.columns)) / 2)
 
-        # print(data)
-        # print("TSNE COMPONENTS: ", numb_components)
-
-        pca = PCA(n_components=numb_components,
-                  svd_solver='auto', random_state=2)
-        pca_result = pca.fit_transform(data)
+        pca_result = pr.get_pre_reduction(dfo.get_feature_matrix(data)).embedding_
 
         # self.test_perplexity_for_tsne(4, 10, 1, pca_result_40)
 
-        tsne = TSNE(init='pca', random_state=2, n_components=2, verbose=0, learning_rate='auto',
-                    perplexity=min(8, numb_components), n_iter=400).fit_transform(pca_result)
+        # the neighbors are taken from the shared neighbor graph, like TSNE would search them
+        perplexity = min(8, numb_components)
+        n_neighbors = min(len(pca_result) - 1, int(3. * perplexity + 1)) + 1
+        graph = ng.get_neighbor_graph(pca_result, n_neighbors).get_sparse_graph(n_neighbors)
+
+        tsne = TSNE(init=self.get_tsne_initialization(pca_result), metric='precomputed', random_state=2,
+                    n_components=2, verbose=0, learning_rate='auto', perplexity=perplexity,
+                    n_iter=400).fit_transform(graph)
 
         return pd.DataFrame(data=tsne)
 
+    def get_tsne_initialization(self, data):
+        """
+        Get the PCA initialization of TSNE, which TSNE cannot compute itself from precomputed distances.
+        The initialization is computed like by `init='pca'` of TSNE in scikit-learn 1.1.
+
+            :param data: the data to reduce its dimensionality.
+            :return: the matrix of the initial embedding.
+        """
+        pca = PCA(n_components=2, svd_solver='randomized', random_state=2)
+        return pca.fit_transform(data).astype(np.float32, copy=False)
+
     def test_perplexity_for_tsne(self, min, max, step, pca_comp):
         """Test different perplexity values for tsne in the defined range
         with the defined step size and write the result to a file.
@@ -127,6 +158,7 @@ class ReduceData(object):
         """
         famd = prince.FAMD(n_components=2, n_iter=3, copy=True,
                            check_input=True, engine='auto', random_state=42)
+        data = dfo.convert_to_dense_features(data)
 
         if Opt.idx in data:
             data.drop(Opt.idx, axis=1, inplace=True)
@@ -140,12 +172,69 @@ class ReduceData(object):
     def apply_mds(self, data):
         """
         Reduce the dimensionality of the data by applying
-        Multi-Dimension Scaling (MDS) on the dataframe.
+        Multi-Dimension Scaling (MDS) on the pre-reduced dataframe.
+        SMACOF needs the distances between all samples, so that landmark MDS is applied
+        for more than `mds_smacof_max_samples` samples.
 
             :param data: the dataframe to reduce its dimensionality.
             :return: the dataframe with reduced dimensionality.
         """
+        if len(data.index) > Opt.mds_smacof_max_samples.value:
+            return self.apply_landmark_mds(data)
+
         embedding = MDS(n_components=2, random_state=42)
-        mds = embedding.fit_transform(data)
+        mds = embedding.fit_transform(pr.get_pre_reduction(dfo.get_feature_matrix(data)).embedding_)
 
         return pd.DataFrame(data=mds)
+
+    def apply_landmark_mds(self, data):
+        """
+        Reduce the dimensionality of the data by applying landmark
+        Multi-Dimension Scaling (MDS) on the pre-reduced dataframe.
+        Classical MDS embeds `mds_landmarks` randomly selected landmarks, and all samples are
+        placed by their distances to the landmarks, which needs linear instead of quadratic memory.
+        It is only applied by `apply_mds` for more samples than SMACOF can embed, as classical MDS of
+        all samples would equal PCA.
+
+            :param data: the dataframe to reduce its dimensionality.
+            :return: the dataframe with reduced dimensionality.
+        """
+        matrix = pr.get_pre_reduction(dfo.get_feature_matrix(data)).embedding_
+        number_of_landmarks = min(Opt.mds_landmarks.value, len(matrix))
+        landmarks = np.sort(np.random.RandomState(42).choice(len(matrix), number_of_landmarks, replace=False))
+        distances = euclidean_distances(matrix, matrix[landmarks], squared=True)
+
+        # classical MDS of the landmarks by the eigendecomposition of their double-centered squared distances
+        landmark_distances = distances[landmarks]
+        centering = np.eye(number_of_landmarks) - 1. / number_of_landmarks
+        eigenvalues, eigenvectors = np.linalg.eigh(-0.5 * centering @ landmark_distances @ centering)
+        components = np.argsort(eigenvalues)[::-1][:2]
+        components = components[eigenvalues[components] > 0]
+
+        # triangulate all samples by their squared distances to the landmarks
+        pseudoinverse = eigenvectors[:, components] / np.sqrt(eigenvalues[components])
+        mds = -0.5 * (distances - landmark_distances.mean(axis=0)) @ pseudoinverse
+
+        return pd.DataFrame(data=self.flip_signs(self.pad_components(mds)))
+
+    @staticmethod
+    def pad_components(embedding):
+        """
+        Pad an embedding with zeros to two components, if the data has less than two dimensions.
+
+            :param embedding: the matrix of the embedding.
+            :return: the matrix of the embedding with two components.
+        """
+        return np.hstack([embedding, np.zeros((len(embedding), 2 - embedding.shape[1]))])
+
+    @staticmethod
+    def flip_signs(embedding):
+        """
+        Flip the signs of the components of an embedding, so that the entry with the largest absolute value of
+        each component is positive, as the signs of eigenvectors are arbitrary.
+
+            :param embedding: the matrix of the embedding.
+            :return: the matrix of the embedding with deterministic signs.
+        """
+        largest = embedding[np.argmax(np.abs(embedding), axis=0), np.arange(embedding.shape[1])]
+        return embedding * np.where(largest < 0, -1, 1)
@@ -1,4 +1,6 @@
 import source.processing.DataFrameOps as dfo
+import numpy as np
+import pandas as pd
 
 
 class ScaleData(object):
@@ -21,21 +23,48 @@ class ScaleData(object):
 
         return normalized
 
-    def normalize_data(self, data):
+    def normalize_data(self, data, profile=None):
         """
         Normalize a dataframe in the range [0 1] based on feature columns.
         If all values of a feature are 0, set the normalized value of this feature to 0.
+        Sparse features with a minimum of 0 stay sparse, as their zeros are preserved.
 
             :param data: the dataframes to normalize.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: the normalized dataframe in the range [0 1].
         """
-        mask = dfo.get_all_numeric_features(data)
-        data[mask.columns] = (data[mask.columns] - data[mask.columns].min()) / \
-            (data[mask.columns].max() - data[mask.columns].min())
-        data[mask.columns] = dfo.fill_nan_values_by_constant(data[mask.columns], 0)
+        data, sparse_columns = self.normalize_sparse_features(data)
+        columns = dfo.get_numeric_feature_names(data, profile).drop(sparse_columns)
+        data[columns] = (data[columns] - data[columns].min()) / \
+            (data[columns].max() - data[columns].min())
+        data[columns] = dfo.fill_nan_values_by_constant(data[columns], 0)
 
         return data
 
+    def normalize_sparse_features(self, data):
+        """
+        Normalize the sparse features of a dataframe, whose minimum is 0, in the range [0 1] by
+        scaling only their stored entries. Other sparse features are stored dense.
+
+            :param data: the dataframe to normalize.
+            :return: the dataframe with normalized sparse features, and the names of these features.
+        """
+        sparse_columns = dfo.get_sparse_feature_names(data, zero_fill_only=True)
+        if len(sparse_columns) == 0:
+            return dfo.convert_to_dense_features(data), []
+
+        matrix = data[sparse_columns].sparse.to_coo().tocsc()
+        minimum = matrix.min(axis=0).toarray().ravel()
+        value_range = matrix.max(axis=0).toarray().ravel() - minimum
+
+        zero_min = minimum == 0
+        scale = np.divide(1, value_range, out=np.zeros_like(value_range), where=value_range != 0)
+        normalized_columns = [column for column, keep in zip(sparse_columns, zero_min) if keep]
+
+        data = dfo.convert_to_dense_features(data.drop(normalized_columns, axis=1)).join(
+            data[normalized_columns].mul(pd.Series(scale[zero_min], index=normalized_columns)))[data.columns]
+        return data, normalized_columns
+
     def standardize_data_list(self, data_list):
         """
         Standardize a list of dataframes by the mean of the data. If all values of a
@@ -51,16 +80,19 @@ class ScaleData(object):
 
         return standardized
 
-    def standardize_data(self, data):
+    def standardize_data(self, data, profile=None):
         """
         Standardize a dataframes by the mean of the data. If all values of a
         feature are 0, set the standardized value of this feature to 0.
+        Sparse features are stored dense, as the centering does not preserve their zeros.
 
             :param data: the dataframe to standardize.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: the standardized dataframe by the mean.
         """
-        mask = dfo.get_all_numeric_features(data)
-        data[mask.columns] = (data[mask.columns] - data[mask.columns].mean()) / data[mask.columns].std()
-        data[mask.columns] = dfo.fill_nan_values_by_constant(data[mask.columns], 0)
+        data = dfo.convert_to_dense_features(data)
+        columns = dfo.get_numeric_feature_names(data, profile)
+        data[columns] = (data[columns] - data[columns].mean()) / data[columns].std()
+        data[columns] = dfo.fill_nan_values_by_constant(data[columns], 0)
 
         return data
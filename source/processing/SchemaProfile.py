@@ -0,0 +1,118 @@
+import source.processing.DataFrameOps as dfo
+import numpy as np
+import pandas as pd
+
+
+class SchemaProfile(object):
+    """
+        A class for profiling the columns of the loaded datasets once, so that the processing stages
+        look up the data type, kind, missingness and modality of a column instead of deriving them
+        from the data on every request. The kind of a column is `binary`, `discrete`, `continuous`
+        or `categorical`.
+    """
+
+    def __init__(self, modalities):
+        """
+            The constructor that profiles the columns of the datasets. A column that occurs in several
+            datasets (e.g. the id) is profiled by its first occurrence.
+
+            :param modalities: the list of tuples of the modality name and its dataframe.
+        """
+        profiles = [self.profile_data(data, modality) for modality, data in modalities]
+        self.columns = pd.concat(profiles)
+        self.columns = self.columns[~self.columns.index.duplicated(keep='first')]
+
+        self.numeric_columns = self.columns.index[self.columns['numeric']]
+        self.sparse_columns = self.columns.index[self.columns['sparse']]
+
+        # the data type of numeric columns with missing values can change by their imputation
+        self.retypable_columns = self.columns.index[self.columns['numeric'] & (self.columns['missing'] > 0)]
+
+        # lookups by column name, which are independent of the size and index type of the data
+        self.numeric_lookup = self.columns['numeric'].to_dict()
+        self.retypable_lookup = set(self.retypable_columns)
+        self.missing_lookup = set(self.columns.index[self.columns['missing'] > 0])
+
+    @staticmethod
+    def profile_data(data, modality):
+        """
+        Profile the columns of a dataframe.
+
+            :param data: the dataframe to profile.
+            :param modality: the name of the modality of the dataframe.
+            :return: the dataframe with the data type, kind, number of missing values, modality
+            and whether the column is numeric or sparse, indexed by the column names.
+        """
+        numeric_columns = dfo.get_numeric_feature_names(data)
+        sparse_columns = dfo.get_sparse_feature_names(data)
+
+        kinds = pd.Series('categorical', index=data.columns, dtype=object)
+        dense_columns = numeric_columns.difference(sparse_columns, sort=False)
+        kinds[dense_columns] = dfo.get_feature_kinds(data[dense_columns])
+        kinds[sparse_columns] = 'continuous'
+
+        return pd.DataFrame({'dtype': data.dtypes.astype(str),
+                             'kind': kinds,
+                             'missing': data.isna().sum(),
+                             'modality': modality,
+                             'numeric': data.columns.isin(numeric_columns),
+                             'sparse': data.columns.isin(sparse_columns)
+                             }, index=data.columns)
+
+    def get_numeric_feature_names(self, data):
+        """
+        Get the names of the numeric features of a dataframe in the order of the dataframe. Only the
+        data types of profiled numeric columns with missing values are checked again, as an imputation
+        may change their data type. Columns that are not profiled
+        are checked by their data type.
+
+            :param data: the dataframe, e.g. the merged data of any stage.
+            :return: the index of the names of the numeric features.
+        """
+        columns = data.columns.tolist()
+        numeric = [self.numeric_lookup.get(column) for column in columns]
+        recheck = [column for column, is_numeric in zip(columns, numeric)
+                   if is_numeric is None or (is_numeric and column in self.retypable_lookup)]
+        if len(recheck) > 0:
+            numeric_rechecked = set(dfo.get_numeric_feature_names(data[recheck]))
+            recheck = set(recheck)
+            numeric = [column in numeric_rechecked if column in recheck else is_numeric
+                       for column, is_numeric in zip(columns, numeric)]
+
+        return data.columns[np.array(numeric, dtype=bool)]
+
+    def get_numeric_positions(self, data):
+        """
+        Get the positions of the numeric features in a dataframe.
+
+            :param data: the dataframe.
+            :return: the array of the column positions of the numeric features.
+        """
+        return data.columns.get_indexer(self.get_numeric_feature_names(data))
+
+    def get_column_names_with_missing_data(self, data):
+        """
+        Get the names of all profiled columns of the dataframe that have values missing in the loaded data.
+
+            :param data: the dataframe.
+            :return: the index of the names of the columns with missing values.
+        """
+        return data.columns[np.array([column in self.missing_lookup for column in data.columns.tolist()], dtype=bool)]
+
+    def get_kind(self, column):
+        """
+        Get the kind of a column.
+
+            :param column: the name of the column.
+            :return: `binary`, `discrete`, `continuous` or `categorical`.
+        """
+        return self.columns.at[column, 'kind']
+
+    def get_modality(self, column):
+        """
+        Get the modality of a column.
+
+            :param column: the name of the column.
+            :return: the name of the modality the column belongs to.
+        """
+        return self.columns.at[column, 'modality']
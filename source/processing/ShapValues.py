@@ -13,17 +13,18 @@ class ShapValues(object):
         with the highest impact on the clustering result.
     """
 
-    def calculate_shap_values(self, data, labels):
+    def calculate_shap_values(self, data, labels, profile=None):
         """
         Calculate shap values with the high dimensional data and cluster labels.
 
             :param data: the high dimensional data.
             :param labels: the labels resulting from clustering the low dimensional data.
+            :param profile: the schema profile of the loaded datasets, or `None` to check the data types.
             :return: a list of shap values per cluster and patient.
         """
         clf = RandomForestClassifier(random_state=42)
-        mask = dfo.get_all_numeric_features(data)
-        clf.fit(data[mask.columns], labels)
+        clf.fit(dfo.get_feature_matrix(data[dfo.get_numeric_feature_names(data, profile)]), labels)
+        data = dfo.convert_to_dense_features(data)
 
         explainer = shap.TreeExplainer(clf)
         shap_values = explainer(data).values
@@ -3,6 +3,8 @@ let hoverTableData;
 let clusterLabelData;
 let hoverData;
 let allPatientData;
+let missingness;
+let labelAgreement = new Map();
 let allIndices = []
 let selectedIndices = [];
 let selectedCoordinates = [];
@@ -16,6 +18,9 @@ let radius = 6.5;
 const NONE = -42;
 const minZoom = 0.5;
 const maxZoom = 25;
+const jobPollingInterval = 500;
+const embeddingFrameDuration = jobPollingInterval;
+const minAgreementOpacity = 0.25;
 let processSubset = false;
 let afterSelection = false;
 let showAdvanced = false;
@@ -60,6 +65,7 @@ const imputations = {
     HCONS: "HCONST",
     NOIMP: "NOIMP",
     COMPL: "COMPL",
+    MULTI: "MULTI",
 };
 const clustering = {
     KMEANS: "KMEANS",
@@ -117,8 +123,9 @@ let featuresPerDataset;
  * @param dataset - the reduced and clustered data points.
  * @param clinicalInfo - the clinical scores for hovering over the scatter points.
  * @param dataTag - indication of the affiliation of each feature to a dataset.
+ * @param missingnessData - the bitmap of the originally missing values of the hover and table data.
  */
-function d3ScatterPlot(dataset, clinicalInfo, dataTag) {
+function d3ScatterPlot(dataset, clinicalInfo, dataTag, missingnessData) {
 
     hideElement("loadingIndicator");
     hideElement("zoomToSelectionButton");
@@ -144,6 +151,7 @@ function d3ScatterPlot(dataset, clinicalInfo, dataTag) {
     clusterLabelData = allData[2];
     hoverTableData = parseDataToJson(clinicalInfo);
     featuresPerDataset = parseDataToJson(dataTag);
+    missingness = decodeMissingness(missingnessData);
 
     hoverData = hoverTableData[0];
     allIndices = hoverData.map((element, index) => {
@@ -223,6 +231,21 @@ function processSelectionOnScatterplotButtonClicked() {
     }
 }
 
+/**
+ * Choose whether a processed patient selection is reduced anew by UMAP or PCA,
+ * or keeps the positions of its patients in the embedding of the whole cohort,
+ * which keeps the layout stable.
+ */
+function refitSubsetCheckboxClicked() {
+    console.log("Refit subset checkbox clicked");
+    let checkBox = document.getElementById("refitSubsetCheckBox");
+    if (checkBox.checked) {
+        sendOptionsPostRequest("refitSubset");
+    } else {
+        sendOptionsPostRequest("projectSubset");
+    }
+}
+
 /**
  * Group patients selected on the scatterplot into one cluster to compare them with the
  * patients that are not currently selected. The differences and characteristics of the
@@ -501,30 +524,201 @@ function sendOptionsPostRequest(data) {
     })
         .then((res) => {
             if (res.ok) {
-                receiveDataGetRequest();
+                return res.json();
+            } else {
+                hideElement("loadingIndicator");
+                document.body.style.cursor = "default";
+                alert(
+                    "An error occurred in processing the data.\nPlease check your input and try again."
+                );
+            }
+        })
+        .then((response) => {
+            if (response) {
+                console.log("Processing job submitted: ", response.job);
+                pollJobStatus(response.job);
+            }
+        })
+        .catch((err) => console.error(err));
+}
+
+/**
+ * Poll the status of a processing job in the backend until it is finished, and show its progress.
+ * While t-SNE or UMAP optimizes the embedding, the status contains its current layout, which is
+ * animated on the scatterplot.
+ *
+ * @param jobId - the id of the processing job.
+ * @param receiveResult - the function that receives the url of the job result, by default
+ * the function that updates all charts with the processed data.
+ */
+function pollJobStatus(jobId, receiveResult = receiveDataGetRequest) {
+    fetch(jobStatusUrl + "?job=" + jobId)
+        .then((res) => res.json())
+        .then((job) => {
+            if (job.status === "DONE") {
+                receiveResult(jobResultUrl + "?job=" + jobId);
                 document.body.style.cursor = "default";
                 hideElement("loadingIndicator");
+                document.getElementById("loadingText").textContent = "loading";
                 console.log("Data successfully processed");
-                return res.json();
-            } else {
+            } else if (job.status === "FAILED" || job.error) {
                 hideElement("loadingIndicator");
                 document.body.style.cursor = "default";
+                document.getElementById("loadingText").textContent = "loading";
                 alert(
                     "An error occurred in processing the data.\nPlease check your input and try again."
                 );
+            } else {
+                if (job.stage) {
+                    document.getElementById("loadingText").textContent = job.stage + " " + job.percent + "%";
+                }
+                if (job.embedding) {
+                    showEmbeddingFrame(job.embedding);
+                }
+                setTimeout(() => pollJobStatus(jobId, receiveResult), jobPollingInterval);
             }
         })
+        .catch((err) => console.error(err));
+}
+
+/**
+ * Reduce the dimensionality of the current data with all methods in the backend, to show the
+ * embeddings side by side. Clicking an embedding selects its method.
+ */
+function compareReductionsButtonClicked() {
+    console.log("Compare reductions button clicked");
+    document.body.style.cursor = "wait";
+    showHiddenElement("loadingIndicator");
+
+    fetch(compareReductionsUrl, { method: "POST" })
+        .then((res) => res.json())
         .then((response) => {
-            console.log(response);
+            console.log("Comparison job submitted: ", response.job);
+            pollJobStatus(response.job, receiveReductionComparison);
         })
         .catch((err) => console.error(err));
 }
 
+/**
+ * Receive the embeddings of all dimensionality reduction methods from the backend and show them.
+ *
+ * @param url - the url to receive the embeddings from.
+ */
+function receiveReductionComparison(url) {
+    fetch(url)
+        .then((response) => response.json())
+        .then((result) => showReductionComparison(parseDataToJson(result)))
+        .catch((err) => console.error(err));
+}
+
+/**
+ * Show the embeddings of all dimensionality reduction methods as small multiples above the scatterplot.
+ * The patients are colored by their current clusters, if the embeddings contain the same patients.
+ *
+ * @param reductions - the list of the method name and the {x, y} tuples of each embedding.
+ */
+function showReductionComparison(reductions) {
+    d3.select("#reductionComparison").remove();
+    let comparison = d3
+        .select("#scatterArea")
+        .insert("div", ":first-child")
+        .attr("id", "reductionComparison");
+
+    let titleHeight = 16;
+    let width = scatterWidth / 4;
+    let height = width / 2;
+
+    reductions.forEach((reduction) => {
+        let limits = getDataLimits(reduction.data);
+        let x = d3.scaleLinear().domain(limits[0]).range([0, width]);
+        let y = d3.scaleLinear().domain(limits[1]).range([height, 0]);
+        let colored = clusterLabelData !== undefined && clusterLabelData.length === reduction.data.length;
+
+        let svg = comparison
+            .append("svg")
+            .attr("class", "reductionMultiple")
+            .attr("width", width)
+            .attr("height", height + titleHeight)
+            .on("click", () => selectComparedReduction(reduction.method));
+        svg.append("text")
+            .attr("x", width / 2)
+            .attr("y", titleHeight - 4)
+            .attr("text-anchor", "middle")
+            .text(reduction.method);
+        svg.append("g")
+            .attr("transform", "translate(0," + titleHeight + ")")
+            .selectAll("circle")
+            .data(reduction.data)
+            .enter()
+            .append("circle")
+            .attr("cx", (d) => x(d.x))
+            .attr("cy", (d) => y(d.y))
+            .attr("r", 2)
+            .style("fill", (d, i) => {
+                return colored ? colorBrewerScale[clusterLabelData[i].label] : "gray";
+            });
+    });
+}
+
+/**
+ * Select the dimensionality reduction method of a compared embedding, which is already cached in the backend.
+ *
+ * @param method - the name of the dimensionality reduction method.
+ */
+function selectComparedReduction(method) {
+    changeDropDownByIndex("dimRedDropdown", dimReductionMethods.indexOf(method));
+    dimReductionDropdownChanged();
+}
+
+/**
+ * Move the scatter points to an intermediate layout of the embedding. The axes are fitted to
+ * each layout, as the layout expands while it is optimized. If the number of patients changed,
+ * the layout is shown with gray points until the clusters are known.
+ *
+ * @param frame - the list of [x, y] coordinates of the patients.
+ */
+function showEmbeddingFrame(frame) {
+    let points = frame.map((coordinates) => {
+        return { x: coordinates[0], y: coordinates[1] };
+    });
+    let limits = getDataLimits(points);
+    let x = d3.scaleLinear().domain(limits[0]).range([0, scatterWidth]);
+    let y = d3.scaleLinear().domain(limits[1]).range([scatterHeight, 0]);
+
+    let svg = d3.select("#scatterplot");
+    if (svg.empty() || svg.selectAll("circle").size() !== points.length) {
+        svg.remove();
+        svg = d3
+            .select("#scatterArea")
+            .append("svg")
+            .attr("id", "scatterplot")
+            .attr("width", scatterWidth + scatterMargin.left + scatterMargin.right)
+            .attr("height", scatterHeight + scatterMargin.top + scatterMargin.bottom);
+        svg.selectAll("circle")
+            .data(points)
+            .enter()
+            .append("circle")
+            .style("fill", "lightgray")
+            .style("stroke", "black")
+            .attr("r", radius);
+    }
+
+    // the density contours belong to the previous layout
+    svg.selectAll("path").remove();
+    svg.selectAll("circle")
+        .transition()
+        .duration(embeddingFrameDuration)
+        .attr("cx", (d, i) => x(points[i].x))
+        .attr("cy", (d, i) => y(points[i].y));
+}
+
 /**
  * Receive the stratified data from the backend and update all visual charts accordingly.
+ *
+ * @param url - the url to receive the data from, by default the current scatterplot data.
  */
-function receiveDataGetRequest() {
-    fetch(scatterPlotDataUrl)
+function receiveDataGetRequest(url = scatterPlotDataUrl) {
+    fetch(url)
         .then((response) => {
             let newData = response.json();
 
@@ -554,6 +748,8 @@ function receiveDataGetRequest() {
                     selectedIndices = [];
                 }
                 // UPDATE ALL CHARTS
+                receiveMissingness();
+                receiveLabelAgreement();
                 updateScatterplot();
                 afterSelection = false;
 
@@ -762,7 +958,7 @@ function showScatterplot(data, limits, clusterLabels) {
             let newX = d3.event.transform.rescaleX(xAxis);
             let newY = d3.event.transform.rescaleY(yAxis);
 
-            d3.selectAll("circle")
+            svg.selectAll("circle")
                 .attr("cx", function (d) {
                     return typeof d != "undefined" ? newX(d.x) : 0;
                 })
@@ -965,7 +1161,9 @@ function drawCircles(svg, data, xAxis, yAxis) {
                 return colorBrewerScale[d.cluster];
             }
         })
-        .style("opacity", 1)
+        .style("opacity", function (d, i) {
+            return getAgreementOpacity(i);
+        })
         .style("stroke", function (d) {
             if ((activeFilter && !d.highlight) || d.highlight) {
                 return colorBrewerScale[d.cluster];
@@ -1069,20 +1267,163 @@ function hoverDataToString(hoverData, dataIndex, hoverIndex) {
 
         "\n\nAge: " +
         hoverData[hoverIndex].age +
+        imputedMark(hoverIndex, 1) +
         "\nWeight: " +
         hoverData[hoverIndex].weight +
         " kg" +
+        imputedMark(hoverIndex, 2) +
 
         "\nBMI: " +
         hoverData[hoverIndex].bmi +
+        imputedMark(hoverIndex, 3) +
         "\nHeight: " +
         hoverData[hoverIndex].size +
-        " m"
+        " m" +
+        imputedMark(hoverIndex, 4) +
+
+        "\n\nImputed values: " +
+        countImputedValues(hoverIndex) +
+        " of " +
+        missingness.columns.length +
+        agreementToString(hoverIndex)
 
         + statement
     );
 }
 
+/**
+ * Receive the bitmap of the originally missing values of the hover and table data from the backend.
+ */
+function receiveMissingness() {
+    fetch(missingnessDataUrl)
+        .then((response) => response.json())
+        .then((result) => {
+            missingness = decodeMissingness(result);
+        })
+        .catch((err) => console.error(err));
+}
+
+/**
+ * Decode the base64 bitmap of the originally missing values. The bits of each column are stored in
+ * consecutive bytes, with the first row in the most significant bit of the first byte.
+ *
+ * @param missingnessData - the number of rows, the column names and the base64 encoded bitmap.
+ * @returns {*} - the number of rows, the column names, the bytes of the bitmap and the bytes per column.
+ */
+function decodeMissingness(missingnessData) {
+    let binary = atob(missingnessData.bitmap);
+    let bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return {
+        rows: missingnessData.rows,
+        columns: missingnessData.columns,
+        bytes: bytes,
+        bytesPerColumn: Math.ceil(missingnessData.rows / 8),
+    };
+}
+
+/**
+ * Check whether a value of the hover and table data was originally missing and is imputed.
+ *
+ * @param row - the row of the value.
+ * @param column - the position of the column of the value.
+ * @returns {boolean} - true if the value is imputed, otherwise false.
+ */
+function isImputedValue(row, column) {
+    if (!missingness || row >= missingness.rows || column >= missingness.columns.length) {
+        return false;
+    }
+    let byte = missingness.bytes[column * missingness.bytesPerColumn + (row >> 3)];
+    return ((byte >> (7 - (row & 7))) & 1) === 1;
+}
+
+/**
+ * Count the imputed values of a row of the hover and table data.
+ *
+ * @param row - the row of the hover and table data.
+ * @returns {number} - the number of imputed values of the row.
+ */
+function countImputedValues(row) {
+    let count = 0;
+    for (let column = 0; column < missingness.columns.length; column++) {
+        if (isImputedValue(row, column)) {
+            count++;
+        }
+    }
+    return count;
+}
+
+/**
+ * Mark a value on mouse hover if it was originally missing and is imputed.
+ *
+ * @param row - the row of the value.
+ * @param column - the position of the column of the value.
+ * @returns {string} - the mark of an imputed value, or an empty string.
+ */
+function imputedMark(row, column) {
+    return isImputedValue(row, column) ? " (imputed)" : "";
+}
+
+/**
+ * Receive the agreement of the cluster label of each patient across the chains of the multiple imputation
+ * from the backend, and show it by the opacity of the scatter points.
+ */
+function receiveLabelAgreement() {
+    fetch(labelAgreementUrl)
+        .then((response) => response.json())
+        .then((result) => {
+            labelAgreement = new Map(parseDataToJson(result)[0].map((element) => [element.id, element]));
+            d3.select("#scatterplot")
+                .selectAll("circle")
+                .style("opacity", (d, i) => getAgreementOpacity(i));
+        })
+        .catch((err) => console.error(err));
+}
+
+/**
+ * Get the label agreement of a patient, if the data is imputed multiple times.
+ *
+ * @param hoverIndex - the index of the hover data of the patient.
+ * @returns {*} - the agreement in percent and the number of chains, or undefined.
+ */
+function getLabelAgreement(hoverIndex) {
+    if (hoverIndex === undefined || !hoverData[hoverIndex]) {
+        return undefined;
+    }
+    return labelAgreement.get(hoverData[hoverIndex].id);
+}
+
+/**
+ * Get the opacity of a scatter point, which decreases with the label agreement of its patient.
+ * Points are opaque if the data is not imputed multiple times.
+ *
+ * @param index - the index of the scatter point.
+ * @returns {number} - the opacity of the scatter point.
+ */
+function getAgreementOpacity(index) {
+    let agreement = getLabelAgreement(allIndices[index]);
+    if (agreement === undefined) {
+        return 1;
+    }
+    return minAgreementOpacity + (1 - minAgreementOpacity) * agreement.agreement / 100;
+}
+
+/**
+ * Format the label agreement of a patient to show it on mouse hover.
+ *
+ * @param hoverIndex - the index of the hover data of the patient.
+ * @returns {string} - the formatted label agreement, or an empty string.
+ */
+function agreementToString(hoverIndex) {
+    let agreement = getLabelAgreement(hoverIndex);
+    if (agreement === undefined) {
+        return "";
+    }
+    return "\nLabel agreement: " + agreement.agreement + "% of " + agreement.chains + " imputations";
+}
+
 /**
  * Perform lasso selections on the scatterplot.
  *
@@ -1,6 +1,7 @@
 console.log("Application started");
 
-const urls = [scatterPlotDataUrl, scatterPlotHoverDataUrl, clusterDataUrl, shapDataUrl, interclassDataUrl, dataTagUrl];
+const urls = [scatterPlotDataUrl, scatterPlotHoverDataUrl, clusterDataUrl, shapDataUrl, interclassDataUrl, dataTagUrl,
+    missingnessDataUrl];
 Promise.all(urls.map(url => d3.json(url))).then(run);
 
 /**
@@ -9,7 +10,7 @@ Promise.all(urls.map(url => d3.json(url))).then(run);
  * @param dataset - the datasets received from the backend.
  */
 function run(dataset) {
-    d3ScatterPlot(dataset[0], dataset[1], dataset[5]);
+    d3ScatterPlot(dataset[0], dataset[1], dataset[5], dataset[6]);
     d3ShapValues(dataset[3]);
     d3InterclassValues(dataset[4]);
     d3Heatmap(dataset[3], dataset[4]);
@@ -0,0 +1,46 @@
+import source.processing.ChainAgreement as ca
+import numpy as np
+
+
+def test_match_labels_renames_permuted_clusters():
+    reference_labels = np.array([0, 0, 1, 1, 2, 2])
+    labels = np.array([2, 2, 0, 0, 1, 1])
+
+    np.testing.assert_array_equal(ca.match_labels(reference_labels, labels), reference_labels)
+
+
+def test_match_labels_marks_extra_clusters_as_unmatched():
+    reference_labels = np.array([0, 0, 1, 1])
+    labels = np.array([5, 5, 7, 9])
+
+    assert ca.match_labels(reference_labels, labels).tolist() == [0, 0, 1, None]
+
+
+def test_align_embedding_undoes_rotation_reflection_scale_and_shift():
+    reference = np.random.RandomState(0).rand(20, 2)
+    angle = 0.7
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    embedding = 3 * reference @ rotation * np.array([1, -1]) + np.array([5, -2])
+
+    np.testing.assert_allclose(ca.align_embedding(reference, embedding), reference, atol=1e-10)
+
+
+def test_align_embedding_of_collapsed_embedding():
+    reference = np.array([[0., 0.], [2., 4.]])
+
+    np.testing.assert_allclose(ca.align_embedding(reference, np.ones((2, 2))), [[1., 2.], [1., 2.]])
+
+
+def test_get_label_agreement_with_relabelled_and_missing_patients():
+    ids = ['p1', 'p2', 'p3', 'p4']
+    embedding = np.array([[0., 0.], [0., 1.], [5., 5.], [5., 6.]])
+    labels = np.array([0, 0, 1, 1])
+    chains = [(['p4', 'p3', 'p2', 'p1'], embedding[::-1], np.array([0, 0, 1, 1])),
+              (['p1', 'p2', 'p3'], embedding[:3], np.array([1, 0, 0]))]
+
+    label_agreement, aligned_embeddings = ca.get_label_agreement(ids, embedding, labels, chains)
+
+    assert label_agreement['agreement'].tolist() == [100., 50., 100., 100.]
+    assert label_agreement['chains'].tolist() == [2, 2, 2, 1]
+    np.testing.assert_allclose(aligned_embeddings[0].to_numpy(), embedding, atol=1e-10)
+    assert aligned_embeddings[1].iloc[3].isna().all()
@@ -0,0 +1,48 @@
+from source.processing.EncodeData import EncodeData
+import source.processing.ImputeData as imd
+import source.processing.ImputationMethods as im
+import source.processing.ReadData as rd
+from source.Options import Opt
+import pandas as pd
+import pathlib
+import json
+
+root = pathlib.Path(__file__).resolve().parents[1]
+
+
+def read_clinical_toy_data():
+    """
+    Read the clinical toy data like the data reader, whose file extension differs in case between systems.
+
+        :return: the clinical toy data with encoded categorical values.
+    """
+    path = next(path for path in (root / Opt.input_folder.value).glob('sample/*')
+                if path.name.lower() == (pathlib.Path(Opt.clinical_dataset.value).name + Opt.file_type.value).lower())
+    data = rd.read_data_from_file(str(path), rd.get_file_encoding(str(path)) or Opt.encoding.value)
+    return EncodeData().encode_categorical_values(rd.cleanup_data(data).reset_index())
+
+
+def test_evaluate_best_imputation_methods_on_toy_data(tmp_path, monkeypatch):
+    data = read_clinical_toy_data()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(imd, 'function_list', [im.univariate_mean.__name__, im.univariate_most_frequent.__name__])
+
+    handler = imd.ImputeData()
+    plan = handler.evaluate_best_imputation_methods(data.copy(), min_limit=20, max_limit=20)
+
+    col_names = data.columns[data.isna().any()].tolist()
+    assert len(col_names) > 0
+    assert set(plan) == set(col_names)
+    assert set(plan.values()) <= {im.univariate_mean.__name__, im.univariate_most_frequent.__name__}
+
+    output_folder = tmp_path / Opt.output_folder.value
+    with open(output_folder / Opt.imputation_plan_file.value) as file:
+        assert json.load(file) == plan
+
+    evaluation_results = pd.read_csv(output_folder / Opt.imputation_evaluation_file.value, sep=Opt.separator.value,
+                                     decimal=Opt.decimal_comma.value, encoding=Opt.encoding.value)
+    assert set(evaluation_results['Dataset']) == {'training', 'test', 'complete'}
+    assert set(evaluation_results['Missingness']) == {20}
+
+    imputed_data = handler.apply_best_imputation_method_per_feature(data.copy(), col_names)
+    assert not imputed_data[col_names].isna().any().any()
@@ -0,0 +1,49 @@
+from source.processing.MergeData import MergeData
+import numpy as np
+import pandas as pd
+
+
+def test_align_positions_keeps_first_occurrence_and_known_ids():
+    # lead codes: duplicated 3, unknown -1, and 5 missing in the second modality
+    codes = np.array([3, 1, 3, -1, 5, 2])
+    first = MergeData.build_key_index(np.array([1, 2, 3, 5, 2]))
+    second = MergeData.build_key_index(np.array([2, 3, 1]))
+
+    positions = MergeData.align_positions(codes, [first, second])
+
+    np.testing.assert_array_equal(positions[0], [0, 1, 5])
+    np.testing.assert_array_equal(positions[1], [2, 0, 1])
+    np.testing.assert_array_equal(positions[2], [1, 2, 0])
+
+
+def test_align_positions_with_empty_modality():
+    codes = np.array([0, 1])
+    positions = MergeData.align_positions(codes, [MergeData.build_key_index(np.array([], dtype=int))])
+
+    assert len(positions[0]) == 0
+    assert len(positions[1]) == 0
+
+
+def test_concat_blocks_keeps_first_occurrence_of_columns():
+    first = pd.DataFrame({'id': ['a', 'b'], 'x': [1, 2]})
+    second = pd.DataFrame({'x': [9, 9], 'y': [3, 4]})
+
+    merged = MergeData.concat_blocks([first, second])
+
+    assert merged.columns.tolist() == ['id', 'x', 'y']
+    assert merged['x'].tolist() == [1, 2]
+    assert merged['y'].tolist() == [3, 4]
+
+
+def test_merge_data_with_duplicate_and_missing_ids():
+    clinical = pd.DataFrame({'index': [0, 1, 2, 3], 'id': ['p1', 'p2', 'p1', 'p3'], 'age': [50, 60, 70, 80]})
+    genomic = pd.DataFrame({'index': [0, 1, 2], 'id': ['p2', 'p1', 'p2'], 'gene': [0.2, 0.1, 0.9]})
+    radiomic = pd.DataFrame({'index': [0, 1], 'id': ['p1', 'p2'], 'age': [0, 0], 'volume': [1.0, 2.0]})
+
+    merged = MergeData().merge_data([clinical, genomic, radiomic], 'id')
+
+    assert merged.columns.tolist() == ['id', 'age', 'gene', 'volume']
+    assert merged['id'].tolist() == ['p1', 'p2']
+    assert merged['age'].tolist() == [50, 60]
+    assert merged['gene'].tolist() == [0.1, 0.2]
+    assert merged['volume'].tolist() == [1.0, 2.0]
@@ -0,0 +1,54 @@
+from source.processing.MissingnessBitmap import MissingnessBitmap
+import numpy as np
+import pandas as pd
+import base64
+
+
+def test_mask_round_trip_for_rows_not_divisible_by_eight():
+    mask = np.random.RandomState(0).rand(13, 4) < 0.4
+    bitmap = MissingnessBitmap.from_mask(mask, ['a', 'b', 'c', 'd'])
+
+    assert bitmap.packed.shape == (4, 2)
+    np.testing.assert_array_equal(bitmap.get_mask(), mask)
+    np.testing.assert_array_equal(bitmap.get_mask([2, 0]), mask[:, [2, 0]])
+    np.testing.assert_array_equal(bitmap.get_column('b'), mask[:, 1])
+
+
+def test_to_dict_stores_the_first_row_in_the_most_significant_bit():
+    mask = np.zeros((10, 2), dtype=bool)
+    mask[0, 0] = True
+    mask[9, 1] = True
+
+    encoded = MissingnessBitmap.from_mask(mask, ['a', 'b']).to_dict()
+
+    assert encoded['rows'] == 10
+    assert encoded['columns'] == ['a', 'b']
+    assert list(base64.b64decode(encoded['bitmap'])) == [0b10000000, 0, 0, 0b01000000]
+
+
+def test_from_data_marks_missing_values():
+    data = pd.DataFrame({'id': ['p1', 'p2', 'p3'], 'age': [50, np.nan, 70], 'sex': [None, 'f', 'm']})
+    bitmap = MissingnessBitmap.from_data(data, 'id')
+
+    assert bitmap.ids.tolist() == ['p1', 'p2', 'p3']
+    np.testing.assert_array_equal(bitmap.get_column('age'), [False, True, False])
+    np.testing.assert_array_equal(bitmap.get_column('sex'), [True, False, False])
+
+
+def test_get_row_positions_uses_first_occurrence():
+    bitmap = MissingnessBitmap.from_mask(np.zeros((4, 1), dtype=bool), ['a'], ids=['p1', 'p2', 'p1', 'p3'])
+
+    np.testing.assert_array_equal(bitmap.get_row_positions(['p3', 'p1', 'p4', 'p2']), [3, 0, -1, 1])
+
+
+def test_merge_aligns_rows_and_takes_columns_from_first_bitmap():
+    clinical = MissingnessBitmap.from_mask([[True, False], [False, True], [False, False]], ['id', 'age'],
+                                           ids=['p1', 'p2', 'p1'])
+    genomic = MissingnessBitmap.from_mask([[False, True], [True, True]], ['age', 'gene'], ids=['p2', 'p1'])
+
+    merged = MissingnessBitmap.merge([clinical, genomic], ['p2', 'p1', 'p9'], ['id', 'age', 'gene', 'volume'])
+
+    np.testing.assert_array_equal(merged.get_mask(), [[False, True, True, False],
+                                                      [True, False, True, False],
+                                                      [False, False, False, False]])
+    assert merged.ids.tolist() == ['p2', 'p1', 'p9']